@@ -1,41 +1,170 @@
 """Top-level main entry point into the cDAL tool"""
 import argparse
 import json
+import os
+import sys
+import time
 
-from codegen.accessor import accessor_header_file_create, accessor_source_file_create
-from codegen.ctypes import ctypes_header_file_create, ctypes_source_file_create
+from codegen.accessor import (accessor_bench_file_create, accessor_bench_file_path_get, accessor_file_paths_get,
+                              accessor_header_file_create, accessor_model_source_files_create,
+                              accessor_source_file_create)
+from codegen.ctypes import (ctypes_file_paths_get, ctypes_header_file_create, ctypes_model_source_files_create,
+                            ctypes_source_file_create)
+from codegen.manifest import Manifest, ManifestError, content_hash_get
+from codegen.pyaccessor import pyaccessor_module_file_create, pyaccessor_module_file_path_get
 import datasetdef
 
 
-def _accessor_files_create(dataset, output_dir):
-    """Creates all accessor files"""
-    accessor_header_file_create(dataset, output_dir)
-    accessor_source_file_create(dataset, output_dir)
+class GenerationTiming:
+    """Represents the time spent generating the files of a single dataset definition"""
 
+    def __init__(self, definition_file_path, parse_seconds=0.0, generate_seconds=0.0, output_cnt=0,
+                 changed_cnt=0, skipped=False):
+        self.definition_file_path = definition_file_path
+        self.parse_seconds = parse_seconds
+        self.generate_seconds = generate_seconds
+        self.output_cnt = output_cnt
+        self.changed_cnt = changed_cnt
+        self.skipped = skipped
 
-def _dataset_parse(definition_file_path):
-    """Parses the dataset from the dataset definition file at the spcified path"""
-    with open(definition_file_path) as definition_file:
-        definition = json.load(definition_file)
+    def __repr__(self):
+        return ('GenerationTiming(definition_file_path={}, parse_seconds={}, generate_seconds={}, output_cnt={}, '
+                'changed_cnt={}, skipped={})').format(self.definition_file_path, self.parse_seconds,
+                                                      self.generate_seconds, self.output_cnt, self.changed_cnt,
+                                                      self.skipped)
+
+
+def _accessor_files_create(dataset, output_dir, split):
+    """Creates all accessor files, with one source file per model if split, and returns their paths"""
+    accessor_files = [accessor_header_file_create(dataset, output_dir),
+                      accessor_source_file_create(dataset, output_dir, split)]
+    if split:
+        accessor_files += accessor_model_source_files_create(dataset, output_dir)
+
+    return accessor_files
+
+
+def _dataset_files_create(definition_file_path, output_dir, bench, python, split, manifest, force):
+    """
+    Generates all files for the dataset definition file at the specified path, unless the manifest shows
+    that the files generated from it are up to date, and returns the generation's timing
+    """
+    with open(definition_file_path, 'rb') as definition_file:
+        definition_data = definition_file.read()
+
+    definition_hash = content_hash_get(definition_data)
+    options = {'bench': bench, 'python': python, 'split_per_model': split}
+    if not force and manifest.is_up_to_date(definition_file_path, definition_hash, options):
+        return GenerationTiming(definition_file_path, skipped=True)
+
+    parse_start = time.perf_counter()
+    dataset = _dataset_parse(definition_data)
+    _dataset_warnings_print(dataset)
+
+    # Outputs are checked before any is written, so that files generated from another definition are left intact
+    manifest.outputs_check(definition_file_path, _output_paths_get(dataset, output_dir, bench, python, split))
+
+    generate_start = time.perf_counter()
+    output_paths = _type_files_create(dataset, output_dir, split) + _accessor_files_create(dataset, output_dir, split)
+    if bench:
+        output_paths.append(accessor_bench_file_create(dataset, output_dir))
+    if python:
+        output_paths.append(pyaccessor_module_file_create(dataset, output_dir))
+
+    changed_cnt = manifest.outputs_record(definition_file_path, definition_hash, options, output_paths)
+    generate_end = time.perf_counter()
+
+    return GenerationTiming(definition_file_path, generate_start - parse_start, generate_end - generate_start,
+                            len(output_paths), changed_cnt)
+
+
+def _dataset_parse(definition_data):
+    """Parses the dataset from the contents of a dataset definition file"""
+    definition = json.loads(definition_data)
 
     return datasetdef.dataset_from_definition(definition)
 
 
-def _type_files_create(dataset, output_dir):
-    """Creates all C type files for the provided dataset"""
-    ctypes_header_file_create(dataset, output_dir)
-    ctypes_source_file_create(dataset, output_dir)
+def _dataset_warnings_print(dataset):
+    """Prints warnings about definitions that are likely to perform poorly"""
+    for model in dataset.models:
+        for query in model.get_unindexed_queries():
+            print('Warning: query {} filters on columns ({}) of table {} that are not covered by any index'.format(
+                query.name, ', '.join(query.get_where_field_names(model)), model.get_table_name()), file=sys.stderr)
+
+
+def _output_paths_get(dataset, output_dir, bench, python, split):
+    """Returns the paths of all files generated for the dataset, in the order they are created"""
+    output_paths = (ctypes_file_paths_get(dataset, output_dir, split) +
+                    accessor_file_paths_get(dataset, output_dir, split))
+    if bench:
+        output_paths.append(accessor_bench_file_path_get(dataset, output_dir))
+    if python:
+        output_paths.append(pyaccessor_module_file_path_get(dataset, output_dir))
+
+    return output_paths
+
+
+def _timing_report_print(timings, total_seconds):
+    """Prints the time spent on each definition and on the whole run"""
+    name_width = max([len('Definition')] + [len(os.path.basename(timing.definition_file_path))
+                                            for timing in timings])
+    print('{:<{}}  {:>10}  {:>13}  {:>7}  {:>7}'.format('Definition', name_width, 'Parse (ms)', 'Generate (ms)',
+                                                        'Outputs', 'Changed'), file=sys.stderr)
+
+    for timing in timings:
+        name = os.path.basename(timing.definition_file_path)
+        if timing.skipped:
+            print('{:<{}}  up to date'.format(name, name_width), file=sys.stderr)
+        else:
+            print('{:<{}}  {:>10.1f}  {:>13.1f}  {:>7}  {:>7}'.format(
+                name, name_width, timing.parse_seconds * 1000, timing.generate_seconds * 1000, timing.output_cnt,
+                timing.changed_cnt), file=sys.stderr)
+
+    generated_cnt = len([timing for timing in timings if not timing.skipped])
+    print('{} definitions, {} generated, {} up to date in {:.1f} ms'.format(
+        len(timings), generated_cnt, len(timings) - generated_cnt, total_seconds * 1000), file=sys.stderr)
+
+
+def _type_files_create(dataset, output_dir, split):
+    """Creates all C type files, with one source file per model if split, and returns their paths"""
+    type_files = [ctypes_header_file_create(dataset, output_dir),
+                  ctypes_source_file_create(dataset, output_dir, split=split)]
+    if split:
+        type_files += ctypes_model_source_files_create(dataset, output_dir)
+
+    return type_files
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument('dataset_definition_file', help='Path to dataset definition file', type=str)
+    parser.add_argument('dataset_definition_files', help='Paths to dataset definition files', type=str, nargs='+')
     parser.add_argument('output_dir', help='Path to directory')
+    parser.add_argument('--bench', help='Also generate a microbenchmark for the accessors', action='store_true')
+    parser.add_argument('--force', help='Regenerate files even if the manifest shows they are up to date',
+                        action='store_true')
+    parser.add_argument('--python', help='Also generate a Python module that reads query results into NumPy arrays',
+                        action='store_true')
+    parser.add_argument('--split-per-model', help='Generate one accessor and one C types source file per model',
+                        action='store_true')
+    parser.add_argument('--timing', help='Print the time spent generating each definition', action='store_true')
 
     args = parser.parse_args()
 
-    dataset = _dataset_parse(args.dataset_definition_file)
-
-    _type_files_create(dataset, args.output_dir)
-    _accessor_files_create(dataset, args.output_dir)
+    start = time.perf_counter()
+    manifest = Manifest(args.output_dir)
+    timings = []
+    try:
+        for dataset_definition_file in args.dataset_definition_files:
+            timings.append(_dataset_files_create(dataset_definition_file, args.output_dir, args.bench, args.python,
+                                                 args.split_per_model, manifest, args.force))
+    except ManifestError as error:
+        print('Error: {}'.format(error), file=sys.stderr)
+        sys.exit(1)
+    finally:
+        # Definitions generated before a failing one stay recorded, so a rerun skips them
+        if timings:
+            manifest.save()
 
+    if args.timing:
+        _timing_report_print(timings, time.perf_counter() - start)
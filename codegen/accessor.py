@@ -1,100 +1,528 @@
 """Generates code to access models stored in database tables"""
+import functools
 import os
 
 from codegen import templates
 from codegen.ctypes import ctypes_header_include_get
-from dataset import ModelQueryType
+from dataset import ModelFieldType, ModelQueryType
+
+# Default SQLITE_MAX_VARIABLE_NUMBER of SQLite versions before 3.32.0, the lowest limit on query
+# parameters that generated multi-row inserts can rely on
+_BULK_INSERT_MAX_VARIABLES = 999
+
+# Largest number of rows inserted by a single multi-row insert statement. Larger statements
+# stop paying off and only make the generated query strings longer.
+_BULK_INSERT_MAX_ROWS = 64
+
+# Number of ids looked up by each statement of the generated find-many-by-id functions
+_FIND_MANY_CHUNK_SIZE = 64
+
+# Number of bits in the sqlite3_uint64 field masks of the generated column update functions. Models
+# with more fields do not get these functions.
+_FIELD_MASK_BITS = 64
+
+# Largest number of hash buckets of a generated row cache. Caches bounded only by bytes get one
+# bucket per _ROW_CACHE_BYTES_PER_BUCKET bytes, since their entry count is not known up front.
+_ROW_CACHE_MAX_BUCKETS = 65536
+_ROW_CACHE_BYTES_PER_BUCKET = 256
+
+# Number of rows copied by each statement when schema migration has to rebuild a table
+_MIGRATE_BATCH_SIZE = 10000
+
+# Accessor variant taking a connection pool, which wraps the cached variant with a connection
+# acquired from the pool
+_POOLED_VARIANT = 'pooled'
+
+
+def accessor_bench_file_create(dataset, output_dir):
+    """Generates and writes the dataset's accessor microbenchmark C file to the output directory and returns its path"""
+    output_path = accessor_bench_file_path_get(dataset, output_dir)
+    contents = accessor_bench_render(dataset)
+
+    templates.file_write_all_data(output_path, contents)
+
+    return output_path
+
+
+def accessor_bench_file_path_get(dataset, output_dir):
+    """Returns the path of the dataset's accessor microbenchmark C file in the output directory"""
+    return os.path.join(output_dir, _accessor_bench_name_get(dataset))
+
+
+def accessor_bench_render(dataset):
+    """Renders the accessor microbenchmark C source file for the dataset and returns the rendered string"""
+    includes = ['<stdio.h>', '<stdlib.h>', '<string.h>', '<time.h>', _accessor_header_include_get(dataset)]
+
+    return _accessor_bench_template_get().render(dataset=dataset, includes=includes,
+                                                 accessor_variants=_accessor_variants_get(dataset))
+
+
+def accessor_file_paths_get(dataset, output_dir, split=False):
+    """
+    Returns the paths of the dataset's accessor header and source files in the output directory, with one
+    source file per model if split
+    """
+    output_paths = [os.path.join(output_dir, _accessor_header_name_get(dataset)),
+                    os.path.join(output_dir, _accessor_source_name_get(dataset))]
+    if split:
+        output_paths += [os.path.join(output_dir, _accessor_model_source_name_get(dataset, model))
+                         for model in dataset.models]
+
+    return output_paths
 
 
 def accessor_header_file_create(dataset, output_dir):
-    """Generates and writes the dataset's accessor header file to the output directory"""
+    """Generates and writes the dataset's accessor header file to the output directory and returns its path"""
     output_path = os.path.join(output_dir, _accessor_header_name_get(dataset))
     contents = accessor_header_render(dataset)
 
     templates.file_write_all_data(output_path, contents)
 
+    return output_path
+
 
 def accessor_header_render(dataset):
     """Renders the data accessor header for the dataset and returns the rendered string"""
-    includes = ['<sqlite3.h>', ctypes_header_include_get(dataset)]
+    includes = ['<stddef.h>', '<sqlite3.h>', ctypes_header_include_get(dataset)]
+    if dataset.options.connection_pool:
+        includes.append('<pthread.h>')
+
+    return _accessor_header_template_get().render(dataset=dataset, includes=includes,
+                                                  accessor_variants=_accessor_variants_get(dataset),
+                                                  pooled_variants=_pooled_variants_get(dataset),
+                                                  select_variants=_select_variants_get(dataset),
+                                                  stmt_ids=_dataset_stmt_ids(dataset))
+
+
+def accessor_model_source_files_create(dataset, output_dir):
+    """
+    Generates and writes one source C file for each model of the dataset, holding the model's accessors, to
+    the output directory and returns their paths
+    """
+    output_paths = []
+    for model, contents in accessor_model_sources_render(dataset):
+        output_path = os.path.join(output_dir, _accessor_model_source_name_get(dataset, model))
+        templates.file_write_all_data(output_path, contents)
+        output_paths.append(output_path)
+
+    return output_paths
+
+
+def accessor_model_sources_render(dataset):
+    """
+    Renders the source C file holding the accessors of each model of the dataset, for datasets split into
+    one source file per model, and yields each model along with its rendered string
+    """
+    # Each file only declares its own statement ids, numbered as in the dataset's statement cache
+    stmt_id_base = 0
+    for model in dataset.models:
+        model_stmt_ids = _model_stmt_ids(model, dataset)
+        stmt_ids = ['{} = {}'.format(stmt_id, stmt_id_base + stmt_idx)
+                    for stmt_idx, stmt_id in enumerate(model_stmt_ids)]
+        stmt_id_base += len(model_stmt_ids)
+
+        yield model, _accessor_source_render(dataset, _accessor_model_source_name_get(dataset, model), [model],
+                                             True, stmt_ids)
+
+
+def accessor_source_file_create(dataset, output_dir, split=False):
+    """Generates and writes the dataset's accessor source C file to the output directory and returns its path"""
+    output_path = os.path.join(output_dir, _accessor_source_name_get(dataset))
+    contents = accessor_source_render(dataset, split)
+
+    templates.file_write_all_data(output_path, contents)
+
+    return output_path
+
+
+def accessor_source_render(dataset, split=False):
+    """
+    Renders the data accessor C source file for the dataset and returns the rendered string. When split,
+    the file only holds the code shared by all models, and the accessors of each model are rendered by
+    accessor_model_sources_render.
+    """
+    if split:
+        source_models = []
+        stmt_ids = []
+    else:
+        source_models = dataset.models
+        stmt_ids = _dataset_stmt_ids(dataset)
+
+    return _accessor_source_render(dataset, _accessor_source_name_get(dataset), source_models, split, stmt_ids)
+
+
+def _accessor_db_param_declaration(dataset, cached):
+    """
+    Returns the declaration of an accessor's first parameter, the database, its statement cache or
+    a connection pool
+    """
+    if cached == _POOLED_VARIANT:
+        param_declaration = '{} pool'.format(_pool_pointer_type(dataset))
+    elif cached:
+        param_declaration = '{} cache'.format(_stmt_cache_pointer_type(dataset))
+    else:
+        param_declaration = 'sqlite3 * db'
+
+    return param_declaration
+
+
+def _accessor_db_param_var(cached):
+    """Returns the name of an accessor's first parameter, the database or its statement cache"""
+    return 'cache' if cached else 'db'
+
+
+def _accessor_db_var(cached):
+    """Returns the expression for the database handle within an accessor function"""
+    return 'cache->db' if cached else 'db'
+
+
+def _accessor_function_name(function_name, cached):
+    """Returns the name of an accessor function for the cached, uncached or pooled variant"""
+    if cached == _POOLED_VARIANT:
+        accessor_function_name = function_name + '_pooled'
+    elif cached:
+        accessor_function_name = function_name + '_cached'
+    else:
+        accessor_function_name = function_name
+
+    return accessor_function_name
+
 
+def _accessor_variants_get(dataset):
+    """
+    Returns the accessor variants to generate. Each variant is a flag indicating whether
+    the accessor functions use the statement cache rather than the database handle.
+    """
+    variants = [False]
+    if dataset.options.statement_cache:
+        variants.append(True)
+
+    return variants
+
+
+def _accessor_bench_name_get(dataset):
+    """Returns the name of the dataset's accessor microbenchmark source file"""
+    return '{}.cdal.bench.c'.format(dataset.name)
+
+
+@functools.lru_cache(maxsize=None)
+def _accessor_bench_template_get():
+    """Returns the accessor microbenchmark template, compiled once and shared by all renders"""
     env = templates.environment_create()
+    env.filters['accessor_db_param_var'] = _accessor_db_param_var
+    env.filters['accessor_function_name'] = _accessor_function_name
+    env.filters['bench_macro'] = _bench_macro
+    env.filters['bench_name'] = _accessor_bench_name_get
+    env.filters['database_initialize_function_name'] = _database_initialize_function_name
+    env.filters['field_bench_fill_statement'] = _field_bench_fill_statement
+    env.filters['model_bench_fill_function_name'] = _model_bench_fill_function_name
+    env.filters['model_bench_function_name'] = _model_bench_function_name
+    env.filters['model_find_by_id_function_name'] = _model_find_by_id_function_name
+    env.filters['model_insert_new_function_name'] = _model_insert_new_function_name
+    env.filters['models_delete_all_function_name'] = _models_delete_all_function_name
+    env.filters['models_get_all_function_name'] = _models_get_all_function_name
+    env.filters['models_insert_all_new_function_name'] = _models_insert_all_new_function_name
+    env.filters['models_save_all_existing_function_name'] = _models_save_all_function_name
+    env.filters['query_param_bench_value'] = _query_param_bench_value
+    env.filters['stmt_cache_c_type'] = _stmt_cache_c_type
+    env.filters['stmt_cache_close_function_name'] = _stmt_cache_close_function_name
+    env.filters['stmt_cache_open_function_name'] = _stmt_cache_open_function_name
+    env.filters['stmt_cache_pointer_type'] = _stmt_cache_pointer_type
+
+    template_file = templates.template_file_get(templates.CDALTemplate.ACCESSOR_BENCH)
+    return env.get_template(template_file)
+
+
+def _accessor_header_guard_macro_get(dataset):
+    """Returns the guard macro for the dataset's accessor header file"""
+    return '{}_CDAL_ACCESSOR_H'.format(dataset.name.upper())
+
+
+def _accessor_header_include_get(dataset):
+    """Returns the string to include the accessor header file"""
+    return '"{}"'.format(_accessor_header_name_get(dataset))
+
+
+def _accessor_header_name_get(dataset):
+    """Returns the name of the dataset's accessor header file"""
+    return '{}.cdal.accessor.h'.format(dataset.name)
+
+
+@functools.lru_cache(maxsize=None)
+def _accessor_header_template_get():
+    """Returns the accessor header template, compiled once and shared by all renders"""
+    env = templates.environment_create()
+    env.filters['accessor_db_param_declaration'] = _accessor_db_param_declaration
+    env.filters['accessor_function_name'] = _accessor_function_name
+    env.filters['batch_function_name'] = _batch_function_name
+    env.filters['columnar_function_name'] = _columnar_function_name
+    env.filters['connection_close_function_name'] = _connection_close_function_name
+    env.filters['connection_configure_function_name'] = _connection_configure_function_name
+    env.filters['cursor_open_function_name'] = _cursor_open_function_name
     env.filters['database_delete_all_data_function_name'] = _database_delete_all_data_function_name
     env.filters['database_initialize_function_name'] = _database_initialize_function_name
+    env.filters['database_migrate_function_name'] = _database_migrate_function_name
+    env.filters['field_cursor_capacity_member'] = _field_cursor_capacity_member
+    env.filters['field_mask_bit'] = _field_mask_bit
+    env.filters['field_mask_macro'] = _field_mask_macro
+    env.filters['field_view_length_member'] = _field_view_length_member
+    env.filters['for_each_function_name'] = _for_each_function_name
     env.filters['header_guard_macro'] = _accessor_header_guard_macro_get
     env.filters['header_name'] = _accessor_header_name_get
+    env.filters['migrate_batch_size'] = _migrate_batch_size
+    env.filters['migrate_macro'] = _migrate_macro
+    env.filters['migrate_name'] = _migrate_name
+    env.filters['model_batch_size_macro'] = _model_batch_size_macro
+    env.filters['model_bulk_insert_rows'] = _model_bulk_insert_rows
+    env.filters['model_bulk_insert_rows_macro'] = _model_bulk_insert_rows_macro
+    env.filters['model_cursor_close_function_name'] = _model_cursor_close_function_name
+    env.filters['model_cursor_next_function_name'] = _model_cursor_next_function_name
+    env.filters['model_cursor_next_view_function_name'] = _model_cursor_next_view_function_name
     env.filters['model_delete_by_id_function_name'] = _model_delete_by_id_function_name
+    env.filters['model_field_mask_all_macro'] = _model_field_mask_all_macro
     env.filters['model_find_by_id_function_name'] = _model_find_by_id_function_name
+    env.filters['model_find_many_by_id_function_name'] = _model_find_many_by_id_function_name
+    env.filters['model_find_many_chunk_size'] = _model_find_many_chunk_size
+    env.filters['model_find_many_chunk_size_macro'] = _model_find_many_chunk_size_macro
+    env.filters['model_has_field_mask'] = _model_has_field_mask
     env.filters['model_insert_new_function_name'] = _model_insert_new_function_name
+    env.filters['model_row_cache_bucket_cnt'] = _model_row_cache_bucket_cnt
+    env.filters['model_row_cache_function_name'] = _model_row_cache_function_name
+    env.filters['model_row_cache_macro'] = _model_row_cache_macro
+    env.filters['model_row_cache_member'] = _model_row_cache_member
     env.filters['model_save_existing_function_name'] = _model_save_existing_function_name
     env.filters['models_get_all_function_name'] = _models_get_all_function_name
     env.filters['models_count_all_function_name'] = _models_count_all_function_name
     env.filters['models_delete_all_function_name'] = _models_delete_all_function_name
+    env.filters['models_insert_all_new_batched_function_name'] = _models_insert_all_new_batched_function_name
+    env.filters['models_insert_all_new_bulk_function_name'] = _models_insert_all_new_bulk_function_name
     env.filters['models_insert_all_new_function_name'] = _models_insert_all_new_function_name
+    env.filters['models_save_all_existing_batched_function_name'] = _models_save_all_batched_function_name
     env.filters['models_save_all_existing_function_name'] = _models_save_all_function_name
+    env.filters['models_update_all_fields_function_name'] = _models_update_all_fields_function_name
+    env.filters['models_upsert_all_function_name'] = _models_upsert_all_function_name
+    env.filters['pool_c_type'] = _pool_c_type
+    env.filters['pool_function_name'] = _pool_function_name
+    env.filters['pool_pointer_type'] = _pool_pointer_type
+    env.filters['profile_macro'] = _profile_macro
+    env.filters['row_cache_c_type'] = _row_cache_c_type
+    env.filters['row_cache_name'] = _row_cache_name
+    env.filters['row_cache_pointer_type'] = _row_cache_pointer_type
+    env.filters['row_cache_stats_c_type'] = _row_cache_stats_c_type
+    env.filters['select_function_name'] = _select_function_name
+    env.filters['stats_c_type'] = _stats_c_type
+    env.filters['stats_get_function_name'] = _stats_get_function_name
+    env.filters['stats_reset_function_name'] = _stats_reset_function_name
+    env.filters['stmt_cache_c_type'] = _stmt_cache_c_type
+    env.filters['stmt_cache_close_function_name'] = _stmt_cache_close_function_name
+    env.filters['stmt_cache_open_function_name'] = _stmt_cache_open_function_name
+    env.filters['stmt_cache_pointer_type'] = _stmt_cache_pointer_type
+    env.filters['stmt_cache_rows_set_function_name'] = _stmt_cache_rows_set_function_name
+    env.filters['stmt_cnt_macro'] = _stmt_cnt_macro
+    env.filters['view_function_name'] = _view_function_name
 
     template_file = templates.template_file_get(templates.CDALTemplate.ACCESSOR_HEADER)
-    return env.get_template(template_file).render(dataset=dataset, includes=includes)
+    return env.get_template(template_file)
 
 
-def accessor_source_file_create(dataset, output_dir):
-    """Generates and writes the dataset's accessor source C file to the output directory"""
-    output_path = os.path.join(output_dir, _accessor_source_name_get(dataset))
-    contents = accessor_source_render(dataset)
+def _accessor_model_source_name_get(dataset, model):
+    """Returns the name of the source file holding the accessors of one of the dataset's models"""
+    return '{}.cdal.accessor.{}.c'.format(dataset.name, model.get_table_name())
 
-    templates.file_write_all_data(output_path, contents)
 
+def _accessor_source_name_get(dataset):
+    """Returns the name of the dataset's accessor source file"""
+    return '{}.cdal.accessor.c'.format(dataset.name)
 
-def accessor_source_render(dataset):
-    """Renders the data accessor C source file for the dataset and returns the rendered string"""
-    includes = ['<stddef.h>', '"cqlite.h"', _accessor_header_include_get(dataset)]
 
+def _accessor_source_render(dataset, source_file_name, source_models, split, stmt_ids):
+    """
+    Renders an accessor source file holding the accessors of the provided models, which use the provided
+    statement ids. Unless split, the file also holds the code shared by all models, and the private
+    functions it would otherwise share with the model source files are static.
+    """
+    includes = ['<stddef.h>', '<stdlib.h>', '<string.h>', '"cqlite.h"', _accessor_header_include_get(dataset)]
+    source_projection_models = [query.result_model for model in source_models for query in model.queries
+                                if query.result_model]
+
+    # Each projection result model belongs to a single query, so it only needs the private functions reading
+    # find or select results. Models are read by both their find by id and their get all accessors.
+    source_find_models = source_models + [query.result_model for model in source_models
+                                          for query in model.get_find_queries() if query.result_model]
+    source_select_models = source_models + [query.result_model for model in source_models
+                                            for query in model.get_select_queries() if query.result_model]
+
+    return _accessor_source_template_get().render(dataset=dataset, includes=includes,
+                                                  accessor_variants=_accessor_variants_get(dataset),
+                                                  pooled_variants=_pooled_variants_get(dataset),
+                                                  private_static='' if split else 'static ',
+                                                  select_variants=_select_variants_get(dataset),
+                                                  shared_source=not split or not source_models,
+                                                  source_file_name=source_file_name,
+                                                  source_find_models=source_find_models,
+                                                  source_models=source_models,
+                                                  source_projection_models=source_projection_models,
+                                                  source_select_models=source_select_models,
+                                                  stmt_ids=stmt_ids)
+
+
+@functools.lru_cache(maxsize=None)
+def _accessor_source_template_get():
+    """Returns the accessor source template, compiled once and shared by all renders"""
     env = templates.environment_create()
+    env.filters['accessor_db_param_declaration'] = _accessor_db_param_declaration
+    env.filters['accessor_db_param_var'] = _accessor_db_param_var
+    env.filters['accessor_db_var'] = _accessor_db_var
+    env.filters['accessor_function_name'] = _accessor_function_name
+    env.filters['arena_read_function_name'] = _arena_read_function_name
+    env.filters['batch_function_name'] = _batch_function_name
+    env.filters['columnar_function_name'] = _columnar_function_name
+    env.filters['columns_append_function_name'] = _columns_append_function_name
+    env.filters['connection_close_function_name'] = _connection_close_function_name
+    env.filters['connection_configure_function_name'] = _connection_configure_function_name
+    env.filters['cursor_buffer_read_function_name'] = _cursor_buffer_read_function_name
+    env.filters['cursor_open_function_name'] = _cursor_open_function_name
     env.filters['database_delete_all_data_function_name'] = _database_delete_all_data_function_name
     env.filters['database_initialize_function_name'] = _database_initialize_function_name
+    env.filters['database_migrate_function_name'] = _database_migrate_function_name
+    env.filters['field_arena_read_call'] = _field_arena_read_call
     env.filters['field_bind_function_call'] = _field_bind_function_call
+    env.filters['field_bulk_bind_function_call'] = _field_bulk_bind_function_call
     env.filters['field_column_enum'] = _field_column_enum
+    env.filters['field_column_value_function_name'] = _field_column_value_function_name
+    env.filters['field_columns_read_call'] = _field_columns_read_call
+    env.filters['field_cursor_read_call'] = _field_cursor_read_call
+    env.filters['field_mask_macro'] = _field_mask_macro
+    env.filters['field_migrate_column_type'] = _field_migrate_column_type
+    env.filters['for_each_function_name'] = _for_each_function_name
     env.filters['field_read_result_function_call'] = _field_read_result_function_call
+    env.filters['field_update_set_string'] = _field_update_set_string
+    env.filters['field_view_length_member'] = _field_view_length_member
+    env.filters['index_create_query_var'] = _index_create_query_var
+    env.filters['migrate_macro'] = _migrate_macro
+    env.filters['migrate_name'] = _migrate_name
     env.filters['model_add_to_result_list_function_name'] = _model_add_to_result_list_function_name
+    env.filters['model_batch_size_macro'] = _model_batch_size_macro
+    env.filters['model_bulk_insert_query_var'] = _model_bulk_insert_query_var
+    env.filters['model_bulk_insert_row_string'] = _model_bulk_insert_row_string
+    env.filters['model_bulk_insert_rows'] = _model_bulk_insert_rows
+    env.filters['model_bulk_insert_rows_macro'] = _model_bulk_insert_rows_macro
+    env.filters['model_bulk_insert_tail_query_string'] = _model_bulk_insert_tail_query_string
+    env.filters['model_cursor_close_function_name'] = _model_cursor_close_function_name
+    env.filters['model_cursor_next_function_name'] = _model_cursor_next_function_name
+    env.filters['model_cursor_next_view_function_name'] = _model_cursor_next_view_function_name
     env.filters['model_delete_by_id_function_name'] = _model_delete_by_id_function_name
+    env.filters['model_delete_by_id_query_string'] = _model_delete_by_id_query_string
     env.filters['model_find_by_id_function_name'] = _model_find_by_id_function_name
+    env.filters['model_find_by_id_query_string'] = _model_find_by_id_query_string
+    env.filters['model_find_many_by_id_function_name'] = _model_find_many_by_id_function_name
+    env.filters['model_find_many_by_id_query_string'] = _model_find_many_by_id_query_string
+    env.filters['model_find_many_chunk_size_macro'] = _model_find_many_chunk_size_macro
+    env.filters['model_from_row_result_arena_function_name'] = _model_from_row_result_arena_function_name
     env.filters['model_from_row_result_function_name'] = _model_from_row_result_function_name
+    env.filters['model_has_field_mask'] = _model_has_field_mask
     env.filters['model_insert_new_function_name'] = _model_insert_new_function_name
     env.filters['model_insert_query_string'] = _model_insert_query_string
+    env.filters['model_migrate_columns_var'] = _model_migrate_columns_var
+    env.filters['model_row_cache_entry_c_type'] = _model_row_cache_entry_c_type
+    env.filters['model_row_cache_function_name'] = _model_row_cache_function_name
+    env.filters['model_row_cache_macro'] = _model_row_cache_macro
+    env.filters['model_row_cache_member'] = _model_row_cache_member
     env.filters['model_save_existing_function_name'] = _model_save_existing_function_name
+    env.filters['model_select_columnar_function_name'] = _model_select_columnar_function_name
+    env.filters['model_select_growable_function_name'] = _model_select_growable_function_name
+    env.filters['model_update_fields_query_size'] = _model_update_fields_query_size
+    env.filters['model_update_query_head'] = _model_update_query_head
+    env.filters['model_update_query_tail'] = _model_update_query_tail
+    env.filters['model_upsert_query_head'] = _model_upsert_query_head
     env.filters['models_count_all_function_name'] = _models_count_all_function_name
+    env.filters['models_count_all_query_string'] = _models_count_all_query_string
     env.filters['models_delete_all_function_name'] = _models_delete_all_function_name
+    env.filters['models_delete_all_query_string'] = _models_delete_all_query_string
     env.filters['models_get_all_function_name'] = _models_get_all_function_name
+    env.filters['models_get_all_query_string'] = _models_get_all_query_string
+    env.filters['models_insert_all_new_batched_function_name'] = _models_insert_all_new_batched_function_name
+    env.filters['models_insert_all_new_bulk_function_name'] = _models_insert_all_new_bulk_function_name
     env.filters['models_insert_all_new_function_name'] = _models_insert_all_new_function_name
+    env.filters['models_save_all_existing_batched_function_name'] = _models_save_all_batched_function_name
     env.filters['models_save_all_existing_function_name'] = _models_save_all_function_name
+    env.filters['models_update_all_fields_function_name'] = _models_update_all_fields_function_name
+    env.filters['models_upsert_all_function_name'] = _models_upsert_all_function_name
+    env.filters['page_key_bind_call'] = _page_key_bind_call
+    env.filters['page_limit_position'] = _page_limit_position
+    env.filters['page_query_string'] = _page_query_string
+    env.filters['pool_c_type'] = _pool_c_type
+    env.filters['pool_function_name'] = _pool_function_name
+    env.filters['pool_pointer_type'] = _pool_pointer_type
+    env.filters['profile_macro'] = _profile_macro
+    env.filters['profile_name'] = _profile_name
     env.filters['query_get_full_string'] = _query_get_full_string
     env.filters['query_param_bind_call'] = _query_param_bind_call
+    env.filters['row_cache_c_type'] = _row_cache_c_type
+    env.filters['row_cache_name'] = _row_cache_name
+    env.filters['row_cache_pointer_type'] = _row_cache_pointer_type
+    env.filters['row_cache_stats_c_type'] = _row_cache_stats_c_type
+    env.filters['select_function_name'] = _select_function_name
     env.filters['select_query_get_count_query_string'] = _select_query_get_count_query_string
-    env.filters['source_name'] = _accessor_source_name_get
+    env.filters['stats_c_type'] = _stats_c_type
+    env.filters['stats_get_function_name'] = _stats_get_function_name
+    env.filters['stats_reset_function_name'] = _stats_reset_function_name
+    env.filters['stmt_cache_c_type'] = _stmt_cache_c_type
+    env.filters['stmt_cache_close_function_name'] = _stmt_cache_close_function_name
+    env.filters['stmt_cache_get_function_name'] = _stmt_cache_get_function_name
+    env.filters['stmt_cache_open_function_name'] = _stmt_cache_open_function_name
+    env.filters['stmt_cache_pointer_type'] = _stmt_cache_pointer_type
+    env.filters['stmt_cache_release_function_name'] = _stmt_cache_release_function_name
+    env.filters['stmt_cache_rows_set_function_name'] = _stmt_cache_rows_set_function_name
+    env.filters['stmt_cnt_macro'] = _stmt_cnt_macro
+    env.filters['stmt_id'] = _stmt_id
+    env.filters['stmt_prepare_call'] = _stmt_prepare_call
+    env.filters['stmt_release_call'] = _stmt_release_call
     env.filters['table_create_query_var'] = _table_create_query_var
+    env.filters['view_function_name'] = _view_function_name
 
     template_file = templates.template_file_get(templates.CDALTemplate.ACCESSOR_SOURCE)
-    return env.get_template(template_file).render(dataset=dataset, includes=includes)
+    return env.get_template(template_file)
 
 
-def _accessor_header_guard_macro_get(dataset):
-    """Returns the guard macro for the dataset's accessor header file"""
-    return '{}_CDAL_ACCESSOR_H'.format(dataset.name.upper())
+def _arena_read_function_name(dataset):
+    """Returns the name of the function to read a TEXT or BLOB column into a list arena"""
+    return '{}_arena_read'.format(dataset.name)
 
 
-def _accessor_header_include_get(dataset):
-    """Returns the string to include the accessor header file"""
-    return '"{}"'.format(_accessor_header_name_get(dataset))
+def _bench_macro(dataset, name):
+    """Returns the name of a macro defined by the dataset's accessor microbenchmark"""
+    return '{}_CDAL_BENCH_{}'.format(dataset.name.upper(), name)
 
 
-def _accessor_header_name_get(dataset):
-    """Returns the name of the dataset's accessor header file"""
-    return '{}.cdal.accessor.h'.format(dataset.name)
+def _cursor_buffer_read_function_name(dataset):
+    """Returns the name of the function to read a TEXT or BLOB column into a reusable cursor buffer"""
+    return '{}_cursor_buffer_read'.format(dataset.name)
 
 
-def _accessor_source_name_get(dataset):
-    """Returns the name of the dataset's accessor source file"""
-    return '{}.cdal.accessor.c'.format(dataset.name)
+def _cursor_open_function_name(function_name):
+    """Returns the name of the function to open a cursor over the results of a select function"""
+    return function_name + '_cursor_open'
+
+
+def _columnar_function_name(function_name):
+    """Returns the name of the function to read the results of a select function into columns"""
+    return function_name + '_columnar'
+
+
+def _columns_append_function_name(dataset):
+    """Returns the name of the function to append a TEXT or BLOB column value to a columnar list"""
+    return '{}_columns_append'.format(dataset.name)
+
+
+def _connection_close_function_name(dataset):
+    """Returns the name of the function to close a connection to the dataset's database"""
+    return '{}_connection_close'.format(dataset.name)
+
+
+def _connection_configure_function_name(dataset):
+    """Returns the name of the function to apply the dataset's connection profile to a connection"""
+    return '{}_connection_configure'.format(dataset.name)
 
 
 def _database_delete_all_data_function_name(dataset):
@@ -107,19 +535,112 @@ def _database_initialize_function_name(dataset):
     return '{}_database_initialize'.format(dataset.name)
 
 
-def _field_bind_function_call(field, model, query_var, model_var):
+def _database_migrate_function_name(dataset):
+    """Returns the name of the function to migrate the dataset's database to the current definition"""
+    return '{}_database_migrate'.format(dataset.name)
+
+
+def _dataset_stmt_ids(dataset):
+    """Returns the ids of all statements held by the dataset's statement cache"""
+    stmt_ids = []
+    for model in dataset.models:
+        stmt_ids += _model_stmt_ids(model, dataset)
+
+    return stmt_ids
+
+
+def _batch_function_name(function_name):
+    """Returns the name of the function to run a custom query once for each of an array of parameter sets"""
+    return function_name + '_batch'
+
+
+def _bind_destructor(dataset, field_type, has_length=False):
+    """
+    Returns the destructor argument for binding text and blob values. In zero-copy mode, text values
+    and blob values bound with their length are bound with SQLITE_STATIC so SQLite does not copy them,
+    and the caller guarantees they outlive the statement's use of them. Other blob values are still
+    copied, since SQLite needs a blob's length to bind it without copying.
+    """
+    if dataset.options.zero_copy and (field_type == ModelFieldType.TEXT or has_length):
+        destructor = 'SQLITE_STATIC'
+    else:
+        destructor = 'SQLITE_TRANSIENT'
+
+    return destructor
+
+
+def _field_bench_fill_statement(field, dataset, model_var, value_var, text_var):
+    """Returns the statement to fill a model field with a synthetic value for the microbenchmark"""
+    if field.is_primary_key():
+        # Left unset so that a new primary key is generated upon insertion
+        fill_statement = '{model_var}->{field_name} = 0;'
+    elif field.field_type == ModelFieldType.FOREIGN_KEY:
+        fill_statement = '{model_var}->{field_name} = {value_var} + 1;'
+    elif field.field_type == ModelFieldType.INTEGER:
+        fill_statement = '{model_var}->{field_name} = {value_var};'
+    elif field.field_type == ModelFieldType.REAL:
+        fill_statement = '{model_var}->{field_name} = {value_var} * 0.5;'
+    elif dataset.has_length_member(field):
+        fill_statement = '{model_var}->{field_name} = {text_var};\n{model_var}->{length_name} = strlen( {text_var} );'
+    elif field.is_dynamically_allocated():
+        fill_statement = '{model_var}->{field_name} = {text_var};'
+    else:
+        # Fixed-size field
+        fill_statement = 'snprintf( {model_var}->{field_name}, sizeof( {model_var}->{field_name} ), "%s", {text_var} );'
+
+    return fill_statement.format(model_var=model_var, field_name=field.name, length_name=field.get_length_name(),
+                                 value_var=value_var, text_var=text_var)
+
+
+def _field_bind_function_call(field, model, dataset, query_var, model_var):
     """Returns the function call to bind the model field's value to a query variable"""
     # SQLite query parameters are 1-indexed, so we need to add one the the column
     # enum value which is 0-index.
     if field.field_type.is_primitive_type():
         bind_call_template ='{bind_function}( {query_var}, ({column_enum} + 1), {model_var}->{field_name} )'
     else:
-        bind_call_template ='{bind_function}( {query_var}, ({column_enum} + 1), {model_var}->{field_name}, -1, SQLITE_TRANSIENT )'
+        bind_call_template ='{bind_function}( {query_var}, ({column_enum} + 1), {model_var}->{field_name}, {length}, {destructor} )'
 
     bind_call = bind_call_template.format(bind_function=field.field_type.get_bind_function_name(),
                                           query_var=query_var, column_enum=_field_column_enum(field, model),
-                                          model_var=model_var, field_name=field.name)
-    return bind_call
+                                          model_var=model_var, field_name=field.name,
+                                          length=_field_bind_length(field, dataset, model_var),
+                                          destructor=_bind_destructor(dataset, field.field_type,
+                                                                      dataset.has_length_member(field)))
+    return _profile_bind_call(bind_call, field.field_type, '{}->{}'.format(model_var, field.name), dataset)
+
+
+def _field_bind_length(field, dataset, model_var):
+    """
+    Returns the length argument for binding a text or blob field's value, which is taken from the model
+    when models hold it and is otherwise left for SQLite to find
+    """
+    if dataset.has_length_member(field):
+        length = '(int){}->{}'.format(model_var, field.get_length_name())
+    else:
+        length = '-1'
+
+    return length
+
+
+def _field_bulk_bind_function_call(field, model, dataset, query_var, model_var, row_var):
+    """
+    Returns the function call to bind the model field's value to the query variable for a row of a
+    multi-row insert
+    """
+    if field.field_type.is_primitive_type():
+        bind_call_template ='{bind_function}( {query_var}, ( {row_var} * {column_cnt} ) + ({column_enum} + 1), {model_var}->{field_name} )'
+    else:
+        bind_call_template ='{bind_function}( {query_var}, ( {row_var} * {column_cnt} ) + ({column_enum} + 1), {model_var}->{field_name}, {length}, {destructor} )'
+
+    bind_call = bind_call_template.format(bind_function=field.field_type.get_bind_function_name(),
+                                          query_var=query_var, row_var=row_var, column_cnt=len(model.fields),
+                                          column_enum=_field_column_enum(field, model), model_var=model_var,
+                                          field_name=field.name,
+                                          length=_field_bind_length(field, dataset, model_var),
+                                          destructor=_bind_destructor(dataset, field.field_type,
+                                                                      dataset.has_length_member(field)))
+    return _profile_bind_call(bind_call, field.field_type, '{}->{}'.format(model_var, field.name), dataset)
 
 
 def _field_column_enum(field, model):
@@ -127,6 +648,93 @@ def _field_column_enum(field, model):
     return '{}_{}_COL'.format(model.get_table_name().upper(), field.name.upper())
 
 
+def _field_column_value_function_name(field):
+    """Returns the name of the function to get a pointer to a TEXT or BLOB column value of a query result"""
+    return 'sqlite3_column_text' if field.field_type == ModelFieldType.TEXT else 'sqlite3_column_blob'
+
+
+def _field_columns_read_call(field, model, dataset, query_var, columns_var, success_var):
+    """
+    Returns the statement to read a model field value from a query result into the next row of a
+    columnar list. TEXT and BLOB values are appended to the field's byte buffer.
+    """
+    if field.field_type.is_primitive_type():
+        read_call = '{columns_var}->{field_name}[{columns_var}->cnt] = {result_function}( {query_var}, {column_enum} );'.format(
+            columns_var=columns_var, field_name=field.name, result_function=field.get_read_result_function_name(),
+            query_var=query_var, column_enum=_field_column_enum(field, model))
+    else:
+        is_text = 1 if field.field_type == ModelFieldType.TEXT else 0
+        read_call = '{success_var} &= {append_function}( {query_var}, {column_enum}, {is_text}, &{columns_var}->{field_name}, &{columns_var}->{capacity_name}, {columns_var}->{offsets_name}, {columns_var}->cnt );'.format(
+            success_var=success_var, append_function=_columns_append_function_name(dataset), query_var=query_var,
+            column_enum=_field_column_enum(field, model), is_text=is_text, columns_var=columns_var,
+            field_name=field.name, capacity_name=field.get_columns_capacity_name(),
+            offsets_name=field.get_columns_offsets_name())
+
+    return read_call
+
+
+def _field_cursor_capacity_member(field):
+    """Returns the name of the cursor member holding the capacity of the field's reusable buffer"""
+    return '{}_capacity'.format(field.name)
+
+
+def _field_cursor_read_call(field, model, dataset, cursor_var, model_var, success_var):
+    """
+    Returns the statement to read a model field value from a cursor's current row. Dynamically
+    allocated fields are read into the model's existing buffer, which is only grown when needed.
+    """
+    if field.is_dynamically_allocated():
+        is_text = 1 if field.field_type == ModelFieldType.TEXT else 0
+        read_call = '{success_var} &= {read_function}( {cursor_var}->query, {column_enum}, {is_text}, &{model_var}->{field_name}, &{cursor_var}->{capacity_member} );'.format(
+            success_var=success_var, read_function=_cursor_buffer_read_function_name(dataset),
+            cursor_var=cursor_var, column_enum=_field_column_enum(field, model), is_text=is_text,
+            model_var=model_var, field_name=field.name, capacity_member=_field_cursor_capacity_member(field))
+    else:
+        read_call = _field_read_result_function_call(field, model, cursor_var + '->query', model_var, success_var)
+
+    return read_call
+
+
+def _field_arena_read_call(field, model, dataset, query_var, arena_var, model_var, success_var):
+    """
+    Returns the statement to read a model field value from a query result into a list. Dynamically
+    allocated fields are copied into the list's arena rather than allocated individually.
+    """
+    if field.is_dynamically_allocated():
+        is_text = 1 if field.field_type == ModelFieldType.TEXT else 0
+        read_call = '{success_var} &= {read_function}( {query_var}, {column_enum}, {is_text}, {arena_var}, &{model_var}->{field_name} );'.format(
+            success_var=success_var, read_function=_arena_read_function_name(dataset), query_var=query_var,
+            column_enum=_field_column_enum(field, model), is_text=is_text, arena_var=arena_var,
+            model_var=model_var, field_name=field.name)
+    else:
+        read_call = _field_read_result_function_call(field, model, query_var, model_var, success_var)
+
+    return read_call
+
+
+def _field_mask_bit(field, model):
+    """Returns the bit selecting the field in the field masks of the model's column update functions"""
+    return '( (sqlite3_uint64)1 << {} )'.format(model.fields.index(field))
+
+
+def _field_mask_macro(field, model):
+    """Returns the name of the macro holding the bit selecting the field in a field mask"""
+    return '{}_FIELD_{}'.format(model.get_table_name().upper(), field.name.upper())
+
+
+def _field_migrate_column_type(field):
+    """
+    Returns the declared type of the field's column as SQLite reports it, which leaves out the primary
+    key constraint
+    """
+    if field.is_primary_key():
+        column_type = ModelFieldType.INTEGER.get_column_type()
+    else:
+        column_type = field.field_type.get_column_type()
+
+    return column_type
+
+
 def _field_read_result_function_call(field, model, query_var, model_var, success_var):
     """Returns the function call to read a model field value from a query result"""
     if field.field_type.is_primitive_type():
@@ -144,26 +752,168 @@ def _field_read_result_function_call(field, model, query_var, model_var, success
     return result_call
 
 
+def _field_update_set_string(field, model, upsert):
+    """
+    Returns the assignment of the field's column in the SET clause of a column update. Updates
+    bind the field at its column position, while upserts take the value of the conflicting row.
+    """
+    if upsert:
+        return '"{0} = excluded.{0}"'.format(field.name)
+
+    return '"{} = ?{}"'.format(field.name, model.fields.index(field) + 1)
+
+
+def _field_view_length_member(field):
+    """Returns the name of the view member holding the length of the field's borrowed value"""
+    return '{}_len'.format(field.name)
+
+
+def _for_each_function_name(function_name):
+    """Returns the name of the function to visit each result of a select function"""
+    return function_name + '_for_each'
+
+
+def _index_create_query_var(index):
+    """Returns the name of the variable to hold the index's creation query"""
+    return '{}_INDEX_CREATE'.format(index.name.upper())
+
+
+def _migrate_batch_size(dataset):
+    """Returns the number of rows copied by each statement when the dataset's migration rebuilds a table"""
+    return _MIGRATE_BATCH_SIZE
+
+
+def _migrate_macro(dataset, name):
+    """Returns the name of a macro used to migrate the dataset's tables"""
+    return '{}_MIGRATE_{}'.format(dataset.name.upper(), name)
+
+
+def _migrate_name(dataset, name):
+    """Returns the name of a function or type used to migrate the dataset's tables"""
+    return '{}_migrate_{}'.format(dataset.name, name)
+
+
 def _model_add_to_result_list_function_name(model):
     """Returns the name of the function to add a model to a query result list"""
     return '{}_add_to_result_list'.format(model.name)
 
 
+def _model_batch_size_macro(model):
+    """Returns the name of the macro holding the model's default batch size for batched writes"""
+    return '{}_DEFAULT_BATCH_SIZE'.format(model.get_table_name().upper())
+
+
+def _model_bulk_insert_query_var(model):
+    """Returns the name of the variable to hold the model's multi-row insert query"""
+    return '{}_BULK_INSERT'.format(model.get_table_name().upper())
+
+
+def _model_bulk_insert_row_string(model):
+    """Returns the parameter list for a single row of a multi-row insert query"""
+    return '({})'.format(', '.join(['?'] * len(model.fields)))
+
+
+def _model_bulk_insert_rows(model):
+    """Returns the number of rows inserted by each statement of the model's multi-row inserts"""
+    return max(1, min(_BULK_INSERT_MAX_VARIABLES // len(model.fields), _BULK_INSERT_MAX_ROWS))
+
+
+def _model_bulk_insert_rows_macro(model):
+    """Returns the name of the macro holding the number of rows inserted by each multi-row insert statement"""
+    return '{}_BULK_INSERT_ROWS'.format(model.get_table_name().upper())
+
+
+def _model_bulk_insert_tail_query_string(model):
+    """Returns the query string to insert a single row left over after the multi-row inserts"""
+    return '"INSERT INTO {} VALUES {};"'.format(model.get_table_name(), _model_bulk_insert_row_string(model))
+
+
+def _model_bench_fill_function_name(model):
+    """Returns the name of the microbenchmark function to fill a model with synthetic values"""
+    return '{}_bench_fill'.format(model.name)
+
+
+def _model_bench_function_name(model):
+    """Returns the name of the microbenchmark function for a model's accessors"""
+    return '{}_bench'.format(model.name)
+
+
+def _model_cursor_close_function_name(model):
+    """Returns the name of the function to close a model cursor"""
+    return '{}_cursor_close'.format(model.get_table_name())
+
+
+def _model_cursor_next_function_name(model):
+    """Returns the name of the function to read the next model from a cursor"""
+    return '{}_cursor_next'.format(model.get_table_name())
+
+
+def _model_cursor_next_view_function_name(model):
+    """Returns the name of the function to read the next row of a model cursor as a borrowed view"""
+    return '{}_cursor_next_view'.format(model.get_table_name())
+
+
 def _model_delete_by_id_function_name(model):
     """Returns the name of the function to delete a model by id"""
     return '{}_delete_by_id'.format(model.get_table_name())
 
 
+def _model_delete_by_id_query_string(model):
+    """Returns the query string to delete a model record by its id"""
+    return '"DELETE FROM {} WHERE {} = ?;"'.format(model.get_table_name(), model.get_primary_key_field().name)
+
+
 def _model_find_by_id_function_name(model):
     """Returns the name of the function to find a model record by its id"""
     return '{}_find_by_id'.format(model.get_table_name())
 
 
+def _model_find_by_id_query_string(model):
+    """Returns the query string to find a model record by its id"""
+    return '"SELECT * FROM {} WHERE {} = ?;"'.format(model.get_table_name(), model.get_primary_key_field().name)
+
+
+def _model_find_many_by_id_function_name(model):
+    """Returns the name of the function to find a list of model records by their ids"""
+    return '{}_find_many_by_id'.format(model.get_table_name())
+
+
+def _model_find_many_by_id_query_string(model):
+    """Returns the query string to find a chunk of model records by their ids"""
+    return '"SELECT * FROM {} WHERE {} IN ({});"'.format(model.get_table_name(), model.get_primary_key_field().name,
+                                                        ', '.join(['?'] * _FIND_MANY_CHUNK_SIZE))
+
+
+def _model_find_many_chunk_size(model):
+    """Returns the number of ids looked up by each statement of the model's find-many-by-id function"""
+    return _FIND_MANY_CHUNK_SIZE
+
+
+def _model_find_many_chunk_size_macro(model):
+    """Returns the name of the macro holding the number of ids looked up by each find-many-by-id statement"""
+    return '{}_FIND_MANY_CHUNK_SIZE'.format(model.get_table_name().upper())
+
+
+def _model_migrate_columns_var(model):
+    """Returns the name of the constant describing the columns of the model's table to schema migration"""
+    return '{}_MIGRATE_COLUMNS'.format(model.get_table_name().upper())
+
+
 def _model_from_row_result_function_name(model):
     """Returns the name of the function to read a model from a query result"""
     return '{}_from_row_result'.format(model.name)
 
 
+def _model_field_mask_all_macro(model):
+    """Returns the name of the macro holding the field mask selecting all of the model's fields"""
+    return '{}_FIELD_ALL'.format(model.get_table_name().upper())
+
+
+def _model_has_field_mask(model):
+    """Returns True if every field of the model has a bit in a field mask"""
+    return len(model.fields) <= _FIELD_MASK_BITS
+
+
 def _model_insert_new_function_name(model):
     """Returns the name of the function to insert a new model object into the database"""
     return '{}_insert_new'.format(model.get_table_name())
@@ -178,6 +928,134 @@ def _model_insert_query_string(model):
     return query
 
 
+def _model_from_row_result_arena_function_name(model):
+    """Returns the name of the function to read a model from a query row result into a list arena"""
+    return '{}_from_row_result_arena'.format(model.name)
+
+
+def _model_select_columnar_function_name(model):
+    """Returns the name of the function to read all results of a select query into a columnar list"""
+    return '{}_select_columnar'.format(model.name)
+
+
+def _model_select_growable_function_name(model):
+    """Returns the name of the function to read all results of a select query into a growable list"""
+    return '{}_select_growable'.format(model.name)
+
+
+def _model_update_fields_query_size(model):
+    """Returns the size of the buffer needed to hold the model's longest column update query string"""
+    # Each query string part is quoted, and each assignment is separated by a comma and a space
+    set_length = sum(len(_field_update_set_string(field, model, upsert=True)) - 2 + len(', ')
+                     for field in model.fields if not field.is_primary_key())
+    update_length = len(_model_update_query_head(model)) - 2 + len(_model_update_query_tail(model)) - 2
+    upsert_length = len(_model_upsert_query_head(model)) - 2 + len('UPDATE SET ;')
+
+    return max(update_length, upsert_length) + set_length + 1
+
+
+def _model_update_query_head(model):
+    """Returns the start of the model's column update query, which is followed by the SET clause"""
+    return '"UPDATE {} SET "'.format(model.get_table_name())
+
+
+def _model_update_query_tail(model):
+    """Returns the end of the model's column update query, which follows the SET clause"""
+    primary_key = model.get_primary_key_field()
+
+    return '" WHERE {} = ?{};"'.format(primary_key.name, model.fields.index(primary_key) + 1)
+
+
+def _model_upsert_query_head(model):
+    """
+    Returns the start of the model's upsert query, which is followed by either a SET clause or
+    nothing
+    """
+    parameters = ', '.join('?{}'.format(idx + 1) for idx in range(len(model.fields)))
+
+    return '"INSERT INTO {} VALUES ({}) ON CONFLICT({}) DO "'.format(
+        model.get_table_name(), parameters, model.get_primary_key_field().name)
+
+
+def _model_stmt_ids(model, dataset):
+    """Returns the ids of all statements used by the model's accessor functions"""
+    query_stmt_vars = {
+        ModelQueryType.COUNT: ['count_query'],
+        ModelQueryType.DELETE: ['delete_query'],
+        ModelQueryType.FIND: ['find_query'],
+        ModelQueryType.PAGE: ['first_query', 'page_query'],
+        ModelQueryType.UPDATE: ['update_query'],
+    }
+
+    function_stmt_vars = [
+        (_model_delete_by_id_function_name(model), 'delete_query'),
+        (_model_find_by_id_function_name(model), 'find_query'),
+        (_model_find_many_by_id_function_name(model), 'find_query'),
+        (_model_insert_new_function_name(model), 'insert_query'),
+        (_model_save_existing_function_name(model), 'insert_query'),
+        (_models_count_all_function_name(model), 'count_query'),
+        (_models_delete_all_function_name(model), 'delete_query'),
+        (_models_insert_all_new_function_name(model), 'insert_query'),
+        (_models_save_all_function_name(model), 'insert_query'),
+        (_models_insert_all_new_batched_function_name(model), 'insert_query'),
+        (_models_insert_all_new_bulk_function_name(model), 'insert_query'),
+        (_models_insert_all_new_bulk_function_name(model), 'tail_query'),
+        (_models_save_all_batched_function_name(model), 'insert_query'),
+    ]
+    if dataset.options.zero_copy:
+        function_stmt_vars.append((_view_function_name(_model_find_by_id_function_name(model)), 'find_query'))
+    function_stmt_vars += _select_stmt_vars(_models_get_all_function_name(model), dataset)
+    for query in model.queries:
+        if query.query_type == ModelQueryType.SELECT:
+            function_stmt_vars += _select_stmt_vars(query.name, dataset)
+        else:
+            function_stmt_vars += [(query.name, stmt_var) for stmt_var in query_stmt_vars[query.query_type]]
+
+        if query.query_type == ModelQueryType.FIND and dataset.options.zero_copy:
+            function_stmt_vars.append((_view_function_name(query.name), 'find_query'))
+
+    if model.columnar:
+        function_stmt_vars.append((_columnar_function_name(_models_get_all_function_name(model)), 'select_query'))
+        function_stmt_vars += [(_columnar_function_name(query.name), 'select_query')
+                               for query in model.get_columnar_select_queries()]
+
+    return [_stmt_id(function_name, stmt_var) for function_name, stmt_var in function_stmt_vars]
+
+
+def _model_row_cache_bucket_cnt(model):
+    """Returns the number of hash buckets of the model's row cache, a power of two"""
+    if model.row_cache.max_entries:
+        wanted_cnt = model.row_cache.max_entries
+    else:
+        wanted_cnt = model.row_cache.max_bytes // _ROW_CACHE_BYTES_PER_BUCKET
+
+    bucket_cnt = 1
+    while bucket_cnt < min(wanted_cnt, _ROW_CACHE_MAX_BUCKETS):
+        bucket_cnt *= 2
+
+    return bucket_cnt
+
+
+def _model_row_cache_entry_c_type(model):
+    """Returns the name of the struct holding a record in the model's row cache"""
+    return '{}_row_cache_entry_t'.format(model.name)
+
+
+def _model_row_cache_function_name(model, name):
+    """Returns the name of a function to read, write or inspect the model's row cache"""
+    return '{}_row_cache_{}'.format(model.get_table_name(), name)
+
+
+def _model_row_cache_macro(model, name):
+    """Returns the name of a macro holding the bucket count or one of the bounds of the model's row cache"""
+    return '{}_ROW_CACHE_{}'.format(model.get_table_name().upper(), name)
+
+
+def _model_row_cache_member(model):
+    """Returns the name of the member of the dataset's row cache holding the model's records"""
+    return model.get_table_name()
+
+
 def _model_save_existing_function_name(model):
     """Returns the name of the function to save an existing model record into the database"""
     return '{}_save_existing'.format(model.get_table_name())
@@ -188,62 +1066,405 @@ def _models_count_all_function_name(model):
     return '{}_count_all'.format(model.get_table_name())
 
 
+def _models_count_all_query_string(model):
+    """Returns the query string to get the number of models in the database"""
+    return '"SELECT COUNT(*) FROM {};"'.format(model.get_table_name())
+
+
 def _models_delete_all_function_name(model):
     """Returns the name of the function to delete all models from the database"""
     return '{}_delete_all'.format(model.get_table_name())
 
 
+def _models_delete_all_query_string(model):
+    """Returns the query string to delete all models from the database"""
+    return '"DELETE FROM {};"'.format(model.get_table_name())
+
+
 def _models_get_all_function_name(model):
     """Returns the name of the function to retrieve all models from the database"""
     return '{}_get_all'.format(model.get_table_name())
 
 
+def _models_get_all_query_string(model):
+    """Returns the query string to retrieve all models from the database"""
+    return '"SELECT * FROM {};"'.format(model.get_table_name())
+
+
 def _models_insert_all_new_function_name(model):
     """Returns the name of the function to insert a list of models as new records"""
     return '{}_insert_all_new'.format(model.get_table_name())
 
 
+def _models_insert_all_new_bulk_function_name(model):
+    """Returns the name of the function to insert a list of models as new records with multi-row inserts"""
+    return '{}_insert_all_new_bulk'.format(model.get_table_name())
+
+
+def _models_insert_all_new_batched_function_name(model):
+    """Returns the name of the function to insert a list of models as new records in batched transactions"""
+    return '{}_insert_all_new_batched'.format(model.get_table_name())
+
+
+def _models_save_all_batched_function_name(model):
+    """Returns the name of the function to save a list of models as existing records in batched transactions"""
+    return '{}_save_all_existing_batched'.format(model.get_table_name())
+
+
 def _models_save_all_function_name(model):
     """Returns the name of the function to save a list of models as existing records"""
     return '{}_save_all_existing'.format(model.get_table_name())
 
 
+def _models_update_all_fields_function_name(model):
+    """Returns the name of the function to update selected columns of a list of existing records"""
+    return '{}_update_all_fields'.format(model.get_table_name())
+
+
+def _models_upsert_all_function_name(model):
+    """Returns the name of the function to insert a list of models, updating selected columns on conflict"""
+    return '{}_upsert_all'.format(model.get_table_name())
+
+
+def _page_key_bind_call(field, query, dataset, query_var, key_var):
+    """
+    Returns the function call to bind a key field of a page query's last result to the query
+    variable. Key parameters follow the query's own parameters.
+    """
+    position = len(query.params) + query.key_fields.index(field) + 1
+    if field.field_type.is_primitive_type():
+        bind_call_template = '{bind_function}( {query_var}, {position}, {key_var}->{field_name} )'
+    else:
+        bind_call_template = '{bind_function}( {query_var}, {position}, {key_var}->{field_name}, -1, {destructor} )'
+
+    bind_call = bind_call_template.format(bind_function=field.field_type.get_bind_function_name(),
+                                          query_var=query_var, position=position, key_var=key_var,
+                                          field_name=field.name,
+                                          destructor=_bind_destructor(dataset, field.field_type))
+    return _profile_bind_call(bind_call, field.field_type, '{}->{}'.format(key_var, field.name), dataset)
+
+
+def _page_limit_position(query, keyed):
+    """Returns the position of the LIMIT parameter of a page query's first or keyed query string"""
+    position = len(query.params) + 1
+    if keyed:
+        position += len(query.key_fields)
+
+    return position
+
+
+def _page_query_string(query, model, keyed):
+    """
+    Returns the query string to read a page of a page query's results. The keyed query string reads
+    the page following the result with the bound key, while the other reads the first page. Comparing
+    the key columns as a row value lets SQLite seek directly to the start of the page through an
+    index on them rather than stepping over every preceding result as OFFSET does.
+    """
+    conditions = []
+    where_condition = query.get_where_condition()
+    if where_condition:
+        conditions.append('( {} )'.format(where_condition))
+    if keyed:
+        conditions.append('( {columns} ) {operator} ( {params} )'.format(
+            columns=', '.join(field.name for field in query.key_fields),
+            operator='<' if query.descending else '>',
+            params=', '.join('?' for _ in query.key_fields)))
+
+    direction = ' DESC' if query.descending else ''
+    page_query = 'SELECT * FROM {table_name}{where_clause} ORDER BY {order} LIMIT ?'.format(
+        table_name=model.get_table_name(),
+        where_clause=' WHERE ' + ' AND '.join(conditions) if conditions else '',
+        order=', '.join(field.name + direction for field in query.key_fields))
+
+    return '"' + page_query + '"'
+
+
+def _pool_c_type(dataset):
+    """Returns the name of the dataset's connection pool type"""
+    return '{}_pool_t'.format(dataset.name)
+
+
+def _pool_function_name(dataset, name):
+    """Returns the name of a function to open, close or acquire connections from a connection pool"""
+    return '{}_pool_{}'.format(dataset.name, name)
+
+
+def _pool_pointer_type(dataset):
+    """Returns a string to declare a pointer to the dataset's connection pool type"""
+    return _pool_c_type(dataset) + ' *'
+
+
+def _pooled_variants_get(dataset):
+    """
+    Returns the pooled accessor variants to generate, which wrap the cached accessors with a
+    connection acquired from a connection pool
+    """
+    return [_POOLED_VARIANT] if dataset.options.connection_pool else []
+
+
+def _profile_bind_call(bind_call, field_type, value, dataset):
+    """
+    Returns the bind call wrapped so that profiling counts the bytes SQLite copies from a TEXT value.
+    Primitive values and values bound with SQLITE_STATIC are not copied, and BLOB values are not
+    counted, since they are bound without a known length.
+    """
+    if field_type != ModelFieldType.TEXT or dataset.options.zero_copy:
+        return bind_call
+
+    return '{}( {}, {} )'.format(_profile_macro(dataset, 'BIND'), bind_call, value)
+
+
+def _profile_name(dataset, name):
+    """
+    Returns the name of a private function, type or variable used to collect profiling statistics for
+    the dataset's accessors
+    """
+    return '{}_profile_{}'.format(dataset.name, name)
+
+
+def _profile_macro(dataset, name=None):
+    """
+    Returns the name of the macro that enables profiling of the dataset's accessors, or of one of the
+    profiling hook macros when a name is provided
+    """
+    macro = '{}_CDAL_PROFILE'.format(dataset.name.upper())
+    if name:
+        macro += '_' + name
+
+    return macro
+
+
 def _query_get_full_string(query, model):
     """Returns the full string for the query that can be executed on the database"""
     query_templates = {
         ModelQueryType.COUNT: 'SELECT COUNT(*) FROM {table_name} {query_string}',
-        ModelQueryType.FIND: 'SELECT * FROM {table_name} {query_string} LIMIT 1',
+        ModelQueryType.FIND: 'SELECT {columns} FROM {table_name} {query_string} LIMIT 1',
         ModelQueryType.DELETE: 'DELETE FROM {table_name} {query_string}',
-        ModelQueryType.SELECT: 'SELECT * FROM {table_name} {query_string}',
+        ModelQueryType.SELECT: 'SELECT {columns} FROM {table_name} {query_string}',
         ModelQueryType.UPDATE: 'UPDATE {table_name} {query_string}'
     }
     query_template = query_templates[query.query_type]
 
-    full_query_string = query_template.format(table_name=model.get_table_name(), query_string=query.query_string)
+    # Projection queries only select the columns of their result model, and aggregate queries
+    # compute each of them
+    if query.result_columns:
+        columns = ', '.join(query.result_columns)
+    elif query.result_model:
+        columns = ', '.join(field.name for field in query.result_model.fields)
+    else:
+        columns = '*'
+
+    full_query_string = query_template.format(table_name=model.get_table_name(), columns=columns,
+                                              query_string=query.query_string)
     return '"' + full_query_string + '"'
 
 
-def _query_param_bind_call(query_param, query_var):
-    """Returns the function call to bind a parameter to a custom query"""
+def _query_param_bench_value(query_param, model, row_var, value_var, text_var):
+    """
+    Returns the synthetic argument for a custom query parameter in the microbenchmark. A parameter
+    named after a model field takes that field's value from a stored row so that the query matches
+    it. Other parameters get the same synthetic values model fields of their type are filled with.
+    """
+    bench_values = {
+        ModelFieldType.PRIMARY_KEY: '{value_var} + 1',
+        ModelFieldType.FOREIGN_KEY: '{value_var} + 1',
+        ModelFieldType.INTEGER: '{value_var}',
+        ModelFieldType.REAL: '{value_var} * 0.5',
+        ModelFieldType.TEXT: '{text_var}',
+        ModelFieldType.BLOB: '{text_var}',
+    }
+
+    if query_param.name in (field.name for field in model.fields):
+        bench_value = '{}->{}'.format(row_var, query_param.name)
+    else:
+        bench_value = bench_values[query_param.param_type].format(value_var=value_var, text_var=text_var)
+
+    return bench_value
+
+
+def _query_param_bind_call(query_param, dataset, query_var, params_var=None):
+    """
+    Returns the function call to bind a parameter to a custom query. The parameter's value is read
+    from the struct pointed to by params_var when one is provided.
+    """
     if query_param.param_type.is_primitive_type():
-        bind_call_template ='{bind_function}( {query_var}, {param_position}, {param_name} )'
+        bind_call_template ='{bind_function}( {query_var}, {param_position}, {param_value} )'
     else:
-        bind_call_template ='{bind_function}( {query_var}, {param_position}, {param_name}, -1, SQLITE_TRANSIENT )'
+        bind_call_template ='{bind_function}( {query_var}, {param_position}, {param_value}, -1, {destructor} )'
 
+    param_value = '{}->{}'.format(params_var, query_param.name) if params_var else query_param.name
     bind_call = bind_call_template.format(bind_function=query_param.param_type.get_bind_function_name(),
                                           query_var=query_var, param_position=query_param.position,
-                                          param_name=query_param.name)
-    return bind_call
+                                          param_value=param_value,
+                                          destructor=_bind_destructor(dataset, query_param.param_type))
+    return _profile_bind_call(bind_call, query_param.param_type, param_value, dataset)
+
+
+def _row_cache_c_type(dataset):
+    """Returns the name of the dataset's row cache type"""
+    return '{}_row_cache_t'.format(dataset.name)
+
+
+def _row_cache_name(dataset, name):
+    """Returns the name of a function or private type used to keep records in the dataset's row cache"""
+    return '{}_row_cache_{}'.format(dataset.name, name)
+
+
+def _row_cache_pointer_type(dataset):
+    """Returns a string to declare a pointer to the dataset's row cache type"""
+    return _row_cache_c_type(dataset) + ' *'
+
+
+def _row_cache_stats_c_type(dataset):
+    """Returns the name of the type holding the hit and miss counters of a model's row cache"""
+    return '{}_row_cache_stats_t'.format(dataset.name)
+
+
+def _select_function_name(function_name, dataset, counted):
+    """
+    Returns the name of a select function for the counted or single-pass variant. When growable
+    selects are enabled, the counted variant is suffixed with '_exact'.
+    """
+    if counted and dataset.options.growable_select:
+        select_function_name = function_name + '_exact'
+    else:
+        select_function_name = function_name
+
+    return select_function_name
+
+
+def _select_stmt_vars(function_name, dataset):
+    """Returns the (function name, statement variable) pairs used by all variants of a select function"""
+    stmt_vars = [(_cursor_open_function_name(function_name), 'select_query')]
+    for counted in _select_variants_get(dataset):
+        select_function_name = _select_function_name(function_name, dataset, counted)
+        stmt_vars.append((select_function_name, 'select_query'))
+        if counted:
+            stmt_vars.append((select_function_name, 'count_query'))
+
+    return stmt_vars
 
 
 def _select_query_get_count_query_string(query, model):
     """Returns the count query string that returns the number of results that will be read by a select query"""
-    count_query = 'SELECT COUNT(*) FROM {table_name} {query_string}'.format(
-        table_name=model.get_table_name(), query_string=query.query_string)
-    
+    # A grouped query reads one row per group, so count its groups rather than its rows
+    if query.is_grouped():
+        count_template = 'SELECT COUNT(*) FROM (SELECT 1 FROM {table_name} {query_string})'
+    else:
+        count_template = 'SELECT COUNT(*) FROM {table_name} {query_string}'
+    count_query = count_template.format(table_name=model.get_table_name(), query_string=query.query_string)
+
     return '"' + count_query + '"'
 
 
+def _select_variants_get(dataset):
+    """
+    Returns the select variants to generate. Each variant is a flag indicating whether the select
+    counts its results before reading them rather than reading them into a growable list.
+    """
+    if dataset.options.growable_select:
+        variants = [False, True]
+    else:
+        variants = [True]
+
+    return variants
+
+
+def _stats_c_type(dataset):
+    """Returns the name of the type holding the profiling statistics of an accessor function"""
+    return '{}_stats_t'.format(dataset.name)
+
+
+def _stats_get_function_name(dataset):
+    """Returns the name of the function to get the calling thread's accessor profiling statistics"""
+    return '{}_stats_get'.format(dataset.name)
+
+
+def _stats_reset_function_name(dataset):
+    """Returns the name of the function to reset the calling thread's accessor profiling statistics"""
+    return '{}_stats_reset'.format(dataset.name)
+
+
+def _stmt_cache_c_type(dataset):
+    """Returns the name of the dataset's statement cache type"""
+    return '{}_stmt_cache_t'.format(dataset.name)
+
+
+def _stmt_cache_close_function_name(dataset):
+    """Returns the name of the function to finalize all statements held by a statement cache"""
+    return '{}_stmt_cache_close'.format(dataset.name)
+
+
+def _stmt_cache_get_function_name(dataset):
+    """Returns the name of the function to get a prepared statement from a statement cache"""
+    return '{}_stmt_cache_get'.format(dataset.name)
+
+
+def _stmt_cache_open_function_name(dataset):
+    """Returns the name of the function to create a statement cache for a database connection"""
+    return '{}_stmt_cache_open'.format(dataset.name)
+
+
+def _stmt_cache_pointer_type(dataset):
+    """Returns a string to declare a pointer to the dataset's statement cache type"""
+    return _stmt_cache_c_type(dataset) + ' *'
+
+
+def _stmt_cache_release_function_name(dataset):
+    """Returns the name of the function to return a prepared statement to a statement cache"""
+    return '{}_stmt_cache_release'.format(dataset.name)
+
+
+def _stmt_cache_rows_set_function_name(dataset):
+    """Returns the name of the function to attach a row cache to a statement cache"""
+    return '{}_stmt_cache_rows_set'.format(dataset.name)
+
+
+def _stmt_cnt_macro(dataset):
+    """Returns the name of the macro holding the number of statements in the statement cache"""
+    return '{}_CDAL_STMT_CNT'.format(dataset.name.upper())
+
+
+def _stmt_id(function_name, stmt_var):
+    """Returns the statement cache id for the statement held in stmt_var by the specified function"""
+    return '{}_{}_STMT'.format(function_name, stmt_var).upper()
+
+
+def _stmt_prepare_call(query_string, dataset, function_name, stmt_var, cached):
+    """
+    Returns the function call to prepare a statement. Cached accessors take the statement from
+    the statement cache, only preparing it the first time it is used.
+    """
+    if cached:
+        prepare_call = '{get_function}( cache, {stmt_id}, {query_string}, &{stmt_var} )'.format(
+            get_function=_stmt_cache_get_function_name(dataset), stmt_id=_stmt_id(function_name, stmt_var),
+            query_string=query_string, stmt_var=stmt_var)
+    else:
+        prepare_call = 'sqlite3_prepare_v2( db, {query_string}, -1, &{stmt_var}, NULL )'.format(
+            query_string=query_string, stmt_var=stmt_var)
+
+    return '{}( {} )'.format(_profile_macro(dataset, 'PREPARE'), prepare_call)
+
+
+def _stmt_release_call(stmt_var, dataset, function_name, cached):
+    """
+    Returns the function call to release a statement once an accessor is done with it. Cached
+    accessors return the statement to the statement cache rather than finalizing it.
+    """
+    if cached:
+        release_call = '{}( cache, {}, {} )'.format(_stmt_cache_release_function_name(dataset),
+                                                   _stmt_id(function_name, stmt_var), stmt_var)
+    else:
+        release_call = 'sqlite3_finalize( {} )'.format(stmt_var)
+
+    return '{}( {} )'.format(_profile_macro(dataset, 'FINALIZE'), release_call)
+
+
 def _table_create_query_var(model):
     """Returns the name of the variable to hold the model's table creation query"""
     return '{}_TABLE_CREATE'.format(model.get_table_name().upper())
+
+
+def _view_function_name(function_name):
+    """Returns the name of the function to read the result of a find function as a borrowed view"""
+    return function_name + '_view'
@@ -1,28 +1,44 @@
 """Generates files to define and work with C structs corresponding to dataset models"""
+import functools
 import os
 import codegen.templates as templates
 
 
+def ctypes_file_paths_get(dataset, output_dir, split=False):
+    """
+    Returns the paths of the C types header and source files in the specified output directory, with one
+    source file per model if split
+    """
+    output_paths = [os.path.join(output_dir, _header_name_get(dataset)),
+                    os.path.join(output_dir, _source_name_get(dataset))]
+    if split:
+        output_paths += [os.path.join(output_dir, _model_source_name_get(dataset, model)) for model in dataset.models]
+
+    return output_paths
+
+
 def ctypes_header_file_create(dataset, output_dir, custom_includes=None):
-    """Creates the C types header file in the specified output directory"""
+    """Creates the C types header file in the specified output directory and returns its path"""
     output_path = os.path.join(output_dir, _header_name_get(dataset))
     contents = ctypes_header_render(dataset, custom_includes)
 
     templates.file_write_all_data(output_path, contents)
 
+    return output_path
+
 
 def ctypes_header_render(dataset, custom_includes=None):
     """Renders the C types header for the provided dataset and returns the rendered string"""
     includes = {'<sqlite3.h>'}
+    has_length_members = any((dataset.has_length_member(field) for model in dataset.get_struct_models()
+                              for field in model.fields))
+    if dataset.options.arena_lists or dataset.has_columnar_values() or has_length_members:
+        includes.add('<stddef.h>')
     if custom_includes:
         includes = includes | custom_includes
 
-    env = templates.environment_create()
-    env.filters['header_guard_macro'] = _header_guard_macro_get
-    env.filters['header_name'] = _header_name_get
-
-    template_file = templates.template_file_get(templates.CDALTemplate.C_TYPES_HEADER)
-    return env.get_template(template_file).render(dataset=dataset, includes=includes)
+    # Includes are sorted so that unchanged definitions render identical files
+    return _header_template_get().render(dataset=dataset, includes=sorted(includes))
 
 
 def ctypes_header_include_get(dataset):
@@ -30,25 +46,59 @@ def ctypes_header_include_get(dataset):
     return '"{}"'.format(_header_name_get(dataset))
 
 
-def ctypes_source_file_create(dataset, output_dir, custom_includes=None):
-    """Creates the C types source file in the specified output directory"""
+def ctypes_model_source_files_create(dataset, output_dir, custom_includes=None):
+    """
+    Creates one C types source file for each model of the dataset in the specified output directory and
+    returns their paths
+    """
+    output_paths = []
+    for model in dataset.models:
+        output_path = os.path.join(output_dir, _model_source_name_get(dataset, model))
+        contents = ctypes_model_source_render(dataset, model, custom_includes)
+
+        templates.file_write_all_data(output_path, contents)
+        output_paths.append(output_path)
+
+    return output_paths
+
+
+def ctypes_model_source_render(dataset, model, custom_includes=None):
+    """
+    Renders the C types source file for a single model of the dataset, for datasets split into one source
+    file per model, and returns the rendered string
+    """
+    return _source_render(dataset, _model_source_name_get(dataset, model), [model], True, custom_includes)
+
+
+def ctypes_source_file_create(dataset, output_dir, custom_includes=None, split=False):
+    """Creates the C types source file in the specified output directory and returns its path"""
     output_path = os.path.join(output_dir, _source_name_get(dataset))
-    contents = ctypes_source_render(dataset, custom_includes)
+    contents = ctypes_source_render(dataset, custom_includes, split)
 
     templates.file_write_all_data(output_path, contents)
 
+    return output_path
 
-def ctypes_source_render(dataset, custom_includes=None):
-    """Renders the C types source file for the provided dataset and returns the rendered string"""
-    includes = {'<stdlib.h>', '<string.h>', ctypes_header_include_get(dataset)}
-    if custom_includes:
-        includes = includes | custom_includes
 
-    env = templates.environment_create()
-    env.filters['source_name'] = _source_name_get
+def ctypes_source_render(dataset, custom_includes=None, split=False):
+    """
+    Renders the C types source file for the provided dataset and returns the rendered string. When split,
+    the file only holds the functions shared by all models, and the functions of each model are rendered by
+    ctypes_model_source_render.
+    """
+    source_models = [] if split else dataset.models
+
+    return _source_render(dataset, _source_name_get(dataset), source_models, split, custom_includes)
+
+
+def _arena_block_size_macro_get(dataset):
+    """Returns the name of the macro for the size of the first block of a list arena"""
+    return '{}_CDAL_ARENA_BLOCK_SIZE'.format(dataset.name.upper())
 
-    template_file = templates.template_file_get(templates.CDALTemplate.C_TYPES_SOURCE)
-    return env.get_template(template_file).render(dataset=dataset, includes=includes)
+
+def _arena_struct_tag_get(dataset):
+    """Returns the tag of the struct for a block of a list arena"""
+    return '{}_arena_s'.format(dataset.name)
 
 
 def _header_guard_macro_get(dataset):
@@ -61,6 +111,51 @@ def _header_name_get(dataset):
     return '{}.cdal.h'.format(dataset.name)
 
 
+@functools.lru_cache(maxsize=None)
+def _header_template_get():
+    """Returns the C types header template, compiled once and shared by all renders"""
+    env = templates.environment_create()
+    env.filters['arena_struct_tag'] = _arena_struct_tag_get
+    env.filters['header_guard_macro'] = _header_guard_macro_get
+    env.filters['header_name'] = _header_name_get
+
+    template_file = templates.template_file_get(templates.CDALTemplate.C_TYPES_HEADER)
+    return env.get_template(template_file)
+
+
+def _model_source_name_get(dataset, model):
+    """Returns the name for the C types source file for one of the dataset's models"""
+    return '{}.cdal.{}.c'.format(dataset.name, model.get_table_name())
+
+
 def _source_name_get(dataset):
     """Returns the name for the C types source file for the provided dataset"""
-    return '{}.cdal.c'.format(dataset.name)
\ No newline at end of file
+    return '{}.cdal.c'.format(dataset.name)
+
+
+def _source_render(dataset, source_file_name, source_models, split, custom_includes):
+    """
+    Renders a C types source file holding the functions of the provided models. Unless split, the file also
+    holds the functions shared by all models.
+    """
+    includes = {'<stdlib.h>', '<string.h>', ctypes_header_include_get(dataset)}
+    if custom_includes:
+        includes = includes | custom_includes
+
+    source_projection_models = [query.result_model for model in source_models for query in model.queries
+                                if query.result_model]
+
+    return _source_template_get().render(dataset=dataset, includes=sorted(includes),
+                                         shared_source=not split or not source_models,
+                                         source_file_name=source_file_name, source_models=source_models,
+                                         source_projection_models=source_projection_models)
+
+
+@functools.lru_cache(maxsize=None)
+def _source_template_get():
+    """Returns the C types source template, compiled once and shared by all renders"""
+    env = templates.environment_create()
+    env.filters['arena_block_size_macro'] = _arena_block_size_macro_get
+
+    template_file = templates.template_file_get(templates.CDALTemplate.C_TYPES_SOURCE)
+    return env.get_template(template_file)
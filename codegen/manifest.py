@@ -0,0 +1,168 @@
+"""Tracks the files generated from each dataset definition, so that unchanged definitions are not regenerated"""
+import functools
+import hashlib
+import json
+import os
+
+from codegen import templates
+
+
+_MANIFEST_FILE_NAME = '.cdal.manifest.json'
+
+# Bumped whenever the layout of the manifest file changes
+_MANIFEST_VERSION = 1
+
+_GENERATOR_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SCHEMA_FILE_NAME = 'dataset.schema.json'
+
+
+class ManifestError(Exception):
+    """Base class for exceptions related to conflicting outputs recorded in a manifest"""
+    pass
+
+
+class Manifest:
+    """
+    Represents the manifest of an output directory, which records the content hash of every definition
+    generated into the directory along with the content hash, size and modification time of each of
+    its output files. A definition is up to date when neither it, its generation options, the
+    generator itself nor any of its outputs changed since it was last generated.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self._definitions = {}
+
+        manifest_path = self._path_get()
+        if os.path.isfile(manifest_path):
+            try:
+                with open(manifest_path) as manifest_file:
+                    manifest = json.load(manifest_file)
+            except ValueError:
+                manifest = {}
+
+            if manifest.get('version') == _MANIFEST_VERSION and manifest.get('generator') == generator_hash_get():
+                self._definitions = manifest.get('definitions', {})
+
+    def __repr__(self):
+        return 'Manifest(output_dir={}, definitions={})'.format(self.output_dir, self._definitions)
+
+    def is_up_to_date(self, definition_path, definition_hash, options):
+        """Returns True if the definition was generated with the same options and its outputs are unchanged"""
+        entry = self._definitions.get(os.path.abspath(definition_path))
+        if not entry or entry['hash'] != definition_hash or entry['options'] != options:
+            return False
+
+        for output_name, output in entry['outputs'].items():
+            try:
+                output_stat = os.stat(os.path.join(self.output_dir, output_name))
+            except OSError:
+                return False
+
+            if output_stat.st_size != output['size'] or output_stat.st_mtime_ns != output['mtime_ns']:
+                return False
+
+        return True
+
+    def outputs_check(self, definition_path, output_paths):
+        """
+        Checks that none of the outputs the definition is about to generate were generated from another
+        definition, and raises a ManifestError otherwise. Definitions whose files no longer exist, such as
+        renamed definitions, give up their outputs.
+        """
+        definition_path = os.path.abspath(definition_path)
+        for output_path in output_paths:
+            output_name = os.path.relpath(output_path, self.output_dir)
+            owner_path = self._output_owner_get(output_name, definition_path)
+            if owner_path and os.path.isfile(owner_path):
+                raise ManifestError('Output {} of {} is already generated from {}'.format(
+                    output_name, definition_path, owner_path))
+            elif owner_path:
+                del self._definitions[owner_path]
+
+    def outputs_record(self, definition_path, definition_hash, options, output_paths):
+        """
+        Records the outputs generated from the definition and returns the number of outputs whose contents
+        changed since the definition was last generated. Outputs from the last generation that were not
+        generated again, such as the source files of removed models, are deleted so that builds do not pick
+        them up, and count as changed.
+        """
+        definition_path = os.path.abspath(definition_path)
+        previous_outputs = self._definitions.get(definition_path, {}).get('outputs', {})
+
+        outputs = {}
+        changed_cnt = 0
+        for output_path in output_paths:
+            with open(output_path, 'rb') as output_file:
+                output_hash = content_hash_get(output_file.read())
+            output_stat = os.stat(output_path)
+
+            output_name = os.path.relpath(output_path, self.output_dir)
+            outputs[output_name] = {'hash': output_hash, 'size': output_stat.st_size,
+                                    'mtime_ns': output_stat.st_mtime_ns}
+            if previous_outputs.get(output_name, {}).get('hash') != output_hash:
+                changed_cnt += 1
+
+        self._definitions[definition_path] = {'hash': definition_hash, 'options': options, 'outputs': outputs}
+
+        current_output_names = set()
+        for entry in self._definitions.values():
+            current_output_names.update(entry['outputs'])
+
+        for output_name in previous_outputs:
+            stale_output_path = os.path.join(self.output_dir, output_name)
+            if output_name not in current_output_names and os.path.isfile(stale_output_path):
+                os.remove(stale_output_path)
+                changed_cnt += 1
+
+        return changed_cnt
+
+    def save(self):
+        """Writes the manifest into its output directory"""
+        manifest = {'version': _MANIFEST_VERSION, 'generator': generator_hash_get(),
+                    'definitions': self._definitions}
+        templates.file_write_all_data(self._path_get(), json.dumps(manifest, indent=4, sort_keys=True))
+
+    def _output_owner_get(self, output_name, definition_path):
+        """Returns the path of the other definition the output was generated from, or None if there is none"""
+        for other_definition_path, entry in self._definitions.items():
+            if other_definition_path != definition_path and output_name in entry['outputs']:
+                return other_definition_path
+
+        return None
+
+    def _path_get(self):
+        """Returns the path to the manifest file"""
+        return os.path.join(self.output_dir, _MANIFEST_FILE_NAME)
+
+
+def content_hash_get(data):
+    """Returns the hash identifying the provided bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def generator_hash_get():
+    """
+    Returns the hash identifying the generator, covering its code, schema and templates, so that
+    outputs are regenerated whenever any of them change
+    """
+    codegen_directory = os.path.join(_GENERATOR_DIRECTORY, 'codegen')
+    templates_directory = templates.templates_directory_get()
+
+    generator_files = [os.path.join(_GENERATOR_DIRECTORY, _SCHEMA_FILE_NAME)]
+    generator_files += [os.path.join(_GENERATOR_DIRECTORY, file_name)
+                        for file_name in sorted(os.listdir(_GENERATOR_DIRECTORY)) if file_name.endswith('.py')]
+    generator_files += [os.path.join(codegen_directory, file_name)
+                        for file_name in sorted(os.listdir(codegen_directory)) if file_name.endswith('.py')]
+    generator_files += [os.path.join(templates_directory, file_name)
+                        for file_name in sorted(os.listdir(templates_directory))]
+
+    generator_hash = hashlib.sha256()
+    for generator_file_path in generator_files:
+        if os.path.isfile(generator_file_path):
+            generator_hash.update(os.path.relpath(generator_file_path, _GENERATOR_DIRECTORY).encode())
+            with open(generator_file_path, 'rb') as generator_file:
+                generator_hash.update(generator_file.read())
+
+    return generator_hash.hexdigest()
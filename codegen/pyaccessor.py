@@ -0,0 +1,194 @@
+"""Generates a Python module to read a dataset's models and query results into NumPy arrays"""
+import functools
+import os
+
+from codegen import templates
+from dataset import ModelFieldType, ModelQueryType
+
+
+# Number of rows the generated module fetches from a query at a time
+_FETCH_BATCH_SIZE = 1024
+
+# Default size of the statement cache of Python's sqlite3 connections
+_STMT_CACHE_MIN_SIZE = 128
+
+
+def pyaccessor_module_file_create(dataset, output_dir):
+    """Generates and writes the dataset's Python accessor module to the output directory and returns its path"""
+    output_path = pyaccessor_module_file_path_get(dataset, output_dir)
+    contents = pyaccessor_module_render(dataset)
+
+    templates.file_write_all_data(output_path, contents)
+
+    return output_path
+
+
+def pyaccessor_module_file_path_get(dataset, output_dir):
+    """Returns the path of the dataset's Python accessor module in the output directory"""
+    return os.path.join(output_dir, _module_name_get(dataset))
+
+
+def pyaccessor_module_render(dataset):
+    """Renders the Python accessor module for the provided dataset and returns the rendered string"""
+    return _module_template_get().render(dataset=dataset, module_name=_module_name_get(dataset),
+                                         fetch_batch_size=_FETCH_BATCH_SIZE,
+                                         stmt_cache_size=_stmt_cache_size_get(dataset))
+
+
+def _connection_timeout(dataset):
+    """Returns the number of seconds a connection waits for a locked database, or None for sqlite3's default"""
+    if dataset.connection and dataset.connection.busy_timeout is not None:
+        timeout = dataset.connection.busy_timeout / 1000
+    else:
+        timeout = None
+
+    return timeout
+
+
+def _field_dtype(field):
+    """
+    Returns the NumPy type of a model field. Text fields with a maximum length get a fixed-length string
+    type, and all other text and blob fields are held as Python objects.
+    """
+    dtypes = {
+        ModelFieldType.PRIMARY_KEY: 'np.int64',
+        ModelFieldType.FOREIGN_KEY: 'np.int64',
+        ModelFieldType.INTEGER: 'np.int64',
+        ModelFieldType.REAL: 'np.float64',
+    }
+
+    if field.field_type.is_primitive_type():
+        dtype = dtypes[field.field_type]
+    elif field.field_type == ModelFieldType.TEXT and field.has_max_length():
+        dtype = "'U{}'".format(field.max_length)
+    else:
+        dtype = 'object'
+
+    return dtype
+
+
+def _field_select_column(field):
+    """
+    Returns the expression selecting a field's value from its column. NULL values of primitive and
+    fixed-length text fields are read as 0 or as empty strings, as by the C accessors, since NumPy
+    cannot store None in their arrays.
+    """
+    if field.field_type.is_primitive_type():
+        select_column = 'IFNULL({}, 0)'.format(field.name)
+    elif field.field_type == ModelFieldType.TEXT and field.has_max_length():
+        select_column = "IFNULL({}, '')".format(field.name)
+    else:
+        select_column = field.name
+
+    return select_column
+
+
+def _model_count_all_query(model):
+    """Returns the query string to get the number of models in the database"""
+    return 'SELECT COUNT(*) FROM {};'.format(model.get_table_name())
+
+
+def _model_dtype_name(model):
+    """Returns the name of the module constant holding the NumPy structured type of a model"""
+    return '{}_DTYPE'.format(model.name.upper())
+
+
+def _model_find_by_id_query(model):
+    """Returns the query string to find a model record by its id"""
+    return 'SELECT {} FROM {} WHERE {} = ?;'.format(_model_select_columns(model), model.get_table_name(),
+                                                   model.get_primary_key_field().name)
+
+
+def _model_get_all_query(model):
+    """Returns the query string to retrieve all models from the database"""
+    return 'SELECT {} FROM {};'.format(_model_select_columns(model), model.get_table_name())
+
+
+def _model_select_columns(model):
+    """Returns the columns selected to read a model"""
+    return ', '.join(_field_select_column(field) for field in model.fields)
+
+
+def _module_name_get(dataset):
+    """Returns the name of the dataset's Python accessor module"""
+    return '{}_cdal.py'.format(dataset.name)
+
+
+@functools.lru_cache(maxsize=None)
+def _module_template_get():
+    """Returns the Python accessor module template, compiled once and shared by all renders"""
+    env = templates.environment_create()
+    env.filters['connection_timeout'] = _connection_timeout
+    env.filters['field_dtype'] = _field_dtype
+    env.filters['model_count_all_query'] = _model_count_all_query
+    env.filters['model_dtype_name'] = _model_dtype_name
+    env.filters['model_find_by_id_query'] = _model_find_by_id_query
+    env.filters['model_get_all_query'] = _model_get_all_query
+    env.filters['py_string'] = _py_string
+    env.filters['query_full_string'] = _query_full_string
+    env.filters['query_params_tuple'] = _query_params_tuple
+    env.filters['query_string_name'] = _query_string_name
+
+    template_file = templates.template_file_get(templates.CDALTemplate.PYTHON_ACCESSOR)
+    return env.get_template(template_file)
+
+
+def _py_string(value):
+    """Returns the Python string literal for the provided value"""
+    return repr(value)
+
+
+def _query_full_string(query, model):
+    """Returns the full string for a custom select, find or count query that can be executed on the database"""
+    query_templates = {
+        ModelQueryType.COUNT: 'SELECT COUNT(*) FROM {table_name} {query_string}',
+        ModelQueryType.FIND: 'SELECT {columns} FROM {table_name} {query_string} LIMIT 1',
+        ModelQueryType.SELECT: 'SELECT {columns} FROM {table_name} {query_string}',
+    }
+
+    # Aggregate queries compute each field of their result model as a column named after the field, so
+    # their results are read from a subquery to select each computed column by name
+    if query.result_columns:
+        columns = ', '.join(query.result_columns)
+    else:
+        columns = _model_select_columns(query.get_result_model(model))
+
+    full_query_string = query_templates[query.query_type].format(table_name=model.get_table_name(), columns=columns,
+                                                                 query_string=query.query_string)
+    if query.result_columns:
+        full_query_string = 'SELECT {} FROM ({})'.format(_model_select_columns(query.result_model),
+                                                         full_query_string)
+
+    return full_query_string
+
+
+def _query_params_tuple(query):
+    """Returns the tuple of a custom query's parameters to execute it with"""
+    param_names = [query_param.name for query_param in query.params]
+    if len(param_names) == 1:
+        params_tuple = '({},)'.format(param_names[0])
+    else:
+        params_tuple = '({})'.format(', '.join(param_names))
+
+    return params_tuple
+
+
+def _query_string_name(function_name):
+    """Returns the name of the module constant holding the query string of an accessor function"""
+    return '_{}_QUERY'.format(function_name.upper())
+
+
+def _stmt_cache_size_get(dataset):
+    """
+    Returns the number of compiled statements each connection keeps, which is enough to keep every query
+    of the module prepared
+    """
+    query_strings = set()
+    for model in dataset.models:
+        query_strings.update([_model_count_all_query(model), _model_find_by_id_query(model),
+                              _model_get_all_query(model)])
+        query_strings.update(_query_full_string(query, model) for query in model.queries
+                             if query.query_type in (ModelQueryType.COUNT, ModelQueryType.FIND,
+                                                     ModelQueryType.SELECT))
+
+    return max(len(query_strings), _STMT_CACHE_MIN_SIZE)
@@ -1,10 +1,14 @@
 """Manages rendering templates"""
 import os
 from enum import Enum
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
 
-_TEMPLATES_DIRECTORY = 'templates'
+_TEMPLATES_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+# Compiled templates are kept in the system temporary directory, so that later runs of the tool
+# skip compiling templates that have not changed since
+_BYTECODE_CACHE = FileSystemBytecodeCache()
 
 
 class CDALTemplate(Enum):
@@ -12,23 +16,38 @@ class CDALTemplate(Enum):
     C_TYPES_SOURCE = 2
     ACCESSOR_HEADER = 3
     ACCESSOR_SOURCE = 4
+    ACCESSOR_BENCH = 5
+    PYTHON_ACCESSOR = 6
 
 
 def environment_create():
     """Creates an environment that can be used to render templates"""
-    env = Environment(loader=FileSystemLoader(_TEMPLATES_DIRECTORY),
-                      trim_blocks=True, lstrip_blocks=True)
+    env = Environment(loader=FileSystemLoader(_TEMPLATES_DIRECTORY), bytecode_cache=_BYTECODE_CACHE,
+                      auto_reload=False, trim_blocks=True, lstrip_blocks=True)
 
     return env
 
 
 def file_write_all_data(file_path, data):
-    """Writes all data to the specified file path"""
+    """
+    Writes all data to the specified file path. A file that already holds the data is left untouched,
+    so that build tools do not rebuild it.
+    """
     os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    if os.path.isfile(file_path):
+        with open(file_path) as existing_file:
+            if existing_file.read() == data:
+                return
+
     with open(file_path, 'w') as output_file:
         output_file.write(data)
 
 
+def templates_directory_get():
+    """Returns the path to the directory holding the template files"""
+    return _TEMPLATES_DIRECTORY
+
+
 def template_file_get(template):
     """Returns the path to the file for the specified template"""
     template_files = {
@@ -36,6 +55,8 @@ def template_file_get(template):
         CDALTemplate.C_TYPES_SOURCE: 'ctypes.c',
         CDALTemplate.ACCESSOR_HEADER: 'accessor.h',
         CDALTemplate.ACCESSOR_SOURCE: 'accessor.c',
+        CDALTemplate.ACCESSOR_BENCH: 'bench.c',
+        CDALTemplate.PYTHON_ACCESSOR: 'accessor.py.jinja',
     }
     template_file = template_files[template]
 
@@ -1,7 +1,15 @@
 """Defines classes to represent a cDAL dataset"""
+import re
 from enum import Enum
 
 
+# Matches the WHERE clause of a query string up to any trailing GROUP BY, ORDER BY, or LIMIT clause
+_QUERY_WHERE_CLAUSE_RE = re.compile(r'\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|$)',
+                                    re.IGNORECASE | re.DOTALL)
+_QUERY_IDENTIFIER_RE = re.compile(r'[A-Za-z_]\w*')
+_QUERY_GROUP_BY_RE = re.compile(r'\bGROUP\s+BY\b', re.IGNORECASE)
+
+
 class ModelFieldType(Enum):
     """Specifies the possible types for a model field"""
     PRIMARY_KEY = 'PrimaryKey'
@@ -65,32 +73,157 @@ class ModelQueryType(Enum):
     COUNT = 2
     DELETE = 3
     UPDATE = 4
+    PAGE = 5
+
+
+class ConnectionProfile:
+    """
+    Represents the settings applied to each connection to a dataset's database. Settings that are
+    None are left at SQLite's defaults.
+    """
+
+    def __init__(self, journal_mode=None, synchronous=None, cache_size=None, mmap_size=None, temp_store=None,
+                 page_size=None, busy_timeout=None, optimize_on_close=False):
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.temp_store = temp_store
+        self.page_size = page_size
+        self.busy_timeout = busy_timeout
+        self.optimize_on_close = optimize_on_close
+
+    def __repr__(self):
+        return ('ConnectionProfile(journal_mode={},synchronous={},cache_size={},mmap_size={},temp_store={},'
+                'page_size={},busy_timeout={},optimize_on_close={})').format(
+                    self.journal_mode, self.synchronous, self.cache_size, self.mmap_size, self.temp_store,
+                    self.page_size, self.busy_timeout, self.optimize_on_close)
+
+    def get_pragmas(self):
+        """
+        Returns the PRAGMA statements applying the profile's settings. The page size is set first,
+        since it can no longer be changed once the database is in WAL mode.
+        """
+        settings = [
+            ('page_size', self.page_size),
+            ('journal_mode', self.journal_mode),
+            ('synchronous', self.synchronous),
+            ('cache_size', self.cache_size),
+            ('mmap_size', self.mmap_size),
+            ('temp_store', self.temp_store),
+        ]
+
+        return ['PRAGMA {} = {};'.format(name, value) for name, value in settings if value is not None]
 
 
 class Dataset:
     """Represents a dataset to be stored in a single database"""
 
-    def __init__(self, name, models):
+    def __init__(self, name, models, options=None, connection=None):
         self.name = name
         self.models = models
+        self.options = options if options else DatasetOptions()
+        self.connection = connection
+
+    def __repr__(self):
+        return 'Dataset(name={},models={},options={},connection={})'.format(
+            self.name, self.models, self.options, self.connection)
+
+    def get_arena_alloc_function_name(self):
+        """Returns the name of the function to allocate memory from a list arena"""
+        return self.name + '_arena_alloc'
+
+    def get_arena_c_type(self):
+        """Returns the name of the struct for a block of a list arena"""
+        return self.name + '_arena_t'
+
+    def get_arena_free_function_name(self):
+        """Returns the name of the function to free all blocks of a list arena"""
+        return self.name + '_arena_free'
+
+    def get_arena_pointer_type(self):
+        """Returns a string to declare a pointer to a block of a list arena"""
+        return self.get_arena_c_type() + ' *'
+
+    def get_row_cache_models(self):
+        """Returns the models that keep recently found records in a row cache"""
+        return [model for model in self.models if model.row_cache]
+
+    def get_projection_models(self):
+        """Returns the models for the result rows of all projection queries in the dataset"""
+        projection_models = []
+        for model in self.models:
+            projection_models += [query.result_model for query in model.queries if query.result_model]
+
+        return projection_models
+
+    def has_columnar_values(self):
+        """Returns True if any columnar model has TEXT or BLOB fields, whose values are read into byte buffers"""
+        return any((not field.field_type.is_primitive_type() for model in self.models if model.columnar
+                    for field in model.fields))
+
+    def has_dynamic_fields(self):
+        """Returns True if any model with a generated C struct has dynamically-allocated fields"""
+        return any((model.has_dynamic_fields() for model in self.get_struct_models()))
+
+    def has_length_member(self, field):
+        """
+        Returns True if models hold the length of the field's value in a separate member. Zero-copy
+        datasets hold the length of dynamically-allocated BLOB values, so they can be bound without copying.
+        """
+        return self.options.zero_copy and field.field_type == ModelFieldType.BLOB and field.is_dynamically_allocated()
+
+    def get_struct_models(self):
+        """
+        Returns all models that have a generated C struct. This includes the dataset's models as
+        well as the models for the result rows of projection queries.
+        """
+        return self.models + self.get_projection_models()
+
+
+class DatasetOptions:
+    """Represents the optional code generation settings for a dataset"""
+
+    def __init__(self, statement_cache=False, growable_select=False, select_capacity_hint=16, arena_lists=False,
+                 zero_copy=False, connection_pool=False, schema_migration=False):
+        self.statement_cache = statement_cache
+        self.growable_select = growable_select
+        self.select_capacity_hint = select_capacity_hint
+        self.arena_lists = arena_lists
+        self.zero_copy = zero_copy
+        self.connection_pool = connection_pool
+        self.schema_migration = schema_migration
 
     def __repr__(self):
-        return 'Dataset(name={},models={})'.format(self.name, self.models)
+        return ('DatasetOptions(statement_cache={},growable_select={},select_capacity_hint={},arena_lists={},'
+                'zero_copy={},connection_pool={},schema_migration={})').format(
+                    self.statement_cache, self.growable_select, self.select_capacity_hint, self.arena_lists,
+                    self.zero_copy, self.connection_pool, self.schema_migration)
+
+    def has_single_pass_select(self):
+        """Returns True if any select reads its results in a single pass into a growable list"""
+        return self.growable_select or self.arena_lists
 
 
 class Model:
     """Represents a model corresponding to a single database table"""
 
-    def __init__(self, name, fields, queries, type_name=None, table_name=None):
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self, name, fields, queries, type_name=None, table_name=None, batch_size=DEFAULT_BATCH_SIZE):
         self.name = name
         self.fields = fields
         self.queries = queries
+        self.batch_size = batch_size
+        self.indexes = []
+        self.row_cache = None
+        self.columnar = False
         self._type_name = type_name
         self._table_name = table_name
 
     def __repr__(self):
-        return 'Model(name={}, fields={}, queries={})'.format(
-            self.name, self.fields, self.queries)
+        return 'Model(name={}, fields={}, queries={}, indexes={}, row_cache={}, columnar={})'.format(
+            self.name, self.fields, self.queries, self.indexes, self.row_cache, self.columnar)
 
     def get_c_type(self):
         """Returns the name of the model's C struct type"""
@@ -101,10 +234,43 @@ class Model:
 
         return c_type
 
+    def get_columnar_select_queries(self):
+        """Returns the select queries that read whole models, which can also read them into columns"""
+        return (query for query in self.get_select_queries() if not query.result_model)
+
+    def get_columns_c_type(self):
+        """Returns the name of the struct to hold a list of models with one array per field"""
+        return self.name + '_columns_t'
+
+    def get_columns_free_function_name(self):
+        """Returns the name of the function to free a columnar list of models"""
+        return self.name + '_columns_free'
+
+    def get_columns_init_function_name(self):
+        """Returns the name of the function to initialize a columnar list of models"""
+        return self.name + '_columns_init'
+
+    def get_columns_pointer_type(self):
+        """Returns a string to declare a pointer to a columnar list of models"""
+        return self.get_columns_c_type() + ' *'
+
     def get_constant_pointer_type(self):
         """Returns a string to declare a constant pointer to the model's C type"""
         return self.get_c_type() + ' const *'
 
+    def get_cursor_c_type(self):
+        """Returns the name of the struct to hold a cursor over query results"""
+        return self.name + '_cursor_t'
+
+    def get_cursor_pointer_type(self):
+        """Returns a string to declare a pointer to a cursor over query results"""
+        return self.get_cursor_c_type() + ' *'
+
+    def get_batch_queries(self):
+        """Returns the update and delete queries with parameters, which can be run for arrays of parameters"""
+        return [query for query in self.queries
+                if query.query_type in (ModelQueryType.UPDATE, ModelQueryType.DELETE) and query.params]
+
     def get_count_queries(self):
         """Returns all count queries defined on the model"""
         return self._get_queries_by_type(ModelQueryType.COUNT)
@@ -149,6 +315,10 @@ class Model:
         """Returns a string to declare a pointer to the model's struct type"""
         return self.get_c_type() + ' *'
 
+    def get_page_queries(self):
+        """Returns all page queries defined on the model"""
+        return self._get_queries_by_type(ModelQueryType.PAGE)
+
     def get_primary_key_field(self):
         """Returns the model's primary key field"""
         primary_key_field, = (field for field in self.fields if field.is_primary_key())
@@ -167,6 +337,23 @@ class Model:
 
         return table_name
 
+    def get_unindexed_queries(self):
+        """
+        Returns all queries that filter on columns without an index that can be used to look them up.
+        A query is considered covered if its WHERE clause uses the primary key or the leading column
+        of any of the model's indexes.
+        """
+        indexed_field_names = {self.get_primary_key_field().name}
+        indexed_field_names |= {index.field_names[0] for index in self.indexes}
+
+        unindexed_queries = []
+        for query in self.queries:
+            where_field_names = query.get_where_field_names(self)
+            if where_field_names and not (indexed_field_names & set(where_field_names)):
+                unindexed_queries.append(query)
+
+        return unindexed_queries
+
     def get_update_queries(self):
         """Returns all update queries defined on the model"""
         return self._get_queries_by_type(ModelQueryType.UPDATE)
@@ -175,22 +362,74 @@ class Model:
         """Returns True if the model has any dynamically-allocated fields"""
         return any((field.is_dynamically_allocated() for field in self.fields))
 
+    def get_view_c_type(self):
+        """Returns the name of the struct to hold a model row borrowed from a query result"""
+        return self.name + '_view_t'
+
+    def get_view_pointer_type(self):
+        """Returns a string to declare a pointer to a model row borrowed from a query result"""
+        return self.get_view_c_type() + ' *'
+
+    def get_visit_func_c_type(self):
+        """Returns the name of the callback type to visit models read by a query"""
+        return self.name + '_visit_func_t'
+
     def _get_queries_by_type(self, query_type):
         """Returns all queries of the specified type"""
         return (query for query in self.queries if query.query_type == query_type)
 
 
+class ModelIndex:
+    """Represents an index on one or more columns of a model's database table"""
+
+    def __init__(self, name, field_names, unique=False):
+        self.name = name
+        self.field_names = list(field_names)
+        self.unique = unique
+
+    def __repr__(self):
+        return 'ModelIndex(name={},field_names={},unique={})'.format(
+            self.name, self.field_names, self.unique)
+
+
+class ModelRowCache:
+    """
+    Represents the bounds of a model's cache of records found by id. A bound of 0 leaves the cache
+    unbounded in that dimension.
+    """
+
+    def __init__(self, max_entries=0, max_bytes=0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+    def __repr__(self):
+        return 'ModelRowCache(max_entries={}, max_bytes={})'.format(self.max_entries, self.max_bytes)
+
+
 class ModelField:
     """Represents a field of a model corresponding to a single database table column"""
 
-    def __init__(self, name, field_type, max_length=0):
+    def __init__(self, name, field_type, max_length=0, previous_name=None):
         self.name = name
         self.field_type = field_type
         self.max_length = max_length
+        self.previous_name = previous_name
 
     def __repr__(self):
-        return 'ModelField(name={},field_type={},max_length={})'.format(
-            self.name, self.field_type, self.max_length)
+        return 'ModelField(name={},field_type={},max_length={},previous_name={})'.format(
+            self.name, self.field_type, self.max_length, self.previous_name)
+
+    def get_columns_capacity_name(self):
+        """Returns the name of the columnar list member holding the capacity of the field's values buffer"""
+        return self.name + '_capacity'
+
+    def get_columns_offsets_name(self):
+        """Returns the name of the columnar list member holding the offsets of the field's values"""
+        return self.name + '_offsets'
+
+    def get_length_name(self):
+        """Returns the name of the model member holding the length of the field's value, if models hold it"""
+        return self.name + '_len'
 
     def get_name_declaration(self):
         """Returns the string to declare the field's name"""
@@ -255,17 +494,67 @@ class ModelField:
 
 
 class ModelQuery:
-    """Represents a custom user-defined query on a model database table"""
-
-    def __init__(self, query_type, name, query_string, params):
+    """
+    Represents a custom user-defined query on a model database table. Select and find queries may
+    have a result model, in which case they only read the result model's subset of the model's fields.
+    Aggregate queries also have result columns, the SQL expressions computing each result model field.
+    Page queries have key fields, the fields their results are ordered and paged by.
+    """
+
+    def __init__(self, query_type, name, query_string, params, result_model=None, key_fields=None,
+                 descending=False, result_columns=None):
         self.query_type = query_type
         self.name = name
         self.query_string = query_string
         self.params = list(params)
+        self.result_model = result_model
+        self.key_fields = key_fields if key_fields else []
+        self.descending = descending
+        self.result_columns = result_columns if result_columns else []
 
     def __repr__(self):
-        return 'ModelQuery(query_type={},name={},query_string="{}",params={})'.format(
-            self.query_type, self.name, self.query_string, self.params)
+        return ('ModelQuery(query_type={},name={},query_string="{}",params={},result_model={},key_fields={},'
+                'descending={},result_columns={})').format(self.query_type, self.name, self.query_string,
+                                                           self.params, self.result_model, self.key_fields,
+                                                           self.descending, self.result_columns)
+
+    def get_key_c_type(self):
+        """Returns the name of the struct to hold the key of a page query's last result"""
+        return self.name + '_key_t'
+
+    def get_key_constant_pointer_type(self):
+        """Returns a string to declare a constant pointer to the key of a page query's last result"""
+        return self.get_key_c_type() + ' const *'
+
+    def get_key_pointer_type(self):
+        """Returns a string to declare a pointer to the key of a page query's last result"""
+        return self.get_key_c_type() + ' *'
+
+    def get_params_c_type(self):
+        """Returns the name of the struct to hold one set of the query's parameters"""
+        return self.name + '_params_t'
+
+    def get_params_constant_pointer_type(self):
+        """Returns a string to declare a constant pointer to a set of the query's parameters"""
+        return self.get_params_c_type() + ' const *'
+
+    def get_result_model(self, model):
+        """Returns the model that each row read by the query on the provided model is read into"""
+        return self.result_model if self.result_model else model
+
+    def get_where_condition(self):
+        """Returns the condition of the query's WHERE clause, or an empty string if it has none"""
+        where_match = _QUERY_WHERE_CLAUSE_RE.search(self.query_string)
+        return where_match.group(1).strip() if where_match else ''
+
+    def get_where_field_names(self, model):
+        """Returns the names of the model fields referenced by the query's WHERE clause"""
+        identifiers = set(_QUERY_IDENTIFIER_RE.findall(self.get_where_condition()))
+        return [field.name for field in model.fields if field.name in identifiers]
+
+    def is_grouped(self):
+        """Returns True if the query has a GROUP BY clause, so it reads one row per group"""
+        return bool(_QUERY_GROUP_BY_RE.search(self.query_string))
 
 
 class ModelQueryParam:
@@ -1,16 +1,22 @@
 """Contains functionality for parsing cDAL dataset definitions"""
+import functools
 import json
 import jsonschema
+import os
 import re
 import dataset
 
 
-_SCHEMA_FILE_PATH = 'dataset.schema.json'
+_SCHEMA_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dataset.schema.json')
 
 # Query parameters are specified in the format 'WHERE id = {model_id:PrimaryKey}'
 _QUERY_PARAMETER_PATTERN = r'{(\w+):(\w+)}'
 _QUERY_PARAMETER_RE = re.compile(_QUERY_PARAMETER_PATTERN)
 
+# Page queries may only filter their results, since they order and limit them themselves
+_PAGE_QUERY_PATTERN = r'^\s*(WHERE\b(?!.*\b(GROUP\s+BY|ORDER\s+BY|LIMIT)\b).*)?$'
+_PAGE_QUERY_RE = re.compile(_PAGE_QUERY_PATTERN, re.IGNORECASE | re.DOTALL)
+
 
 class DatasetDefinitionError(Exception):
     """Base class for exceptions related to invalid dataset defintions"""
@@ -23,21 +29,85 @@ def dataset_from_definition(definition):
 
     name = definition['datasetName']
     models = [_model_from_definition(model_definition) for model_definition in definition['models']]
+    options = _options_from_definition(definition.get('options', {}))
+
+    if 'connection' in definition:
+        connection = _connection_from_definition(definition['connection'])
+    else:
+        connection = None
+
+    # Row caches are kept with the statement cache, since the cached accessors are the ones that use them
+    for model in models:
+        if model.row_cache and not options.statement_cache:
+            raise DatasetDefinitionError('The row cache of model {} requires the statement cache'.format(model.name))
 
-    return dataset.Dataset(name, models)
+    return dataset.Dataset(name, models, options, connection)
 
 
 def _validate_definition(definition):
     """Validates the provided definition dictionary against the dataset definition schema"""
+    validation_error = jsonschema.exceptions.best_match(_schema_validator_get().iter_errors(definition))
+    if validation_error:
+        raise DatasetDefinitionError('Invalid dataset definition: ' + validation_error.message)
+
+    return definition
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_validator_get():
+    """Returns a validator for the dataset definition schema, which is read and checked only once"""
     with open(_SCHEMA_FILE_PATH) as schema_file:
         schema = json.load(schema_file)
 
-    try:
-        jsonschema.validate(definition, schema)
-    except jsonschema.ValidationError as validation_error:
-        raise DatasetDefinitionError('Invalid dataset definition: ' + validation_error.message)
+    validator_class = jsonschema.validators.validator_for(schema)
+    validator_class.check_schema(schema)
 
-    return definition
+    return validator_class(schema)
+
+
+def _connection_from_definition(connection_definition):
+    """Parses the dataset's connection profile from the connection definition dictionary"""
+    page_size = connection_definition.get('pageSize')
+    if page_size is not None and (page_size < 512 or page_size > 65536 or page_size & (page_size - 1)):
+        raise DatasetDefinitionError('Invalid page size: {}'.format(page_size))
+
+    mmap_size = connection_definition.get('mmapSize')
+    if mmap_size is not None and mmap_size < 0:
+        raise DatasetDefinitionError('Invalid mmap size: {}'.format(mmap_size))
+
+    busy_timeout = connection_definition.get('busyTimeout')
+    if busy_timeout is not None and busy_timeout < 0:
+        raise DatasetDefinitionError('Invalid busy timeout: {}'.format(busy_timeout))
+
+    return dataset.ConnectionProfile(journal_mode=connection_definition.get('journalMode'),
+                                     synchronous=connection_definition.get('synchronous'),
+                                     cache_size=connection_definition.get('cacheSize'),
+                                     mmap_size=mmap_size,
+                                     temp_store=connection_definition.get('tempStore'),
+                                     page_size=page_size,
+                                     busy_timeout=busy_timeout,
+                                     optimize_on_close=connection_definition.get('optimizeOnClose', False))
+
+
+def _options_from_definition(options_definition):
+    """Parses the dataset's code generation options from the options definition dictionary"""
+    statement_cache = options_definition.get('statementCache', False)
+    growable_select = options_definition.get('growableSelect', False)
+    select_capacity_hint = options_definition.get('selectCapacityHint', 16)
+    arena_lists = options_definition.get('arenaLists', False)
+    zero_copy = options_definition.get('zeroCopy', False)
+    connection_pool = options_definition.get('connectionPool', False)
+    schema_migration = options_definition.get('schemaMigration', False)
+
+    if select_capacity_hint <= 0:
+        raise DatasetDefinitionError('Invalid select capacity hint: {}'.format(select_capacity_hint))
+
+    # Each pooled connection keeps its prepared statements in a statement cache
+    if connection_pool and not statement_cache:
+        raise DatasetDefinitionError('The connection pool requires the statement cache')
+
+    return dataset.DatasetOptions(statement_cache, growable_select, select_capacity_hint, arena_lists, zero_copy,
+                                  connection_pool, schema_migration)
 
 
 def _model_from_definition(model_definition):
@@ -47,15 +117,64 @@ def _model_from_definition(model_definition):
     # Get the values for the optional fields
     type_name = model_definition.get('typeName')
     table_name = model_definition.get('tableName')
+    batch_size = model_definition.get('batchSize', dataset.Model.DEFAULT_BATCH_SIZE)
+
+    if batch_size <= 0:
+        raise DatasetDefinitionError('Invalid batch size for model {}: {}'.format(name, batch_size))
 
     fields = [_field_from_definition(field_definition) for field_definition in model_definition['fields']]
+    _field_previous_names_validate(fields, name)
 
     if 'queries' in model_definition:
-        queries = _queries_from_definition(model_definition['queries'])
+        queries = _queries_from_definition(model_definition['queries'], fields)
     else:
         queries = []
 
-    return dataset.Model(name, fields, queries, type_name, table_name)
+    model = dataset.Model(name, fields, queries, type_name, table_name, batch_size)
+    model.indexes = [_index_from_definition(index_definition, model)
+                     for index_definition in model_definition.get('indexes', [])]
+
+    if 'rowCache' in model_definition:
+        model.row_cache = _row_cache_from_definition(model_definition['rowCache'], model)
+
+    model.columnar = model_definition.get('columnar', False)
+
+    return model
+
+
+def _row_cache_from_definition(row_cache_definition, model):
+    """Parses the bounds of the model's row cache from the row cache definition dictionary"""
+    max_entries = row_cache_definition.get('maxEntries', 0)
+    max_bytes = row_cache_definition.get('maxBytes', 0)
+
+    if max_entries < 0 or max_bytes < 0 or not (max_entries or max_bytes):
+        raise DatasetDefinitionError('Invalid row cache bounds for model {}: {}'.format(model.name,
+                                                                                        row_cache_definition))
+
+    # Cached records are copied, which needs the length of every dynamically-allocated value
+    for field in model.fields:
+        if field.is_dynamically_allocated() and field.field_type == dataset.ModelFieldType.BLOB:
+            raise DatasetDefinitionError('Row cache of model {} cannot copy Blob field without a max length: {}'.
+                                         format(model.name, field.name))
+
+    return dataset.ModelRowCache(max_entries, max_bytes)
+
+
+def _index_from_definition(index_definition, model):
+    """Parses the model index from the index definition dictionary"""
+    field_names = index_definition['fields']
+    unique = index_definition.get('unique', False)
+
+    model_field_names = {field.name for field in model.fields}
+    for field_name in field_names:
+        if field_name not in model_field_names:
+            raise DatasetDefinitionError('Invalid index field for model {}: {}'.format(model.name, field_name))
+
+    # Index names are global to the database, so default to a name qualified by the table name
+    default_name = '{}_{}_idx'.format(model.get_table_name(), '_'.join(field_names))
+    name = index_definition.get('name', default_name)
+
+    return dataset.ModelIndex(name, field_names, unique)
 
 
 def _field_from_definition(field_definition):
@@ -63,8 +182,28 @@ def _field_from_definition(field_definition):
     name = field_definition['name']
     field_type = _field_type_get(field_definition['type'])
     max_length = _field_max_length_get(field_type, field_definition)
+    previous_name = field_definition.get('previousName')
+
+    return dataset.ModelField(name, field_type, max_length, previous_name)
 
-    return dataset.ModelField(name, field_type, max_length)
+
+def _field_previous_names_validate(fields, model_name):
+    """
+    Validates the names the model's fields had in earlier versions of the definition, each of which must
+    identify a single column that is no longer in the model
+    """
+    field_names = {field.name.lower() for field in fields}
+    previous_names = set()
+    for field in fields:
+        if field.previous_name is None:
+            continue
+
+        previous_name = field.previous_name.lower()
+        if previous_name in field_names or previous_name in previous_names:
+            raise DatasetDefinitionError('Invalid previous name for field {} of model {}: {}'.format(
+                field.name, model_name, field.previous_name))
+
+        previous_names.add(previous_name)
 
 
 def _field_type_get(input_field_type):
@@ -100,8 +239,8 @@ def _field_type_can_have_max_length(field_type):
     return field_type in {dataset.ModelFieldType.TEXT, dataset.ModelFieldType.BLOB}
 
 
-def _queries_from_definition(query_defs):
-    """Parses all model queries defined for a model"""
+def _queries_from_definition(query_defs, fields):
+    """Parses all model queries defined for a model with the provided fields"""
     query_types = {
         'count': dataset.ModelQueryType.COUNT,
         'delete': dataset.ModelQueryType.DELETE,
@@ -111,16 +250,115 @@ def _queries_from_definition(query_defs):
     }
     queries = []
     for query_type_key in query_defs:
-        if query_type_key not in query_types:
+        if query_type_key == 'project':
+            queries += [_projection_query_from_definition(query_def, fields)
+                        for query_def in query_defs[query_type_key]]
+        elif query_type_key == 'aggregate':
+            queries += [_aggregate_query_from_definition(query_def)
+                        for query_def in query_defs[query_type_key]]
+        elif query_type_key == 'page':
+            queries += [_page_query_from_definition(query_def, fields)
+                        for query_def in query_defs[query_type_key]]
+        elif query_type_key in query_types:
+            query_type = query_types[query_type_key]
+            queries += [_query_from_definition(query_type, query_def)
+                        for query_def in query_defs[query_type_key]]
+        else:
             raise DatasetDefinitionError('Invalid query type: ' + query_type_key)
 
-        query_type = query_types[query_type_key]
-        queries += [_query_from_definition(query_type, query_def)
-                    for query_def in query_defs[query_type_key]]
-
     return queries
 
 
+def _aggregate_query_from_definition(query_def):
+    """
+    Parses the provided aggregate query definition dictionary. An aggregate query is a select query,
+    or a find query if it is declared single, that reads its outputs into a result model of its own.
+    Each output is computed by an SQL expression, which defaults to the column with the output's name.
+    """
+    query_type = dataset.ModelQueryType.FIND if query_def.get('single', False) else dataset.ModelQueryType.SELECT
+    query_def = dict(query_def, query=query_def.get('query', ''))
+    query = _query_from_definition(query_type, query_def)
+
+    result_fields = []
+    result_columns = []
+    for output_def in query_def['outputs']:
+        output_field = _field_from_definition(output_def)
+        if output_field.is_primary_key():
+            raise DatasetDefinitionError('Invalid type for output of aggregate query {}: {}'.format(
+                                         query.name, output_field.name))
+        if output_field.name in (field.name for field in result_fields):
+            raise DatasetDefinitionError('Duplicate output for aggregate query {}: {}'.format(
+                                         query.name, output_field.name))
+
+        result_fields.append(output_field)
+        if 'expression' in output_def:
+            result_columns.append('{} AS {}'.format(output_def['expression'], output_field.name))
+        else:
+            result_columns.append(output_field.name)
+
+    type_name = query_def.get('typeName', query.name + '_t')
+    query.result_model = dataset.Model(query.name, result_fields, [], type_name)
+    query.result_columns = result_columns
+
+    return query
+
+
+def _page_query_from_definition(query_def, fields):
+    """
+    Parses the provided page query definition dictionary. A page query reads its results ordered by
+    its sort key followed by the primary key, which together form the key used to resume reading
+    after the last result of the previous page.
+    """
+    query_def = dict(query_def, query=query_def.get('query', ''))
+    query = _query_from_definition(dataset.ModelQueryType.PAGE, query_def)
+
+    if not _PAGE_QUERY_RE.match(query.query_string):
+        raise DatasetDefinitionError('Invalid query for page query {}: must only contain a WHERE clause'.format(
+                                     query.name))
+
+    fields_by_name = {field.name: field for field in fields}
+    key_fields = []
+    for field_name in query_def.get('sortKey', []):
+        if field_name not in fields_by_name:
+            raise DatasetDefinitionError('Invalid sort key field for page query {}: {}'.format(query.name, field_name))
+        if fields_by_name[field_name].is_dynamically_allocated():
+            raise DatasetDefinitionError('Sort key field of page query {} must not be dynamically allocated: {}'.format(
+                                         query.name, field_name))
+        key_fields.append(fields_by_name[field_name])
+
+    # The primary key breaks ties between results with equal sort keys
+    primary_key_field, = (field for field in fields if field.is_primary_key())
+    if primary_key_field not in key_fields:
+        key_fields.append(primary_key_field)
+
+    query.key_fields = key_fields
+    query.descending = query_def.get('descending', False)
+
+    return query
+
+
+def _projection_query_from_definition(query_def, fields):
+    """
+    Parses the provided projection query definition dictionary. A projection query is a select
+    query, or a find query if it is declared single, that only reads the listed subset of fields
+    into a result model of its own.
+    """
+    query_type = dataset.ModelQueryType.FIND if query_def.get('single', False) else dataset.ModelQueryType.SELECT
+    query = _query_from_definition(query_type, query_def)
+
+    fields_by_name = {field.name: field for field in fields}
+    result_fields = []
+    for field_name in query_def['fields']:
+        if field_name not in fields_by_name:
+            raise DatasetDefinitionError('Invalid field for projection query {}: {}'.format(query.name, field_name))
+        result_fields.append(fields_by_name[field_name])
+
+    type_name = query_def.get('typeName', query.name + '_t')
+    query.result_model = dataset.Model(query.name, result_fields, [], type_name)
+
+    return query
+
+
 def _query_from_definition(query_type, query_def):
     """Parses the provided query definition dictionary"""
     name = query_def['name']
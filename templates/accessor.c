@@ -1,21 +1,83 @@
 /************************************************************************
 THIS FILE IS AUTO-GENERATED. DO NOT EDIT DIRECTLY. ALL CHANGES WILL BE LOST.
 
-{{dataset | source_name}} - Contains functions for accessing {{dataset.name}} models.
+{{source_file_name}} - Contains functions for accessing {{dataset.name}}{% if not shared_source %} {{source_models[0].name}}{% endif %} models.
 ************************************************************************/
 
 /************************************************************************
                               INCLUDES
 ************************************************************************/
 
+#if defined( {{dataset | profile_macro}} ) && !defined( _POSIX_C_SOURCE )
+    #define _POSIX_C_SOURCE 200809L
+#endif
+
 {% for include in includes %}
 #include {{include}}
 {% endfor %}
+#ifdef {{dataset | profile_macro}}
+#include <time.h>
+#endif
+
+/************************************************************************
+                               MACROS
+************************************************************************/
+
+/*
+Compiling with {{dataset | profile_macro}} defined records calls, rows, TEXT
+and BLOB bytes copied, and time spent preparing, stepping and finalizing
+statements for each accessor function, kept separately for every thread.
+Otherwise, every hook expands to nothing or to its wrapped expression.
+*/
+#ifdef {{dataset | profile_macro}}
+
+#if defined( __STDC_VERSION__ ) && ( __STDC_VERSION__ >= 201112L )
+    #define {{dataset | profile_macro('THREAD_LOCAL')}} _Thread_local
+#else
+    #define {{dataset | profile_macro('THREAD_LOCAL')}} __thread
+#endif
+
+#define {{dataset | profile_macro('ENTER')}}( name ) \
+    static {{dataset | profile_macro('THREAD_LOCAL')}} {{dataset | profile_name('entry_t')}} profile_entry = { .stats = { .function = name } }; \
+    {{dataset | profile_name('entry_t')}} * profile_prev = {{dataset | profile_name('enter')}}( &profile_entry )
+#define {{dataset | profile_macro('EXIT')}}( success, rows ) \
+    {{dataset | profile_name('exit')}}( profile_prev, ( success ), (sqlite3_uint64)( rows ) )
+#define {{dataset | profile_macro('ROWS')}}( rows ) \
+    {{dataset | profile_name('rows_add')}}( (sqlite3_uint64)( rows ) )
+#define {{dataset | profile_macro('BYTES')}}( bytes ) \
+    {{dataset | profile_name('bytes_add')}}( (sqlite3_uint64)( bytes ) )
+#define {{dataset | profile_macro('BIND')}}( rcode, value ) \
+    {{dataset | profile_name('bind')}}( ( rcode ), ( value ) )
+#define {{dataset | profile_macro('PREPARE')}}( rcode ) \
+    ( {{dataset | profile_name('time_begin')}}(), {{dataset | profile_name('time_end')}}( {{dataset | profile_macro('PREPARE_PHASE')}}, ( rcode ) ) )
+#define {{dataset | profile_macro('STEP')}}( rcode ) \
+    ( {{dataset | profile_name('time_begin')}}(), {{dataset | profile_name('time_end')}}( {{dataset | profile_macro('STEP_PHASE')}}, ( rcode ) ) )
+#define {{dataset | profile_macro('FINALIZE')}}( call ) \
+    do \
+        { \
+        {{dataset | profile_name('time_begin')}}(); \
+        call; \
+        {{dataset | profile_name('time_end')}}( {{dataset | profile_macro('FINALIZE_PHASE')}}, 0 ); \
+        } while( 0 )
+
+#else
+
+#define {{dataset | profile_macro('ENTER')}}( name )
+#define {{dataset | profile_macro('EXIT')}}( success, rows )
+#define {{dataset | profile_macro('ROWS')}}( rows )
+#define {{dataset | profile_macro('BYTES')}}( bytes )
+#define {{dataset | profile_macro('BIND')}}( rcode, value ) ( rcode )
+#define {{dataset | profile_macro('PREPARE')}}( rcode ) ( rcode )
+#define {{dataset | profile_macro('STEP')}}( rcode ) ( rcode )
+#define {{dataset | profile_macro('FINALIZE')}}( call ) call
+
+#endif
 
 /************************************************************************
                             MEMORY CONSTANTS
 ************************************************************************/
 {% for model in dataset.models %}
+{% if shared_source %}
 static char const * const {{model | table_create_query_var}} =
     "CREATE TABLE IF NOT EXISTS {{model.get_table_name()}}"
     "("
@@ -24,6 +86,35 @@ static char const * const {{model | table_create_query_var}} =
     {% endfor %}
     ");";
 
+{% endif %}
+{% if model in source_models %}
+static char const * const {{model | model_bulk_insert_query_var}} =
+    "INSERT INTO {{model.get_table_name()}} VALUES "
+    {% for row in range(model | model_bulk_insert_rows) %}
+    "{{model | model_bulk_insert_row_string}}{% if not loop.last %}, "{% else %};";{% endif %}
+
+    {% endfor %}
+
+{% endif %}
+{% if shared_source %}
+{% for index in model.indexes %}
+static char const * const {{index | index_create_query_var}} =
+    "CREATE {% if index.unique %}UNIQUE {% endif %}INDEX IF NOT EXISTS {{index.name}} "
+    "ON {{model.get_table_name()}}( {{index.field_names | join(', ')}} );";
+
+{% endfor %}
+{% endif %}
+{% if model in source_models %}
+enum
+    {
+    {% for field in model.fields %}
+    {{field | field_column_enum(model)}},
+    {% endfor %}
+    };
+
+{% endif %}
+{% endfor %}
+{% for model in source_projection_models %}
 enum
     {
     {% for field in model.fields %}
@@ -32,12 +123,360 @@ enum
     };
 
 {% endfor %}
+{% if dataset.options.statement_cache and stmt_ids %}
+enum
+    {
+    {% for stmt_id in stmt_ids %}
+    {{stmt_id}},
+    {% endfor %}
+    };
+
+{% endif %}
+#ifdef {{dataset | profile_macro}}
+enum
+    {
+    {{dataset | profile_macro('PREPARE_PHASE')}},
+    {{dataset | profile_macro('STEP_PHASE')}},
+    {{dataset | profile_macro('FINALIZE_PHASE')}}
+    };
+
+#endif
 
 /************************************************************************
-                               PROCEDURES
+                                TYPES
+************************************************************************/
+
+#ifdef {{dataset | profile_macro}}
+typedef struct {{dataset | profile_name('entry_s')}}
+    {
+    {{dataset | stats_c_type}} stats;
+    int is_listed;
+    struct {{dataset | profile_name('entry_s')}} * next;
+    } {{dataset | profile_name('entry_t')}};
+
+#endif
+{% if dataset.get_row_cache_models() %}
+typedef struct {{dataset | row_cache_name('entry_s')}}
+    {
+    sqlite3_int64 id;
+    size_t size;
+    struct {{dataset | row_cache_name('entry_s')}} * bucket_next;
+    struct {{dataset | row_cache_name('entry_s')}} * newer;
+    struct {{dataset | row_cache_name('entry_s')}} * older;
+    } {{dataset | row_cache_name('entry_t')}};
+
+struct {{dataset | row_cache_name('table_s')}}
+    {
+    {{dataset | row_cache_name('entry_t')}} ** buckets;
+    sqlite3_uint64 bucket_mask;
+    {{dataset | row_cache_name('entry_t')}} * newest;
+    {{dataset | row_cache_name('entry_t')}} * oldest;
+    sqlite3_uint64 max_entries;
+    sqlite3_uint64 max_bytes;
+    sqlite3_uint64 generation;
+    {{dataset | row_cache_stats_c_type}} stats;
+    void (*entry_free)( {{dataset | row_cache_name('entry_t')}} * entry );
+    };
+
+{% for model in dataset.get_row_cache_models() %}
+typedef struct
+    {
+    {{dataset | row_cache_name('entry_t')}} entry;
+    {{model.get_c_type()}} model;
+    } {{model | model_row_cache_entry_c_type}};
+
+{% endfor %}
+{% endif %}
+{% if dataset.options.schema_migration and shared_source %}
+typedef struct
+    {
+    char const * name;
+    char const * previous_name;
+    char const * type;
+    int is_primary_key;
+    } {{dataset | migrate_name('column_t')}};
+
+{% endif %}
+
+/************************************************************************
+                              VARIABLES
 ************************************************************************/
 
+{% if shared_source %}
+{% if dataset.options.schema_migration %}
 {% for model in dataset.models %}
+/* Columns of the current {{model.get_table_name()}} table and the names they had in earlier definitions */
+static {{dataset | migrate_name('column_t')}} const {{model | model_migrate_columns_var}}[] =
+    {
+    {% for field in model.fields %}
+    { "{{field.name}}", {% if field.previous_name %}"{{field.previous_name}}"{% else %}NULL{% endif %}, "{{field | field_migrate_column_type}}", {{field.is_primary_key() | int}} }{% if not loop.last %},{% endif %}
+
+    {% endfor %}
+    };
+
+{% endfor %}
+{% endif %}
+#ifdef {{dataset | profile_macro}}
+/* Profiling entries of the accessors called on this thread */
+static {{dataset | profile_macro('THREAD_LOCAL')}} {{dataset | profile_name('entry_t')}} * {{dataset | profile_name('entries')}} = NULL;
+
+/* Profiling entry of the innermost accessor running on this thread */
+static {{dataset | profile_macro('THREAD_LOCAL')}} {{dataset | profile_name('entry_t')}} * {{dataset | profile_name('current')}} = NULL;
+
+/* Start time of the statement phase being timed on this thread */
+static {{dataset | profile_macro('THREAD_LOCAL')}} sqlite3_uint64 {{dataset | profile_name('start_ns')}} = 0;
+
+#endif
+{% endif %}
+
+/************************************************************************
+                               PROCEDURES
+************************************************************************/
+
+{% if dataset.has_columnar_values() %}
+{{private_static}}int {{dataset | columns_append_function_name}}
+    (
+    sqlite3_stmt * query,
+    int column,
+    int is_text,
+    char ** values,
+    size_t * capacity,
+    size_t * offsets,
+    int idx
+    );
+
+{% endif %}
+{{private_static}}int {{dataset | cursor_buffer_read_function_name}}
+    (
+    sqlite3_stmt * query,
+    int column,
+    int is_text,
+    char ** buffer,
+    size_t * capacity
+    );
+
+#ifdef {{dataset | profile_macro}}
+{% if not dataset.options.zero_copy %}
+{{private_static}}int {{dataset | profile_name('bind')}}
+    (
+    int rcode,
+    char const * value
+    );
+
+{% endif %}
+{{private_static}}void {{dataset | profile_name('bytes_add')}}
+    (
+    sqlite3_uint64 bytes
+    );
+
+{{private_static}}{{dataset | profile_name('entry_t')}} * {{dataset | profile_name('enter')}}
+    (
+    {{dataset | profile_name('entry_t')}} * entry
+    );
+
+{{private_static}}void {{dataset | profile_name('exit')}}
+    (
+    {{dataset | profile_name('entry_t')}} * prev,
+    int success,
+    sqlite3_uint64 rows
+    );
+
+{{private_static}}sqlite3_uint64 {{dataset | profile_name('now')}}
+    (
+    void
+    );
+
+{{private_static}}void {{dataset | profile_name('rows_add')}}
+    (
+    sqlite3_uint64 rows
+    );
+
+{{private_static}}void {{dataset | profile_name('time_begin')}}
+    (
+    void
+    );
+
+{{private_static}}int {{dataset | profile_name('time_end')}}
+    (
+    int phase,
+    int rcode
+    );
+
+#endif
+{% if dataset.options.statement_cache %}
+{{private_static}}int {{dataset | stmt_cache_get_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache,
+    int stmt_id,
+    char const * query_string,
+    sqlite3_stmt ** stmt_out
+    );
+
+{{private_static}}void {{dataset | stmt_cache_release_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache,
+    int stmt_id,
+    sqlite3_stmt * stmt
+    );
+
+{% endif %}
+{% if dataset.get_row_cache_models() %}
+{{private_static}}void {{dataset | row_cache_name('evict')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    {{dataset | row_cache_name('entry_t')}} * entry
+    );
+
+{{private_static}}{{dataset | row_cache_name('entry_t')}} * {{dataset | row_cache_name('find')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    sqlite3_int64 id
+    );
+
+{{private_static}}void {{dataset | row_cache_name('flush')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    struct {{dataset | row_cache_name('table_s')}} * table
+    );
+
+{{private_static}}void {{dataset | row_cache_name('insert')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    {{dataset | row_cache_name('entry_t')}} * entry
+    );
+
+{{private_static}}void {{dataset | row_cache_name('remove')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    sqlite3_int64 id
+    );
+
+{{private_static}}void {{dataset | row_cache_name('table_close')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table
+    );
+
+{{private_static}}struct {{dataset | row_cache_name('table_s')}} * {{dataset | row_cache_name('table_open')}}
+    (
+    sqlite3_uint64 max_entries,
+    sqlite3_uint64 max_bytes,
+    sqlite3_uint64 bucket_cnt,
+    void (*entry_free)( {{dataset | row_cache_name('entry_t')}} * entry )
+    );
+
+{% for model in dataset.get_row_cache_models() if shared_source or model in source_models %}
+{{private_static}}int {{model | model_row_cache_function_name('copy')}}
+    (
+    {{model.get_pointer_type()}} model_out,
+    {{model.get_constant_pointer_type()}} model
+    );
+
+{{private_static}}void {{model | model_row_cache_function_name('entry_free')}}
+    (
+    {{dataset | row_cache_name('entry_t')}} * entry
+    );
+
+{{private_static}}int {{model | model_row_cache_function_name('get')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    sqlite3_int64 id,
+    int * found_out,
+    {{model.get_pointer_type()}} model_out,
+    sqlite3_uint64 * generation_out
+    );
+
+{{private_static}}void {{model | model_row_cache_function_name('put')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    {{model.get_constant_pointer_type()}} model,
+    sqlite3_uint64 generation
+    );
+
+{{private_static}}void {{model | model_row_cache_function_name('remove_list')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    {{model.get_list_constant_pointer_type()}} models
+    );
+
+{% endfor %}
+{% endif %}
+{% if dataset.options.connection_pool and shared_source %}
+static int {{dataset | pool_function_name('connections_close')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    );
+
+{% endif %}
+{% if dataset.options.schema_migration and shared_source %}
+static int {{dataset | migrate_name('column_find')}}
+    (
+    sqlite3 * db,
+    char const * table_name,
+    char const * column_name,
+    {{dataset | migrate_name('column_t')}} const * column,
+    int * found_out,
+    int * matches_out
+    );
+
+static int {{dataset | migrate_name('exec')}}
+    (
+    sqlite3 * db,
+    char * sql
+    );
+
+static int {{dataset | migrate_name('extra_column_get')}}
+    (
+    sqlite3 * db,
+    char const * table_name,
+    {{dataset | migrate_name('column_t')}} const * columns,
+    int column_cnt,
+    char ** column_name_out
+    );
+
+static int {{dataset | migrate_name('prepare')}}
+    (
+    sqlite3 * db,
+    char * sql,
+    sqlite3_stmt ** stmt_out
+    );
+
+static int {{dataset | migrate_name('rebuild')}}
+    (
+    sqlite3 * db,
+    char const * table_name,
+    char const * create_query,
+    {{dataset | migrate_name('column_t')}} const * columns,
+    int column_cnt,
+    {{dataset | migrate_name('progress_func_t')}} progress,
+    void * ctx
+    );
+
+static int {{dataset | migrate_name('table')}}
+    (
+    sqlite3 * db,
+    char const * table_name,
+    char const * create_query,
+    {{dataset | migrate_name('column_t')}} const * columns,
+    int column_cnt,
+    {{dataset | migrate_name('progress_func_t')}} progress,
+    void * ctx
+    );
+
+{% endif %}
+{% if dataset.options.arena_lists and dataset.has_dynamic_fields() %}
+{{private_static}}int {{dataset | arena_read_function_name}}
+    (
+    sqlite3_stmt * query,
+    int column,
+    int is_text,
+    {{dataset.get_arena_pointer_type()}} * arena,
+    char ** value_out
+    );
+
+{% endif %}
+{% for model in source_models + source_projection_models %}
+{% if not dataset.options.arena_lists and model in source_select_models %}
 static int {{model | model_add_to_result_list_function_name}}
     (
     sqlite3_stmt * query,
@@ -45,13 +484,44 @@ static int {{model | model_add_to_result_list_function_name}}
     int next_model_list_idx
     );
 
+{% endif %}
+{% if model in source_find_models or not (dataset.options.arena_lists and model.has_dynamic_fields()) %}
 static int {{model | model_from_row_result_function_name}}
     (
     sqlite3_stmt * query,
     void * model_out
     );
 
+{% endif %}
+{% if dataset.options.arena_lists and model.has_dynamic_fields() and model in source_select_models %}
+static int {{model | model_from_row_result_arena_function_name}}
+    (
+    sqlite3_stmt * query,
+    {{dataset.get_arena_pointer_type()}} * arena,
+    {{model.get_pointer_type()}} model_out
+    );
+
+{% endif %}
+{% if model in source_select_models and (dataset.options.has_single_pass_select() or (model.get_page_queries() | list)) %}
+static int {{model | model_select_growable_function_name}}
+    (
+    sqlite3_stmt * select_query,
+    int capacity_hint,
+    {{model.get_list_pointer_type()}} models_out
+    );
+
+{% endif %}
+{% if model.columnar %}
+static int {{model | model_select_columnar_function_name}}
+    (
+    sqlite3_stmt * select_query,
+    int capacity_hint,
+    {{model.get_columns_pointer_type()}} columns_out
+    );
+
+{% endif %}
 {% endfor %}
+{% if shared_source %}
 
 /**************************************************
 *
@@ -81,8 +551,12 @@ return success;
 *
 *    {{dataset | database_initialize_function_name}} - Initialize database
 *
-*    Initializes all tables in the {{dataset.name}}
-*    database.
+*    Initializes all tables and indexes in the
+*    {{dataset.name}} database.
+{% if dataset.connection %}
+*    The connection profile is applied to the
+*    provided connection first.
+{% endif %}
 *
 **************************************************/
 int {{dataset | database_initialize_function_name}}
@@ -92,148 +566,4234 @@ int {{dataset | database_initialize_function_name}}
 {
 int success;
 
+{% if dataset.connection %}
+success = {{dataset | connection_configure_function_name}}( db );
+{% else %}
 success = 1;
+{% endif %}
 
 {% for model in dataset.models %}
 success &= ( SQLITE_OK == sqlite3_exec( db, {{model | table_create_query_var}}, NULL, NULL, NULL ) );
+{% for index in model.indexes %}
+success &= ( SQLITE_OK == sqlite3_exec( db, {{index | index_create_query_var}}, NULL, NULL, NULL ) );
+{% endfor %}
 {% endfor %}
 
 return success;
 }
 
 
-{% for model in dataset.models %}
+{% if dataset.options.schema_migration %}
 /**************************************************
 *
-*    {{model | model_delete_by_id_function_name}} - Delete {{model.name}} by id
+*    {{dataset | database_migrate_function_name}} - Migrate database
 *
-*    Inserts the {{model.name}} record in the database
-*    with the specified id.
+*    Brings all tables and indexes in the
+*    {{dataset.name}} database up to date with the
+*    current definition, creating the ones that are
+*    missing. Columns are renamed from their previous
+*    names, added and dropped in place. A table is only
+*    rebuilt, by copying its rows in batches, when a
+*    column changed type or could not be altered in
+*    place. progress, if not NULL, is called after
+*    each batch; if it returns a non-zero value, the
+*    migration stops. The migration runs in a single
+*    savepoint and leaves the database unchanged if it
+*    fails or is stopped.
+{% if dataset.connection %}
+*    The connection profile is applied to the
+*    provided connection first.
+{% endif %}
 *
 **************************************************/
-int {{model | model_delete_by_id_function_name}}
+int {{dataset | database_migrate_function_name}}
     (
     sqlite3 * db,
-    sqlite3_int64 id
+    {{dataset | migrate_name('progress_func_t')}} progress,
+    void * ctx
     )
 {
 int success;
-sqlite3_stmt * delete_query;
 
-delete_query = NULL;
+{% if dataset.connection %}
+success = {{dataset | connection_configure_function_name}}( db );
+{% else %}
+success = 1;
+{% endif %}
 
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, "DELETE FROM {{model.get_table_name()}} WHERE {{model.get_primary_key_field().name}} = ?;", -1, &delete_query, NULL ) );
-success &= ( SQLITE_OK == sqlite3_bind_int64( delete_query, 1, id ) );
+success = success && ( SQLITE_OK == sqlite3_exec( db, "SAVEPOINT cdal_migrate;", NULL, NULL, NULL ) );
+
+if( success )
+    {
+    {% for model in dataset.models %}
+    success = success && {{dataset | migrate_name('table')}}( db, "{{model.get_table_name()}}", {{model | table_create_query_var}}, {{model | model_migrate_columns_var}}, {{model.fields | length}}, progress, ctx );
+    {% endfor %}
+    {% for model in dataset.models %}
+    {% for index in model.indexes %}
+    success = success && ( SQLITE_OK == sqlite3_exec( db, {{index | index_create_query_var}}, NULL, NULL, NULL ) );
+    {% endfor %}
+    {% endfor %}
 
-success &= ( SQLITE_DONE == sqlite3_step( delete_query ) );
+    if( !success )
+        {
+        sqlite3_exec( db, "ROLLBACK TO cdal_migrate;", NULL, NULL, NULL );
+        }
 
-sqlite3_finalize( delete_query );
+    success &= ( SQLITE_OK == sqlite3_exec( db, "RELEASE cdal_migrate;", NULL, NULL, NULL ) );
+    }
 
 return success;
 }
 
 
+{% endif %}
+{% if dataset.connection %}
 /**************************************************
 *
-*    {{model | model_find_by_id_function_name}} - Find {{model.name}} by id
+*    {{dataset | connection_configure_function_name}} - Configure connection
 *
-*    Retrieves the model in the {{model.get_table_name()}} database table
-*    with the specified id. If a model is found, then
-*    found_out will be set to 1, and model_out will
-*    be populated with the retrieved record. Otherwise,
-*    found_out will be set ot 0. It is the caller's
-*    responsibility to call {{model.get_free_function_name()}} on model_out.
+*    Applies the {{dataset.name}} connection profile to
+*    the provided connection. This should be called
+*    once after opening each connection, outside of
+*    any transaction.
 *
 **************************************************/
-int {{model | model_find_by_id_function_name}}
+int {{dataset | connection_configure_function_name}}
     (
-    sqlite3 * db,
-    sqlite3_int64 id,
-    int * found_out,
-    {{model.get_pointer_type()}} model_out
+    sqlite3 * db
     )
 {
-cqlite_rcode_t rcode;
+int success;
 
-*found_out = 0;
-{{model.get_init_function_name()}}( model_out );
+success = 1;
 
-rcode = cqlite_find_by_id
-    (
-    db,
-    "SELECT * FROM {{model.get_table_name()}} WHERE {{model.get_primary_key_field().name}} = ?;",
-    id,
-    {{model | model_from_row_result_function_name}},
-    found_out,
-    model_out
-    );
+{% if dataset.connection.busy_timeout is not none %}
+success &= ( SQLITE_OK == sqlite3_busy_timeout( db, {{dataset.connection.busy_timeout}} ) );
+{% endif %}
+{% for pragma in dataset.connection.get_pragmas() %}
+success &= ( SQLITE_OK == sqlite3_exec( db, "{{pragma}}", NULL, NULL, NULL ) );
+{% endfor %}
 
-return ( CQLITE_SUCCESS == rcode );
+return success;
 }
 
 
 /**************************************************
 *
-*    {{model | model_insert_new_function_name}} - Insert new {{model.name}}
+*    {{dataset | connection_close_function_name}} - Close connection
 *
-*    Inserts a new {{model.name}} record into the
-*    provided database. The model parameter's id field
-*    is modified with the generated insert id.
+{% if dataset.connection.optimize_on_close %}
+*    Runs PRAGMA optimize so that SQLite can refresh
+*    the statistics its query planner relies on, then
+*    closes the provided connection.
+{% else %}
+*    Closes the provided connection.
+{% endif %}
+*    All statements prepared on the connection,
+*    including those held by a statement cache, must
+*    be finalized first.
 *
 **************************************************/
-int {{model | model_insert_new_function_name}}
+int {{dataset | connection_close_function_name}}
     (
-    sqlite3 * db,
-    {{model.get_pointer_type()}} model
+    sqlite3 * db
     )
 {
 int success;
-sqlite3_stmt * insert_query;
 
-insert_query = NULL;
+success = 1;
 
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{ model | model_insert_query_string}}, -1, &insert_query, NULL ) );
+{% if dataset.connection.optimize_on_close %}
+success &= ( SQLITE_OK == sqlite3_exec( db, "PRAGMA optimize;", NULL, NULL, NULL ) );
+{% endif %}
+success &= ( SQLITE_OK == sqlite3_close( db ) );
+
+return success;
+}
 
-// Bind all but the model's primary key so a new primary key is generated upon insertion
-{%for field in model.fields if not field.is_primary_key() %}
-success &= ( SQLITE_OK == {{field | field_bind_function_call(model, 'insert_query', 'model')}} );
-{% endfor %}
 
-success &= ( CQLITE_SUCCESS == cqlite_insert_query_execute( db, insert_query, &model->{{model.get_primary_key_field().name}} ) );
+{% endif %}{% if dataset.options.statement_cache %}
+/**************************************************
+*
+*    {{dataset | stmt_cache_close_function_name}} - Close statement cache
+*
+*    Finalizes all statements held by the provided
+*    statement cache. The cache's database connection
+*    is not closed and must outlive this call.
+*
+**************************************************/
+void {{dataset | stmt_cache_close_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache
+    )
+{
+int i;
 
-sqlite3_finalize( insert_query );
+for( i = 0; i < {{dataset | stmt_cnt_macro}}; i++ )
+    {
+    sqlite3_finalize( cache->stmts[i] );
+    cache->stmts[i] = NULL;
+    cache->stmt_is_checked_out[i] = 0;
+    }
 
-return success;
+cache->db = NULL;
+{% if dataset.get_row_cache_models() %}
+cache->rows = NULL;
+{% endif %}
 }
 
 
 /**************************************************
 *
-*    {{model | model_save_existing_function_name}} - Save existing {{model.name}}
+*    {{dataset | stmt_cache_open_function_name}} - Open statement cache
 *
-*    Saves the provided {{model.name}} as an existing
-*    record in the database, updating any records
-*    with a matching primary key.
+*    Creates a statement cache for the provided
+*    database connection. Statements are prepared the
+*    first time a cached accessor uses them and are
+*    reused until {{dataset | stmt_cache_close_function_name}}
+*    is called. A cache must only be used by one
+*    thread at a time. While an open cursor or a
+*    for each visitor holds a cached statement, a
+*    nested accessor needing the same statement
+*    prepares a separate one instead.
 *
 **************************************************/
-int {{model | model_save_existing_function_name}}
+void {{dataset | stmt_cache_open_function_name}}
     (
     sqlite3 * db,
-    {{model.get_constant_pointer_type()}} model
+    {{dataset | stmt_cache_pointer_type}} cache_out
     )
 {
-int success;
-sqlite3_stmt * insert_query;
+int i;
 
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{ model | model_insert_query_string}}, -1, &insert_query, NULL ) );
+cache_out->db = db;
+{% if dataset.get_row_cache_models() %}
+cache_out->rows = NULL;
+{% endif %}
 
-{%for field in model.fields%}
-success &= ( SQLITE_OK == {{field | field_bind_function_call(model, 'insert_query', 'model')}} );
-{% endfor %}
+for( i = 0; i < {{dataset | stmt_cnt_macro}}; i++ )
+    {
+    cache_out->stmts[i] = NULL;
+    cache_out->stmt_is_checked_out[i] = 0;
+    }
+}
 
-success &= ( SQLITE_DONE == sqlite3_step( insert_query ) );
 
-sqlite3_finalize( insert_query );
+{% endif %}
+{% if dataset.get_row_cache_models() %}
+/**************************************************
+*
+*    {{dataset | database_delete_all_data_function_name | accessor_function_name(True)}} - Delete all data
+*
+*    Deletes all data in the {{dataset.name}} database
+*    of the provided statement cache, and clears the
+*    row cache attached to it.
+*
+**************************************************/
+int {{dataset | database_delete_all_data_function_name | accessor_function_name(True)}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache
+    )
+{
+int success;
+
+success = {{dataset | database_delete_all_data_function_name}}( cache->db );
+
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('clear')}}( cache->rows );
+    }
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('clear')}} - Clear row cache
+*
+*    Removes every record from the provided row
+*    cache. This must be called after writing to the
+*    database other than through the cached accessors
+*    the row cache is attached to.
+*
+**************************************************/
+void {{dataset | row_cache_name('clear')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows
+    )
+{
+{% for model in dataset.get_row_cache_models() %}
+{{dataset | row_cache_name('flush')}}( rows, rows->{{model | model_row_cache_member}} );
+{% endfor %}
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('close')}} - Close row cache
+*
+*    Frees every record held by the provided row
+*    cache. No statement cache may still use it.
+*
+**************************************************/
+void {{dataset | row_cache_name('close')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows
+    )
+{
+{% for model in dataset.get_row_cache_models() %}
+{{dataset | row_cache_name('table_close')}}( rows->{{model | model_row_cache_member}} );
+rows->{{model | model_row_cache_member}} = NULL;
+{% endfor %}
+{% if dataset.options.connection_pool %}
+
+pthread_mutex_destroy( &rows->lock );
+{% endif %}
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('open')}} - Open row cache
+*
+*    Creates an empty row cache holding the records
+*    most recently found by id for
+{% for model in dataset.get_row_cache_models() %}
+*    {{model.get_table_name()}}{% if not loop.last %},{% else %}.{% endif %}
+
+{% endfor %}
+*    When attached to statement caches with
+*    {{dataset | stmt_cache_rows_set_function_name}}, the cached find by
+*    id accessors read through it, and every cached
+*    write accessor removes the records it may change.
+{% if dataset.options.connection_pool %}
+*    A row cache may be shared by statement caches
+*    used on different threads.
+{% else %}
+*    A row cache must only be used by one thread at
+*    a time.
+{% endif %}
+*
+**************************************************/
+int {{dataset | row_cache_name('open')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows_out
+    )
+{
+int success;
+
+success = 1;
+
+{% for model in dataset.get_row_cache_models() %}
+rows_out->{{model | model_row_cache_member}} = {{dataset | row_cache_name('table_open')}}( {{model | model_row_cache_macro('MAX_ENTRIES')}}, {{model | model_row_cache_macro('MAX_BYTES')}}, {{model | model_row_cache_macro('BUCKET_CNT')}}, {{model | model_row_cache_function_name('entry_free')}} );
+success &= ( NULL != rows_out->{{model | model_row_cache_member}} );
+{% endfor %}
+{% if dataset.options.connection_pool %}
+success = success && ( 0 == pthread_mutex_init( &rows_out->lock, NULL ) );
+{% endif %}
+
+if( !success )
+    {
+    {% for model in dataset.get_row_cache_models() %}
+    {{dataset | row_cache_name('table_close')}}( rows_out->{{model | model_row_cache_member}} );
+    rows_out->{{model | model_row_cache_member}} = NULL;
+    {% endfor %}
+    }
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{dataset | stmt_cache_rows_set_function_name}} - Attach row cache
+*
+*    Attaches the provided row cache to the provided
+*    statement cache, or detaches it if rows is NULL.
+*    Several statement caches may share a row cache.
+*
+**************************************************/
+void {{dataset | stmt_cache_rows_set_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache,
+    {{dataset | row_cache_pointer_type}} rows
+    )
+{
+cache->rows = rows;
+}
+
+
+{% for model in dataset.get_row_cache_models() %}
+/**************************************************
+*
+*    {{model | model_row_cache_function_name('stats_get')}} - Get {{model.name}} row cache statistics
+*
+*    Copies the hit, miss, eviction and invalidation
+*    counters and the current size of the provided
+*    row cache's {{model.get_table_name()}} records into stats_out.
+*
+**************************************************/
+void {{model | model_row_cache_function_name('stats_get')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    {{dataset | row_cache_stats_c_type}} * stats_out
+    )
+{
+{% if dataset.options.connection_pool %}
+pthread_mutex_lock( &rows->lock );
+*stats_out = rows->{{model | model_row_cache_member}}->stats;
+pthread_mutex_unlock( &rows->lock );
+{% else %}
+*stats_out = rows->{{model | model_row_cache_member}}->stats;
+{% endif %}
+}
+
+
+{% endfor %}
+{% endif %}
+{% if dataset.options.connection_pool %}
+/**************************************************
+*
+*    {{dataset | pool_function_name('close')}} - Close connection pool
+*
+*    Closes every connection in the provided pool
+*    along with their statement caches. No connection
+*    may still be acquired from the pool.
+*
+**************************************************/
+int {{dataset | pool_function_name('close')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    )
+{
+int success;
+
+success = {{dataset | pool_function_name('connections_close')}}( pool );
+{% if dataset.get_row_cache_models() %}
+{{dataset | row_cache_name('close')}}( &pool->rows );
+{% endif %}
+
+pthread_cond_destroy( &pool->reader_released );
+pthread_mutex_destroy( &pool->readers_lock );
+pthread_mutex_destroy( &pool->writer_lock );
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{dataset | pool_function_name('connections_close')}} - Close pool connections
+*
+*    Closes the connections and statement caches
+*    opened so far by {{dataset | pool_function_name('open')}}.
+{% if dataset.connection %}
+*    Only the writer is closed with
+*    {{dataset | connection_close_function_name}}, since readers
+*    cannot write the statistics it may refresh.
+{% endif %}
+*
+**************************************************/
+static int {{dataset | pool_function_name('connections_close')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    )
+{
+sqlite3 * db;
+int i;
+int success;
+
+success = 1;
+
+for( i = 0; i < pool->reader_cnt; i++ )
+    {
+    db = pool->readers[i].db;
+    {{dataset | stmt_cache_close_function_name}}( &pool->readers[i] );
+    if( NULL != db )
+        {
+        success &= ( SQLITE_OK == sqlite3_close( db ) );
+        }
+    }
+
+db = pool->writer.db;
+{{dataset | stmt_cache_close_function_name}}( &pool->writer );
+if( NULL != db )
+    {
+{% if dataset.connection %}
+    success &= {{dataset | connection_close_function_name}}( db );
+{% else %}
+    success &= ( SQLITE_OK == sqlite3_close( db ) );
+{% endif %}
+    }
+
+free( pool->readers );
+free( pool->reader_is_acquired );
+pool->readers = NULL;
+pool->reader_is_acquired = NULL;
+pool->reader_cnt = 0;
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{dataset | pool_function_name('open')}} - Open connection pool
+*
+*    Opens a pool of connections to the database
+*    file: a single writer, which initializes the
+*    database, and reader_cnt read-only readers, each
+*    with its own statement cache. Readers run
+*    concurrently with each other and with the writer
+{% if dataset.connection and dataset.connection.journal_mode is not none %}
+*    when the connection profile puts the database in
+*    WAL mode.
+{% else %}
+*    since the database is put in WAL mode.
+{% endif %}
+{% if dataset.get_row_cache_models() %}
+*    All connections share the pool's row cache.
+{% endif %}
+*    Nothing is left open on failure.
+*
+**************************************************/
+int {{dataset | pool_function_name('open')}}
+    (
+    char const * filename,
+    int reader_cnt,
+    {{dataset | pool_pointer_type}} pool_out
+    )
+{
+sqlite3 * db;
+int i;
+int success;
+
+pool_out->readers = NULL;
+pool_out->reader_is_acquired = NULL;
+pool_out->reader_cnt = 0;
+
+db = NULL;
+success = ( 0 < reader_cnt );
+success = success && ( SQLITE_OK == sqlite3_open_v2( filename, &db, SQLITE_OPEN_READWRITE | SQLITE_OPEN_CREATE | SQLITE_OPEN_NOMUTEX, NULL ) );
+{{dataset | stmt_cache_open_function_name}}( db, &pool_out->writer );
+success = success && {{dataset | database_initialize_function_name}}( db );
+{% if not dataset.connection or dataset.connection.journal_mode is none %}
+success = success && ( SQLITE_OK == sqlite3_exec( db, "PRAGMA journal_mode = WAL;", NULL, NULL, NULL ) );
+{% endif %}
+
+if( success )
+    {
+    pool_out->readers = calloc( reader_cnt, sizeof( *pool_out->readers ) );
+    pool_out->reader_is_acquired = calloc( reader_cnt, sizeof( *pool_out->reader_is_acquired ) );
+    success = ( NULL != pool_out->readers ) && ( NULL != pool_out->reader_is_acquired );
+    }
+
+if( success )
+    {
+    pool_out->reader_cnt = reader_cnt;
+    for( i = 0; success && ( i < reader_cnt ); i++ )
+        {
+        db = NULL;
+        success = ( SQLITE_OK == sqlite3_open_v2( filename, &db, SQLITE_OPEN_READONLY | SQLITE_OPEN_NOMUTEX, NULL ) );
+        {{dataset | stmt_cache_open_function_name}}( db, &pool_out->readers[i] );
+{% if dataset.connection %}
+        success = success && {{dataset | connection_configure_function_name}}( db );
+{% endif %}
+        }
+    }
+
+if( success )
+    {
+    success = ( 0 == pthread_mutex_init( &pool_out->writer_lock, NULL ) );
+    if( success )
+        {
+        success = ( 0 == pthread_mutex_init( &pool_out->readers_lock, NULL ) );
+        if( success )
+            {
+            success = ( 0 == pthread_cond_init( &pool_out->reader_released, NULL ) );
+            if( !success )
+                {
+                pthread_mutex_destroy( &pool_out->readers_lock );
+                }
+            }
+        if( !success )
+            {
+            pthread_mutex_destroy( &pool_out->writer_lock );
+            }
+        }
+    }
+
+{% if dataset.get_row_cache_models() %}
+if( success )
+    {
+    success = {{dataset | row_cache_name('open')}}( &pool_out->rows );
+    if( success )
+        {
+        {{dataset | stmt_cache_rows_set_function_name}}( &pool_out->writer, &pool_out->rows );
+        for( i = 0; i < reader_cnt; i++ )
+            {
+            {{dataset | stmt_cache_rows_set_function_name}}( &pool_out->readers[i], &pool_out->rows );
+            }
+        }
+    else
+        {
+        pthread_cond_destroy( &pool_out->reader_released );
+        pthread_mutex_destroy( &pool_out->readers_lock );
+        pthread_mutex_destroy( &pool_out->writer_lock );
+        }
+    }
+
+{% endif %}
+if( !success )
+    {
+    {{dataset | pool_function_name('connections_close')}}( pool_out );
+    }
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{dataset | pool_function_name('reader_acquire')}} - Acquire reader
+*
+*    Returns the statement cache of a reader that no
+*    other thread is using, waiting for one to be
+*    released if all are in use. The reader must be
+*    returned with {{dataset | pool_function_name('reader_release')}}.
+*
+**************************************************/
+{{dataset | stmt_cache_pointer_type}} {{dataset | pool_function_name('reader_acquire')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    )
+{
+{{dataset | stmt_cache_pointer_type}} reader;
+int i;
+
+reader = NULL;
+
+pthread_mutex_lock( &pool->readers_lock );
+
+while( NULL == reader )
+    {
+    for( i = 0; ( NULL == reader ) && ( i < pool->reader_cnt ); i++ )
+        {
+        if( !pool->reader_is_acquired[i] )
+            {
+            pool->reader_is_acquired[i] = 1;
+            reader = &pool->readers[i];
+            }
+        }
+
+    if( NULL == reader )
+        {
+        pthread_cond_wait( &pool->reader_released, &pool->readers_lock );
+        }
+    }
+
+pthread_mutex_unlock( &pool->readers_lock );
+
+return reader;
+}
+
+
+/**************************************************
+*
+*    {{dataset | pool_function_name('reader_release')}} - Release reader
+*
+*    Returns a reader acquired with
+*    {{dataset | pool_function_name('reader_acquire')}} to the pool.
+*    Cursors opened on the reader must be closed
+*    first.
+*
+**************************************************/
+void {{dataset | pool_function_name('reader_release')}}
+    (
+    {{dataset | pool_pointer_type}} pool,
+    {{dataset | stmt_cache_pointer_type}} reader
+    )
+{
+pthread_mutex_lock( &pool->readers_lock );
+
+pool->reader_is_acquired[reader - pool->readers] = 0;
+pthread_cond_signal( &pool->reader_released );
+
+pthread_mutex_unlock( &pool->readers_lock );
+}
+
+
+/**************************************************
+*
+*    {{dataset | pool_function_name('writer_acquire')}} - Acquire writer
+*
+*    Returns the statement cache of the pool's only
+*    writer, waiting until no other thread holds it.
+*    The writer must be returned with
+*    {{dataset | pool_function_name('writer_release')}}.
+*
+**************************************************/
+{{dataset | stmt_cache_pointer_type}} {{dataset | pool_function_name('writer_acquire')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    )
+{
+pthread_mutex_lock( &pool->writer_lock );
+
+return &pool->writer;
+}
+
+
+/**************************************************
+*
+*    {{dataset | pool_function_name('writer_release')}} - Release writer
+*
+*    Returns the writer acquired with
+*    {{dataset | pool_function_name('writer_acquire')}} to the pool.
+*
+**************************************************/
+void {{dataset | pool_function_name('writer_release')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    )
+{
+pthread_mutex_unlock( &pool->writer_lock );
+}
+
+
+{% endif %}
+#ifdef {{dataset | profile_macro}}
+/**************************************************
+*
+*    {{dataset | stats_get_function_name}} - Get profiling statistics
+*
+*    Copies the profiling statistics of every
+*    accessor function called on the calling thread
+*    into stats_out, in no particular order, and sets
+*    stats_cnt_out to the number of such functions.
+*    Returns 0 if stats_capacity is too small to hold
+*    them all, in which case only the first
+*    stats_capacity are copied.
+*
+**************************************************/
+int {{dataset | stats_get_function_name}}
+    (
+    {{dataset | stats_c_type}} * stats_out,
+    int stats_capacity,
+    int * stats_cnt_out
+    )
+{
+{{dataset | profile_name('entry_t')}} * entry;
+int cnt;
+
+cnt = 0;
+
+for( entry = {{dataset | profile_name('entries')}}; NULL != entry; entry = entry->next )
+    {
+    if( cnt < stats_capacity )
+        {
+        stats_out[cnt] = entry->stats;
+        }
+    cnt++;
+    }
+
+*stats_cnt_out = cnt;
+
+return ( cnt <= stats_capacity );
+}
+
+
+/**************************************************
+*
+*    {{dataset | stats_reset_function_name}} - Reset profiling statistics
+*
+*    Sets the profiling statistics of every accessor
+*    function called on the calling thread back to
+*    zero.
+*
+**************************************************/
+void {{dataset | stats_reset_function_name}}
+    (
+    void
+    )
+{
+{{dataset | profile_name('entry_t')}} * entry;
+char const * function;
+
+for( entry = {{dataset | profile_name('entries')}}; NULL != entry; entry = entry->next )
+    {
+    function = entry->stats.function;
+    memset( &entry->stats, 0, sizeof( entry->stats ) );
+    entry->stats.function = function;
+    }
+}
+
+
+#endif
+{% endif %}
+{% for cached in accessor_variants %}
+{% for model in source_models %}
+{% set function_name = model | model_delete_by_id_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Delete {{model.name}} by id
+*
+*    Deletes the {{model.name}} record in the database
+*    with the specified id.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 id
+    )
+{
+int success;
+sqlite3_stmt * delete_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+delete_query = NULL;
+
+success = ( SQLITE_OK == {{model | model_delete_by_id_query_string | stmt_prepare_call(dataset, function_name, 'delete_query', cached)}} );
+success &= ( SQLITE_OK == sqlite3_bind_int64( delete_query, 1, id ) );
+
+success &= ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( delete_query ) ) );
+
+{{'delete_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('remove')}}( cache->rows, cache->rows->{{model | model_row_cache_member}}, id );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, sqlite3_changes( {{cached | accessor_db_var}} ) );
+
+return success;
+}
+
+
+{% set function_name = model | model_find_by_id_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Find {{model.name}} by id
+*
+*    Retrieves the model in the {{model.get_table_name()}} database table
+*    with the specified id. If a model is found, then
+*    found_out will be set to 1, and model_out will
+*    be populated with the retrieved record. Otherwise,
+*    found_out will be set ot 0. It is the caller's
+*    responsibility to call {{model.get_free_function_name()}} on model_out.
+{% if cached and model.row_cache %}
+*    If a row cache is attached to the statement
+*    cache, the model is copied from it when present,
+*    and added to it when read from the database.
+{% endif %}
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 id,
+    int * found_out,
+    {{model.get_pointer_type()}} model_out
+    )
+{
+int success;
+{% if cached and model.row_cache %}
+int is_cached;
+sqlite3_uint64 generation;
+{% endif %}
+sqlite3_stmt * find_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+find_query = NULL;
+*found_out = 0;
+{{model.get_init_function_name()}}( model_out );
+
+{% if cached and model.row_cache %}
+success = 1;
+is_cached = 0;
+generation = 0;
+
+if( NULL != cache->rows )
+    {
+    success = {{model | model_row_cache_function_name('get')}}( cache->rows, id, &is_cached, model_out, &generation );
+    *found_out = is_cached;
+    }
+
+if( success && !is_cached )
+    {
+    success = ( SQLITE_OK == {{model | model_find_by_id_query_string | stmt_prepare_call(dataset, function_name, 'find_query', cached)}} );
+    success &= ( SQLITE_OK == sqlite3_bind_int64( find_query, 1, id ) );
+
+    success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_find( find_query, {{model | model_from_row_result_function_name}}, found_out, model_out ) ) );
+
+    {{'find_query' | stmt_release_call(dataset, function_name, cached)}};
+
+    if( success && *found_out && ( NULL != cache->rows ) )
+        {
+        {{model | model_row_cache_function_name('put')}}( cache->rows, model_out, generation );
+        }
+    }
+{% else %}
+success = ( SQLITE_OK == {{model | model_find_by_id_query_string | stmt_prepare_call(dataset, function_name, 'find_query', cached)}} );
+success &= ( SQLITE_OK == sqlite3_bind_int64( find_query, 1, id ) );
+
+success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_find( find_query, {{model | model_from_row_result_function_name}}, found_out, model_out ) ) );
+
+{{'find_query' | stmt_release_call(dataset, function_name, cached)}};
+{% endif %}
+
+{{dataset | profile_macro('EXIT')}}( success, *found_out );
+
+return success;
+}
+
+
+{% set function_name = model | model_find_many_by_id_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Find many {{model.name}} by id
+*
+*    Retrieves the models in the {{model.get_table_name()}} database table
+*    with the id_cnt specified ids, looking up
+*    {{model | model_find_many_chunk_size_macro}} ids with each statement.
+*    models_out is set to id_cnt models in the same
+*    order as ids, each holding the record with the
+*    id at the same index. If missing_out is not
+*    NULL, it must have room for ( id_cnt + 7 ) / 8
+*    bytes, and bit ( i % 8 ) of missing_out[ i / 8 ]
+*    is set if no record has the id ids[ i ], in which
+*    case models_out->list[ i ] is left initialized.
+*    The caller must call {{model.get_list_free_function_name()}}
+*    on models_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 const * ids,
+    int id_cnt,
+    {{model.get_list_pointer_type()}} models_out,
+    unsigned char * missing_out
+    )
+{
+int success;
+int rcode;
+int i;
+int chunk_start;
+int chunk_cnt;
+int found_cnt;
+sqlite3_int64 id;
+sqlite3_stmt * find_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+rcode = SQLITE_DONE;
+found_cnt = 0;
+find_query = NULL;
+{{model.get_list_init_function_name()}}( models_out );
+
+success = ( id_cnt >= 0 );
+if( ( success ) && ( id_cnt > 0 ) )
+    {
+    models_out->list = malloc( id_cnt * sizeof( *models_out->list ) );
+    success = ( NULL != models_out->list );
+    }
+
+if( success )
+    {
+    if( NULL != missing_out )
+        {
+        memset( missing_out, 0, ( id_cnt + 7 ) / 8 );
+        }
+
+    for( i = 0; i < id_cnt; i++ )
+        {
+        {{model.get_init_function_name()}}( &models_out->list[i] );
+        if( NULL != missing_out )
+            {
+            missing_out[i / 8] |= (unsigned char)( 1 << ( i % 8 ) );
+            }
+        }
+    models_out->cnt = id_cnt;
+    }
+
+success = success && ( SQLITE_OK == {{model | model_find_many_by_id_query_string | stmt_prepare_call(dataset, function_name, 'find_query', cached)}} );
+
+for( chunk_start = 0; ( success ) && ( chunk_start < id_cnt ); chunk_start += {{model | model_find_many_chunk_size_macro}} )
+    {
+    chunk_cnt = id_cnt - chunk_start;
+    if( chunk_cnt > {{model | model_find_many_chunk_size_macro}} )
+        {
+        chunk_cnt = {{model | model_find_many_chunk_size_macro}};
+        }
+
+    // Pad a partial chunk by repeating its last id, which cannot match any additional records
+    for( i = 0; i < {{model | model_find_many_chunk_size_macro}}; i++ )
+        {
+        success &= ( SQLITE_OK == sqlite3_bind_int64( find_query, i + 1, ids[chunk_start + ( ( i < chunk_cnt ) ? i : ( chunk_cnt - 1 ) )] ) );
+        }
+
+    while( ( success ) && ( SQLITE_ROW == ( rcode = {{dataset | profile_macro('STEP')}}( sqlite3_step( find_query ) ) ) ) )
+        {
+        id = sqlite3_column_int64( find_query, {{model.get_primary_key_field() | field_column_enum(model)}} );
+
+        // Every index holding the id gets its own copy of the record
+        for( i = chunk_start; ( success ) && ( i < chunk_start + chunk_cnt ); i++ )
+            {
+            if( ids[i] == id )
+                {
+                {% if dataset.options.arena_lists and model.has_dynamic_fields() %}
+                success = {{model | model_from_row_result_arena_function_name}}( find_query, &models_out->arena, &models_out->list[i] );
+                {% else %}
+                success = {{model | model_from_row_result_function_name}}( find_query, &models_out->list[i] );
+                {% endif %}
+                found_cnt++;
+                if( NULL != missing_out )
+                    {
+                    missing_out[i / 8] &= (unsigned char)~( 1 << ( i % 8 ) );
+                    }
+                }
+            }
+        }
+
+    success = ( success ) && ( SQLITE_DONE == rcode );
+    sqlite3_reset( find_query );
+    }
+
+{{'find_query' | stmt_release_call(dataset, function_name, cached)}};
+
+if( !success )
+    {
+    {{model.get_list_free_function_name()}}( models_out );
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, found_cnt );
+
+return success;
+}
+
+
+{% if dataset.options.zero_copy %}
+{% set function_name = model | model_find_by_id_function_name | view_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Find {{model.name}} view by id
+*
+*    Retrieves the model in the {{model.get_table_name()}} database table
+*    with the specified id without copying it. If a
+*    model is found, then found_out will be set to 1,
+*    and view_out will point into the row held by
+*    cursor_out. Otherwise, found_out will be set to 0.
+*    view_out is only valid until cursor_out is
+*    closed. The caller must call
+*    {{model | model_cursor_close_function_name}} on cursor_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 id,
+    {{model.get_cursor_pointer_type()}} cursor_out,
+    int * found_out,
+    {{model.get_view_pointer_type()}} view_out
+    )
+{
+int success;
+sqlite3_stmt * find_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+find_query = NULL;
+*found_out = 0;
+memset( cursor_out, 0, sizeof( *cursor_out ) );
+
+success = ( SQLITE_OK == {{model | model_find_by_id_query_string | stmt_prepare_call(dataset, function_name, 'find_query', cached)}} );
+success &= ( SQLITE_OK == sqlite3_bind_int64( find_query, 1, id ) );
+
+cursor_out->query = find_query;
+{% if cached %}
+cursor_out->cache = cache;
+cursor_out->stmt_id = {{function_name | stmt_id('find_query')}};
+{% endif %}
+
+success = success && {{model | model_cursor_next_view_function_name}}( cursor_out, found_out, view_out );
+
+if( !success )
+    {
+    {{model | model_cursor_close_function_name}}( cursor_out );
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, *found_out );
+
+return success;
+}
+
+
+{% endif %}
+{% set function_name = model | model_insert_new_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Insert new {{model.name}}
+*
+*    Inserts a new {{model.name}} record into the
+*    provided database. The model parameter's id field
+*    is modified with the generated insert id.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_pointer_type()}} model
+    )
+{
+int success;
+sqlite3_stmt * insert_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+
+success = ( SQLITE_OK == {{model | model_insert_query_string | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} );
+
+// Bind all but the model's primary key so a new primary key is generated upon insertion
+{%for field in model.fields if not field.is_primary_key() %}
+success &= ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'insert_query', 'model')}} );
+{% endfor %}
+
+success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_insert_query_execute( {{cached | accessor_db_var}}, insert_query, &model->{{model.get_primary_key_field().name}} ) ) );
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('remove')}}( cache->rows, cache->rows->{{model | model_row_cache_member}}, model->{{model.get_primary_key_field().name}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, 1 );
+
+return success;
+}
+
+
+{% set function_name = model | model_save_existing_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Save existing {{model.name}}
+*
+*    Saves the provided {{model.name}} as an existing
+*    record in the database, updating any records
+*    with a matching primary key.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_constant_pointer_type()}} model
+    )
+{
+int success;
+sqlite3_stmt * insert_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+
+success = ( SQLITE_OK == {{model | model_insert_query_string | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} );
+
+{%for field in model.fields%}
+success &= ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'insert_query', 'model')}} );
+{% endfor %}
+
+success &= ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( insert_query ) ) );
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('remove')}}( cache->rows, cache->rows->{{model | model_row_cache_member}}, model->{{model.get_primary_key_field().name}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, 1 );
+
+return success;
+}
+
+
+{% set function_name = model | models_count_all_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Get number of {{model.name}} models
+*
+*    Gets the number of {{model.name}} models in
+*    the database.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    int * count_out
+    )
+{
+int success;
+sqlite3_stmt * count_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+count_query = NULL;
+*count_out = 0;
+
+success = ( SQLITE_OK == {{model | models_count_all_query_string | stmt_prepare_call(dataset, function_name, 'count_query', cached)}} );
+
+success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_count_query_execute_prepared( count_query, count_out ) ) );
+
+{{'count_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{{dataset | profile_macro('EXIT')}}( success, 1 );
+
+return success;
+}
+
+
+{% set function_name = model | models_delete_all_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Delete all {{model.name}} models
+*
+*    Deletes all {{model.name}} records from the
+*    database.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}}
+    )
+{
+int success;
+sqlite3_stmt * delete_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+delete_query = NULL;
+
+success = ( SQLITE_OK == {{model | models_delete_all_query_string | stmt_prepare_call(dataset, function_name, 'delete_query', cached)}} );
+
+success &= ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( delete_query ) ) );
+
+{{'delete_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('flush')}}( cache->rows, cache->rows->{{model | model_row_cache_member}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, sqlite3_changes( {{cached | accessor_db_var}} ) );
+
+return success;
+}
+
+
+{% for counted in select_variants %}
+{% set function_name = model | models_get_all_function_name | select_function_name(dataset, counted) %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Get all {{model.name}} models
+*
+*    Retrieves all {{model.name}} models from the
+*    provided database. The caller must call
+*    {{model.get_list_free_function_name()}} on models_out.
+{% if dataset.options.growable_select and counted %}
+*    The models are counted before they are read so
+*    that models_out is allocated with the exact
+*    number of results.
+{% elif dataset.options.growable_select %}
+*    The models are read in a single pass into a list
+*    that grows as needed.
+{% endif %}
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_pointer_type()}} models_out
+    )
+{
+int success;
+sqlite3_stmt * select_query;
+{% if counted %}
+sqlite3_stmt * count_query;
+{% if dataset.options.arena_lists %}
+int cnt;
+{% else %}
+cqlite_rcode_t cqlite_rcode;
+{% endif %}
+{% endif %}
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+select_query = NULL;
+{% if counted %}
+count_query = NULL;
+{% endif %}
+{{model.get_list_init_function_name()}}( models_out );
+
+{% if counted %}
+success = ( SQLITE_OK == {{model | models_get_all_query_string | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} ) &&
+          ( SQLITE_OK == {{model | models_count_all_query_string | stmt_prepare_call(dataset, function_name, 'count_query', cached)}} );
+
+{% if dataset.options.arena_lists %}
+success = success && ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_count_query_execute_prepared( count_query, &cnt ) ) );
+success = success && {{dataset | profile_macro('STEP')}}( {{model | model_select_growable_function_name}}( select_query, cnt, models_out ) );
+{% else %}
+if( success )
+   {
+    cqlite_rcode = {{dataset | profile_macro('STEP')}}( cqlite_select_query_execute_prepared
+        (
+        select_query,
+        count_query,
+        {{model | model_add_to_result_list_function_name}},
+        sizeof( *models_out->list ),
+        (void**)&models_out->list,
+        &models_out->cnt
+        ) );
+    success = ( CQLITE_SUCCESS == cqlite_rcode );
+   }
+{% endif %}
+
+{{'select_query' | stmt_release_call(dataset, function_name, cached)}};
+{{'count_query' | stmt_release_call(dataset, function_name, cached)}};
+{% else %}
+success = ( SQLITE_OK == {{model | models_get_all_query_string | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} );
+
+success = success && {{dataset | profile_macro('STEP')}}( {{model | model_select_growable_function_name}}( select_query, {{dataset.options.select_capacity_hint}}, models_out ) );
+
+{{'select_query' | stmt_release_call(dataset, function_name, cached)}};
+{% endif %}
+
+{{dataset | profile_macro('EXIT')}}( success, models_out->cnt );
+
+return success;
+}
+
+
+{% endfor %}
+{% if model.columnar %}
+{% set function_name = model | models_get_all_function_name | columnar_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Get all {{model.name}} models into columns
+*
+*    Retrieves all {{model.name}} models from the
+*    provided database into one array per field. The
+*    caller must call {{model.get_columns_free_function_name()}}
+*    on columns_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_columns_pointer_type()}} columns_out
+    )
+{
+int success;
+sqlite3_stmt * select_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+select_query = NULL;
+{{model.get_columns_init_function_name()}}( columns_out );
+
+success = ( SQLITE_OK == {{model | models_get_all_query_string | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} );
+
+success = success && {{dataset | profile_macro('STEP')}}( {{model | model_select_columnar_function_name}}( select_query, {{dataset.options.select_capacity_hint}}, columns_out ) );
+
+{{'select_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{{dataset | profile_macro('EXIT')}}( success, columns_out->cnt );
+
+return success;
+}
+
+
+{% endif %}
+{% set function_name = model | models_get_all_function_name | cursor_open_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Open cursor
+*
+*    Opens a cursor over all {{model.name}} models in the
+*    provided database.
+*    Results are read one at a time with
+*    {{model | model_cursor_next_function_name}}. The caller must call
+*    {{model | model_cursor_close_function_name}} on cursor_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_cursor_pointer_type()}} cursor_out
+    )
+{
+int success;
+sqlite3_stmt * select_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+select_query = NULL;
+memset( cursor_out, 0, sizeof( *cursor_out ) );
+
+success = ( SQLITE_OK == {{model | models_get_all_query_string | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} );
+
+cursor_out->query = select_query;
+{% if cached %}
+cursor_out->cache = cache;
+cursor_out->stmt_id = {{function_name | stmt_id('select_query')}};
+{% endif %}
+
+if( !success )
+    {
+    {{model | model_cursor_close_function_name}}( cursor_out );
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, 0 );
+
+return success;
+}
+
+
+{% set function_name = model | models_get_all_function_name %}
+/**************************************************
+*
+*    {{function_name | for_each_function_name | accessor_function_name(cached)}} - Visit each result
+*
+*    Calls visit with each {{model.name}} model in the
+*    provided database.
+*    Every result is read into the same model, which
+*    is only valid for the duration of the visit call.
+*    If visit returns a non-zero value, no further
+*    results are read. visit_rcode_out is set to the
+*    last value returned by visit, or 0 if every
+*    result was visited. visit may call any accessor,
+*    including this one, on the same connection.
+*
+**************************************************/
+int {{function_name | for_each_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_visit_func_c_type()}} visit,
+    void * ctx,
+    int * visit_rcode_out
+    )
+{
+int success;
+int found;
+{{model.get_cursor_c_type()}} cursor;
+{{model.get_c_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | for_each_function_name | accessor_function_name(cached)}}" );
+
+found = 1;
+*visit_rcode_out = 0;
+{{model.get_init_function_name()}}( &model );
+
+success = {{function_name | cursor_open_function_name | accessor_function_name(cached)}}( {{cached | accessor_db_param_var}}, &cursor );
+
+while( ( success ) && ( found ) && ( 0 == *visit_rcode_out ) )
+    {
+    success = {{model | model_cursor_next_function_name}}( &cursor, &found, &model );
+
+    if( ( success ) && ( found ) )
+        {
+        {{dataset | profile_macro('ROWS')}}( 1 );
+        *visit_rcode_out = visit( &model, ctx );
+        }
+    }
+
+{{model | model_cursor_close_function_name}}( &cursor );
+{{model.get_free_function_name()}}( &model );
+
+{{dataset | profile_macro('EXIT')}}( success, 0 );
+
+return success;
+}
+
+
+{% set function_name = model | models_insert_all_new_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Insert all {{model.name}} as new models
+*
+*    Inserts all provided {{model.name}} models into the
+*    database. The id fields of each item in the models
+*    list is modified with the generated insert id for
+*    that model.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_pointer_type()}} models
+    )
+{
+int success;
+sqlite3_stmt * insert_query;
+int i;
+{{model.get_pointer_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+
+success = ( SQLITE_OK == {{model | model_insert_query_string | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} );
+
+for( i = 0; ( success ) && ( i < models->cnt ); i++)
+    {
+    model = &models->list[i];
+
+    // Bind all but the model's primary key so a new primary key is generated upon insertion
+    {%for field in model.fields if not field.is_primary_key() %}
+    success &= ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'insert_query', 'model')}} );
+    {% endfor %}
+
+    success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_insert_query_execute( {{cached | accessor_db_var}}, insert_query, &model->{{model.get_primary_key_field().name}} ) ) );
+
+    success &= ( SQLITE_OK == sqlite3_clear_bindings( insert_query ) );
+    }
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% set function_name = model | models_save_all_existing_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Save all {{model.name}} as existing models
+*
+*    Saves all provided {{model.name}} models into the
+*    database as existing records updating any previous
+*    records with matching ids.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models
+    )
+{
+int success;
+sqlite3_stmt * insert_query;
+int i;
+{{model.get_pointer_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+
+success = ( SQLITE_OK == {{model | model_insert_query_string | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} );
+
+for( i = 0; ( success ) && ( i < models->cnt ); i++)
+    {
+    model = &models->list[i];
+
+    {%for field in model.fields %}
+    success &= ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'insert_query', 'model')}} );
+    {% endfor %}
+
+    success &= ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( insert_query ) ) );
+    success &= ( SQLITE_OK == sqlite3_reset( insert_query ) );
+
+    success &= ( SQLITE_OK == sqlite3_clear_bindings( insert_query ) );
+    }
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% set function_name = model | models_insert_all_new_batched_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Insert all {{model.name}} as new models in batches
+*
+*    Inserts all provided {{model.name}} models into the
+*    database. The id fields of each item in the models
+*    list is modified with the generated insert id for
+*    that model.
+*
+*    The models are written in transactions of
+*    batch_size models each. If batch_size is not
+*    positive, {{model | model_batch_size_macro}} is used.
+*    On failure, the transaction holding the current
+*    batch is rolled back, leaving only the previously
+*    committed batches in the database, and
+*    failed_idx_out is set to the index of the model
+*    being written. Otherwise, failed_idx_out is set
+*    to -1. The caller must not already be in a
+*    transaction.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_pointer_type()}} models,
+    int batch_size,
+    int * failed_idx_out
+    )
+{
+int success;
+int in_transaction;
+sqlite3_stmt * insert_query;
+int i;
+{{model.get_pointer_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+in_transaction = 0;
+*failed_idx_out = -1;
+
+if( batch_size <= 0 )
+    {
+    batch_size = {{model | model_batch_size_macro}};
+    }
+
+success = ( SQLITE_OK == {{model | model_insert_query_string | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} );
+
+for( i = 0; ( success ) && ( i < models->cnt ); i++)
+    {
+    model = &models->list[i];
+
+    if( 0 == ( i % batch_size ) )
+        {
+        success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "BEGIN IMMEDIATE;", NULL, NULL, NULL ) ) );
+        in_transaction = success;
+        }
+
+    // Bind all but the model's primary key so a new primary key is generated upon insertion
+    {%for field in model.fields if not field.is_primary_key() %}
+    success = success && ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'insert_query', 'model')}} );
+    {% endfor %}
+
+    success = success && ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_insert_query_execute( {{cached | accessor_db_var}}, insert_query, &model->{{model.get_primary_key_field().name}} ) ) );
+
+    success = success && ( SQLITE_OK == sqlite3_clear_bindings( insert_query ) );
+
+    if( ( success ) && ( ( 0 == ( ( i + 1 ) % batch_size ) ) || ( ( i + 1 ) == models->cnt ) ) )
+        {
+        success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "COMMIT;", NULL, NULL, NULL ) ) );
+        in_transaction = !success;
+        }
+
+    if( !success )
+        {
+        *failed_idx_out = i;
+        }
+    }
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+
+if( in_transaction )
+    {
+    sqlite3_exec( {{cached | accessor_db_var}}, "ROLLBACK;", NULL, NULL, NULL );
+    }
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% set function_name = model | models_save_all_existing_batched_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Save all {{model.name}} as existing models in batches
+*
+*    Saves all provided {{model.name}} models into the
+*    database as existing records updating any previous
+*    records with matching ids.
+*
+*    The models are written in transactions of
+*    batch_size models each. If batch_size is not
+*    positive, {{model | model_batch_size_macro}} is used.
+*    On failure, the transaction holding the current
+*    batch is rolled back, leaving only the previously
+*    committed batches in the database, and
+*    failed_idx_out is set to the index of the model
+*    being written. Otherwise, failed_idx_out is set
+*    to -1. The caller must not already be in a
+*    transaction.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models,
+    int batch_size,
+    int * failed_idx_out
+    )
+{
+int success;
+int in_transaction;
+sqlite3_stmt * insert_query;
+int i;
+{{model.get_pointer_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+in_transaction = 0;
+*failed_idx_out = -1;
+
+if( batch_size <= 0 )
+    {
+    batch_size = {{model | model_batch_size_macro}};
+    }
+
+success = ( SQLITE_OK == {{model | model_insert_query_string | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} );
+
+for( i = 0; ( success ) && ( i < models->cnt ); i++)
+    {
+    model = &models->list[i];
+
+    if( 0 == ( i % batch_size ) )
+        {
+        success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "BEGIN IMMEDIATE;", NULL, NULL, NULL ) ) );
+        in_transaction = success;
+        }
+
+    {%for field in model.fields %}
+    success = success && ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'insert_query', 'model')}} );
+    {% endfor %}
+
+    success = success && ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( insert_query ) ) );
+    success = success && ( SQLITE_OK == sqlite3_reset( insert_query ) );
+
+    success = success && ( SQLITE_OK == sqlite3_clear_bindings( insert_query ) );
+
+    if( ( success ) && ( ( 0 == ( ( i + 1 ) % batch_size ) ) || ( ( i + 1 ) == models->cnt ) ) )
+        {
+        success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "COMMIT;", NULL, NULL, NULL ) ) );
+        in_transaction = !success;
+        }
+
+    if( !success )
+        {
+        *failed_idx_out = i;
+        }
+    }
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+
+if( in_transaction )
+    {
+    sqlite3_exec( {{cached | accessor_db_var}}, "ROLLBACK;", NULL, NULL, NULL );
+    }
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% set function_name = model | models_insert_all_new_bulk_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Insert all {{model.name}} as new models in bulk
+*
+*    Inserts all provided {{model.name}} models into the
+*    database using multi-row inserts of
+*    {{model | model_bulk_insert_rows_macro}} models each. The remaining
+*    models are inserted one at a time. The id fields
+*    of each item in the models list is modified with
+*    the generated insert id for that model.
+*
+*    New ids are derived from the last insert row id
+*    of each statement, relying on SQLite assigning
+*    consecutive ids to the rows of a multi-row insert
+*    into the {{model.get_table_name()}} table. Unlike
+*    {{model | models_insert_all_new_function_name}}, a model that conflicts
+*    with an existing record causes the insert to fail
+*    rather than replacing that record. The function
+*    does not begin a transaction, and calling it
+*    within one avoids a commit per statement.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_pointer_type()}} models
+    )
+{
+int success;
+sqlite3_stmt * insert_query;
+sqlite3_stmt * tail_query;
+sqlite3_int64 last_id;
+int i;
+int j;
+{{model.get_pointer_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+insert_query = NULL;
+tail_query = NULL;
+
+success = ( SQLITE_OK == {{model | model_bulk_insert_query_var | stmt_prepare_call(dataset, function_name, 'insert_query', cached)}} ) &&
+          ( SQLITE_OK == {{model | model_bulk_insert_tail_query_string | stmt_prepare_call(dataset, function_name, 'tail_query', cached)}} );
+
+for( i = 0; ( success ) && ( ( models->cnt - i ) >= {{model | model_bulk_insert_rows_macro}} ); i += {{model | model_bulk_insert_rows_macro}} )
+    {
+    for( j = 0; j < {{model | model_bulk_insert_rows_macro}}; j++ )
+        {
+        model = &models->list[i + j];
+
+        // Bind all but the model's primary key so a new primary key is generated upon insertion
+        {%for field in model.fields if not field.is_primary_key() %}
+        success &= ( SQLITE_OK == {{field | field_bulk_bind_function_call(model, dataset, 'insert_query', 'model', 'j')}} );
+        {% endfor %}
+        }
+
+    success = success && ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( insert_query ) ) );
+    success = success && ( SQLITE_OK == sqlite3_reset( insert_query ) );
+
+    if( success )
+        {
+        last_id = sqlite3_last_insert_rowid( {{cached | accessor_db_var}} );
+        for( j = 0; j < {{model | model_bulk_insert_rows_macro}}; j++ )
+            {
+            models->list[i + j].{{model.get_primary_key_field().name}} = last_id - {{model | model_bulk_insert_rows_macro}} + 1 + j;
+            }
+        }
+    }
+
+for( ; ( success ) && ( i < models->cnt ); i++ )
+    {
+    model = &models->list[i];
+
+    // Bind all but the model's primary key so a new primary key is generated upon insertion
+    {%for field in model.fields if not field.is_primary_key() %}
+    success &= ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'tail_query', 'model')}} );
+    {% endfor %}
+
+    success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_insert_query_execute( {{cached | accessor_db_var}}, tail_query, &model->{{model.get_primary_key_field().name}} ) ) );
+    }
+
+{{'insert_query' | stmt_release_call(dataset, function_name, cached)}};
+{{'tail_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% if model | model_has_field_mask %}
+{% set function_name = model | models_update_all_fields_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Update fields of all {{model.name}} models
+*
+*    Updates only the columns selected by field_mask
+*    in the existing records with the ids of the
+*    provided {{model.name}} models, leaving the other
+*    columns and their index entries untouched. Models
+*    without an existing record are skipped. Fields
+*    are selected with the {{model.get_table_name() | upper}}_FIELD_* macros,
+*    and the primary key is never updated.
+*
+*    All models are written in a single transaction
+*    with one prepared statement. The statement
+*    depends on field_mask, so it is prepared on each
+*    call rather than kept in a statement cache. On
+*    failure, the transaction is rolled back. The
+*    caller must not already be in a transaction.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models,
+    sqlite3_uint64 field_mask
+    )
+{
+int success;
+int in_transaction;
+int field_cnt;
+sqlite3_stmt * update_query;
+int i;
+{{model.get_pointer_type()}} model;
+char set_clause[ {{model | model_update_fields_query_size}} ];
+char query_string[ {{model | model_update_fields_query_size}} ];
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+success = 1;
+update_query = NULL;
+in_transaction = 0;
+field_cnt = 0;
+set_clause[0] = '\0';
+
+{% for field in model.fields if not field.is_primary_key() %}
+if( 0 != ( field_mask & {{field | field_mask_macro(model)}} ) )
+    {
+    strcat( set_clause, ( 0 == field_cnt++ ) ? {{field | field_update_set_string(model, False)}} : ", " {{field | field_update_set_string(model, False)}} );
+    }
+{% endfor %}
+
+// There is nothing to update unless a field other than the primary key is selected
+if( field_cnt > 0 )
+    {
+    strcpy( query_string, {{model | model_update_query_head}} );
+    strcat( query_string, set_clause );
+    strcat( query_string, {{model | model_update_query_tail}} );
+
+    success = ( SQLITE_OK == {{dataset | profile_macro('PREPARE')}}( sqlite3_prepare_v2( {{cached | accessor_db_var}}, query_string, -1, &update_query, NULL ) ) );
+    success = success && ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "BEGIN IMMEDIATE;", NULL, NULL, NULL ) ) );
+    in_transaction = success;
+    }
+
+for( i = 0; ( in_transaction ) && ( success ) && ( i < models->cnt ); i++ )
+    {
+    model = &models->list[i];
+
+    success = ( SQLITE_OK == {{model.get_primary_key_field() | field_bind_function_call(model, dataset, 'update_query', 'model')}} );
+    {% for field in model.fields if not field.is_primary_key() %}
+    if( 0 != ( field_mask & {{field | field_mask_macro(model)}} ) )
+        {
+        success = success && ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'update_query', 'model')}} );
+        }
+    {% endfor %}
+
+    success = success && ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( update_query ) ) );
+    success = success && ( SQLITE_OK == sqlite3_reset( update_query ) );
+    }
+
+if( ( in_transaction ) && ( success ) )
+    {
+    success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "COMMIT;", NULL, NULL, NULL ) ) );
+    in_transaction = !success;
+    }
+
+{{'update_query' | stmt_release_call(dataset, function_name, False)}};
+
+if( in_transaction )
+    {
+    sqlite3_exec( {{cached | accessor_db_var}}, "ROLLBACK;", NULL, NULL, NULL );
+    }
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% set function_name = model | models_upsert_all_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Upsert all {{model.name}} models
+*
+*    Inserts all provided {{model.name}} models into the
+*    database with their ids. When a record with the
+*    same id already exists, only the columns selected
+*    by field_mask are updated instead, leaving the
+*    other columns and their index entries untouched.
+*    If no field is selected, existing records are
+*    left unchanged. Fields are selected with the
+*    {{model.get_table_name() | upper}}_FIELD_* macros.
+*
+*    Unlike {{model | models_save_all_existing_function_name}}, an existing
+*    record is updated in place rather than deleted
+*    and inserted again. All models are written in a
+*    single transaction with one prepared statement.
+*    The statement depends on field_mask, so it is
+*    prepared on each call rather than kept in a
+*    statement cache. On failure, the transaction is
+*    rolled back. The caller must not already be in a
+*    transaction.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models,
+    sqlite3_uint64 field_mask
+    )
+{
+int success;
+int in_transaction;
+int field_cnt;
+sqlite3_stmt * upsert_query;
+int i;
+{{model.get_pointer_type()}} model;
+char set_clause[ {{model | model_update_fields_query_size}} ];
+char query_string[ {{model | model_update_fields_query_size}} ];
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+upsert_query = NULL;
+in_transaction = 0;
+field_cnt = 0;
+set_clause[0] = '\0';
+
+{% for field in model.fields if not field.is_primary_key() %}
+if( 0 != ( field_mask & {{field | field_mask_macro(model)}} ) )
+    {
+    strcat( set_clause, ( 0 == field_cnt++ ) ? {{field | field_update_set_string(model, True)}} : ", " {{field | field_update_set_string(model, True)}} );
+    }
+{% endfor %}
+
+strcpy( query_string, {{model | model_upsert_query_head}} );
+strcat( query_string, ( field_cnt > 0 ) ? "UPDATE SET " : "NOTHING" );
+strcat( query_string, set_clause );
+strcat( query_string, ";" );
+
+success = ( SQLITE_OK == {{dataset | profile_macro('PREPARE')}}( sqlite3_prepare_v2( {{cached | accessor_db_var}}, query_string, -1, &upsert_query, NULL ) ) );
+success = success && ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "BEGIN IMMEDIATE;", NULL, NULL, NULL ) ) );
+in_transaction = success;
+
+for( i = 0; ( success ) && ( i < models->cnt ); i++ )
+    {
+    model = &models->list[i];
+
+    {% for field in model.fields %}
+    success = success && ( SQLITE_OK == {{field | field_bind_function_call(model, dataset, 'upsert_query', 'model')}} );
+    {% endfor %}
+
+    success = success && ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( upsert_query ) ) );
+    success = success && ( SQLITE_OK == sqlite3_reset( upsert_query ) );
+    }
+
+if( ( in_transaction ) && ( success ) )
+    {
+    success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "COMMIT;", NULL, NULL, NULL ) ) );
+    in_transaction = !success;
+    }
+
+{{'upsert_query' | stmt_release_call(dataset, function_name, False)}};
+
+if( in_transaction )
+    {
+    sqlite3_exec( {{cached | accessor_db_var}}, "ROLLBACK;", NULL, NULL, NULL );
+    }
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{model | model_row_cache_function_name('remove_list')}}( cache->rows, models );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, models->cnt );
+
+return success;
+}
+
+
+{% endif %}
+{%for query in model.get_count_queries() %}
+/**************************************************
+*
+*    {{query.name | accessor_function_name(cached)}}
+*
+*    Executes a custom count query with the provided
+*    parameters on the {{model.get_table_name()}} database table
+*    and outputs the retrieved count.
+*
+**************************************************/
+int {{query.name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    int * count_out
+    )
+{
+int success;
+sqlite3_stmt * count_query;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | accessor_function_name(cached)}}" );
+
+count_query = NULL;
+*count_out = 0;
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, query.name, 'count_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'count_query')}} );
+{% endfor %}
+
+success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_count_query_execute_prepared( count_query, count_out ) ) );
+
+{{'count_query' | stmt_release_call(dataset, query.name, cached)}};
+
+{{dataset | profile_macro('EXIT')}}( success, 1 );
+
+return success;
+}
+
+
+{% endfor %}
+{%for query in model.get_delete_queries() %}
+/**************************************************
+*
+*    {{query.name | accessor_function_name(cached)}}
+*
+*    Executes a custom delete query with the provided
+*    parameters on the {{model.get_table_name()}} database table.
+*
+**************************************************/
+int {{query.name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}}{%if query.params %},{% endif %}
+
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}}{%if not loop.last %},{% endif %}
+
+    {% endfor %}
+    )
+{
+int success;
+sqlite3_stmt * delete_query;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | accessor_function_name(cached)}}" );
+
+delete_query = NULL;
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, query.name, 'delete_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'delete_query')}} );
+{% endfor %}
+
+success &= ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( delete_query ) ) );
+
+{{'delete_query' | stmt_release_call(dataset, query.name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('flush')}}( cache->rows, cache->rows->{{model | model_row_cache_member}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, sqlite3_changes( {{cached | accessor_db_var}} ) );
+
+return success;
+}
+
+
+{% if query.params %}
+/**************************************************
+*
+*    {{query.name | batch_function_name | accessor_function_name(cached)}}
+*
+*    Executes a custom delete query on the
+*    {{model.get_table_name()}} database table once for each of the
+*    params_cnt parameter sets in params, reusing a
+*    single prepared statement. If changes_out is not
+*    NULL, it must have room for params_cnt values,
+*    and changes_out[ i ] is set to the number of rows
+*    changed by params[ i ]. All parameter sets are
+*    run in a single transaction, which is rolled
+*    back on failure. The caller must not already be
+*    in a transaction.
+*
+**************************************************/
+int {{query.name | batch_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{query.get_params_constant_pointer_type()}} params,
+    int params_cnt,
+    int * changes_out
+    )
+{
+int success;
+int in_transaction;
+int changes_cnt;
+int i;
+sqlite3_stmt * delete_query;
+{{query.get_params_constant_pointer_type()}} param;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | batch_function_name | accessor_function_name(cached)}}" );
+
+delete_query = NULL;
+in_transaction = 0;
+changes_cnt = 0;
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, query.name, 'delete_query', cached)}} );
+success = success && ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "BEGIN IMMEDIATE;", NULL, NULL, NULL ) ) );
+in_transaction = success;
+
+for( i = 0; ( success ) && ( i < params_cnt ); i++ )
+    {
+    param = &params[i];
+
+    {%for query_param in query.params %}
+    success = success && ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'delete_query', 'param')}} );
+    {% endfor %}
+
+    success = success && ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( delete_query ) ) );
+    success = success && ( SQLITE_OK == sqlite3_reset( delete_query ) );
+    success = success && ( SQLITE_OK == sqlite3_clear_bindings( delete_query ) );
+
+    if( success )
+        {
+        changes_cnt += sqlite3_changes( {{cached | accessor_db_var}} );
+        if( NULL != changes_out )
+            {
+            changes_out[i] = sqlite3_changes( {{cached | accessor_db_var}} );
+            }
+        }
+    }
+
+if( ( in_transaction ) && ( success ) )
+    {
+    success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "COMMIT;", NULL, NULL, NULL ) ) );
+    in_transaction = !success;
+    }
+
+{{'delete_query' | stmt_release_call(dataset, query.name, cached)}};
+
+if( in_transaction )
+    {
+    sqlite3_exec( {{cached | accessor_db_var}}, "ROLLBACK;", NULL, NULL, NULL );
+    }
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('flush')}}( cache->rows, cache->rows->{{model | model_row_cache_member}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, changes_cnt );
+
+return success;
+}
+
+
+{% endif %}
+{% endfor %}
+{%for query in model.get_find_queries() %}
+{% set result_model = query.get_result_model(model) %}
+/**************************************************
+*
+*    {{query.name | accessor_function_name(cached)}}
+*
+*    Executes a custom find query that is expected to
+*    only return a single result with the provided
+*    parameters on the {{model.get_table_name()}} database table.
+*    If a record was found, found_out will be set
+*    to 1, and model_out will be populated with the
+*    matching record. Otherwise, found_out will be
+*    set to 0. It is the caller's responsibility
+*    to call {{result_model.get_free_function_name()}} on model_out.
+*
+**************************************************/
+int {{query.name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    int * found_out,
+    {{result_model.get_pointer_type()}} model_out
+    )
+{
+int success;
+sqlite3_stmt * find_query;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | accessor_function_name(cached)}}" );
+
+find_query = NULL;
+*found_out = 0;
+{{result_model.get_init_function_name()}}( model_out );
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, query.name, 'find_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'find_query')}} );
+{% endfor %}
+
+success &= ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_find( find_query, {{result_model | model_from_row_result_function_name}}, found_out, model_out ) ) );
+
+{{'find_query' | stmt_release_call(dataset, query.name, cached)}};
+
+{{dataset | profile_macro('EXIT')}}( success, *found_out );
+
+return success;
+}
+
+
+{% if dataset.options.zero_copy %}
+{% set function_name = query.name | view_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}}
+*
+*    Executes a custom find query with the provided
+*    parameters on the {{model.get_table_name()}} database table
+*    without copying its result. If a record was
+*    found, found_out will be set to 1, and view_out
+*    will point into the row held by cursor_out.
+*    Otherwise, found_out will be set to 0. view_out
+*    is only valid until cursor_out is closed. The
+*    caller must call {{result_model | model_cursor_close_function_name}}
+*    on cursor_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_cursor_pointer_type()}} cursor_out,
+    int * found_out,
+    {{result_model.get_view_pointer_type()}} view_out
+    )
+{
+int success;
+sqlite3_stmt * find_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+find_query = NULL;
+*found_out = 0;
+memset( cursor_out, 0, sizeof( *cursor_out ) );
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, function_name, 'find_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'find_query')}} );
+{% endfor %}
+
+cursor_out->query = find_query;
+{% if cached %}
+cursor_out->cache = cache;
+cursor_out->stmt_id = {{function_name | stmt_id('find_query')}};
+{% endif %}
+
+success = success && {{result_model | model_cursor_next_view_function_name}}( cursor_out, found_out, view_out );
+
+if( !success )
+    {
+    {{result_model | model_cursor_close_function_name}}( cursor_out );
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, *found_out );
+
+return success;
+}
+
+
+{% endif %}
+{% endfor %}
+{%for query in model.get_select_queries() %}
+{% set result_model = query.get_result_model(model) %}
+{% for counted in select_variants %}
+{% set function_name = query.name | select_function_name(dataset, counted) %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}}
+*
+*    Executes a custom select query that is expected to
+*    return possibly many result with the provided
+*    parameters on the {{model.get_table_name()}} database table.
+*    The caller must call {{result_model.get_list_free_function_name()}}
+*    on models_out.
+{% if dataset.options.growable_select and counted %}
+*    The results are counted before they are read so
+*    that models_out is allocated with the exact
+*    number of results.
+{% elif dataset.options.growable_select %}
+*    The results are read in a single pass into a list
+*    that grows as needed.
+{% endif %}
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_list_pointer_type()}} models_out
+    )
+{
+int success;
+sqlite3_stmt * select_query;
+{% if counted %}
+sqlite3_stmt * count_query;
+{% if dataset.options.arena_lists %}
+int cnt;
+{% else %}
+cqlite_rcode_t cqlite_rcode;
+{% endif %}
+{% endif %}
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+select_query = NULL;
+{% if counted %}
+count_query = NULL;
+{% endif %}
+{{result_model.get_list_init_function_name()}}( models_out );
+
+{% if counted %}
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} ) &&
+          ( SQLITE_OK == {{query | select_query_get_count_query_string(model) | stmt_prepare_call(dataset, function_name, 'count_query', cached)}} );
+{% else %}
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} );
+{% endif %}
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'select_query')}} );
+{% endfor %}
+
+{% if counted %}
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'count_query')}} );
+{% endfor %}
+
+{% if dataset.options.arena_lists %}
+success = success && ( CQLITE_SUCCESS == {{dataset | profile_macro('STEP')}}( cqlite_count_query_execute_prepared( count_query, &cnt ) ) );
+success = success && {{dataset | profile_macro('STEP')}}( {{result_model | model_select_growable_function_name}}( select_query, cnt, models_out ) );
+{% else %}
+if( success )
+   {
+    cqlite_rcode = {{dataset | profile_macro('STEP')}}( cqlite_select_query_execute_prepared
+        (
+        select_query,
+        count_query,
+        {{result_model | model_add_to_result_list_function_name}},
+        sizeof( *models_out->list ),
+        (void**)&models_out->list,
+        &models_out->cnt
+        ) );
+    success = ( CQLITE_SUCCESS == cqlite_rcode );
+   }
+{% endif %}
+
+{{'select_query' | stmt_release_call(dataset, function_name, cached)}};
+{{'count_query' | stmt_release_call(dataset, function_name, cached)}};
+{% else %}
+success = success && {{dataset | profile_macro('STEP')}}( {{result_model | model_select_growable_function_name}}( select_query, {{dataset.options.select_capacity_hint}}, models_out ) );
+
+{{'select_query' | stmt_release_call(dataset, function_name, cached)}};
+{% endif %}
+
+{{dataset | profile_macro('EXIT')}}( success, models_out->cnt );
+
+return success;
+}
+
+
+{% endfor %}
+{% if model.columnar and not query.result_model %}
+{% set function_name = query.name | columnar_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}}
+*
+*    Executes a custom select query with the provided
+*    parameters on the {{model.get_table_name()}} database table,
+*    reading the results into one array per field.
+*    The caller must call {{model.get_columns_free_function_name()}}
+*    on columns_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{model.get_columns_pointer_type()}} columns_out
+    )
+{
+int success;
+sqlite3_stmt * select_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+select_query = NULL;
+{{model.get_columns_init_function_name()}}( columns_out );
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'select_query')}} );
+{% endfor %}
+
+success = success && {{dataset | profile_macro('STEP')}}( {{model | model_select_columnar_function_name}}( select_query, {{dataset.options.select_capacity_hint}}, columns_out ) );
+
+{{'select_query' | stmt_release_call(dataset, function_name, cached)}};
+
+{{dataset | profile_macro('EXIT')}}( success, columns_out->cnt );
+
+return success;
+}
+
+
+{% endif %}
+{% set function_name = query.name | cursor_open_function_name %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(cached)}} - Open cursor
+*
+*    Opens a cursor over the custom select query with the provided
+*    parameters on the {{model.get_table_name()}} database table.
+*    Results are read one at a time with
+*    {{result_model | model_cursor_next_function_name}}. The caller must call
+*    {{result_model | model_cursor_close_function_name}} on cursor_out.
+*
+**************************************************/
+int {{function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_cursor_pointer_type()}} cursor_out
+    )
+{
+int success;
+sqlite3_stmt * select_query;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | accessor_function_name(cached)}}" );
+
+select_query = NULL;
+memset( cursor_out, 0, sizeof( *cursor_out ) );
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, function_name, 'select_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'select_query')}} );
+{% endfor %}
+
+cursor_out->query = select_query;
+{% if cached %}
+cursor_out->cache = cache;
+cursor_out->stmt_id = {{function_name | stmt_id('select_query')}};
+{% endif %}
+
+if( !success )
+    {
+    {{result_model | model_cursor_close_function_name}}( cursor_out );
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, 0 );
+
+return success;
+}
+
+
+{% set function_name = query.name %}
+/**************************************************
+*
+*    {{function_name | for_each_function_name | accessor_function_name(cached)}} - Visit each result
+*
+*    Calls visit with each result of the custom
+*    select query with the provided parameters on the
+*    {{model.get_table_name()}} database table.
+*    Every result is read into the same model, which
+*    is only valid for the duration of the visit call.
+*    If visit returns a non-zero value, no further
+*    results are read. visit_rcode_out is set to the
+*    last value returned by visit, or 0 if every
+*    result was visited. visit may call any accessor,
+*    including this one, on the same connection.
+*
+**************************************************/
+int {{function_name | for_each_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_visit_func_c_type()}} visit,
+    void * ctx,
+    int * visit_rcode_out
+    )
+{
+int success;
+int found;
+{{result_model.get_cursor_c_type()}} cursor;
+{{result_model.get_c_type()}} model;
+{{dataset | profile_macro('ENTER')}}( "{{function_name | for_each_function_name | accessor_function_name(cached)}}" );
+
+found = 1;
+*visit_rcode_out = 0;
+{{result_model.get_init_function_name()}}( &model );
+
+success = {{function_name | cursor_open_function_name | accessor_function_name(cached)}}( {{cached | accessor_db_param_var}}, {%for query_param in query.params %}{{query_param.name}}, {% endfor %}&cursor );
+
+while( ( success ) && ( found ) && ( 0 == *visit_rcode_out ) )
+    {
+    success = {{result_model | model_cursor_next_function_name}}( &cursor, &found, &model );
+
+    if( ( success ) && ( found ) )
+        {
+        {{dataset | profile_macro('ROWS')}}( 1 );
+        *visit_rcode_out = visit( &model, ctx );
+        }
+    }
+
+{{result_model | model_cursor_close_function_name}}( &cursor );
+{{result_model.get_free_function_name()}}( &model );
+
+{{dataset | profile_macro('EXIT')}}( success, 0 );
+
+return success;
+}
+
+
+{% endfor %}
+{%for query in model.get_page_queries() %}
+/**************************************************
+*
+*    {{query.name | accessor_function_name(cached)}}
+*
+*    Executes a custom page query with the provided
+*    parameters on the {{model.get_table_name()}} database table
+*    and reads at most limit results, ordered by
+*    {{query.key_fields | map(attribute='name') | join(', ')}}{% if query.descending %} in descending order{% endif %}, into
+*    models_out, which is allocated with room for
+*    limit models. If last_key is NULL, the first page
+*    is read. Otherwise, the page following the result
+*    with last_key is read. next_key_out is set to the
+*    key of the last result read, and is left
+*    unchanged if no result was read. Reading fewer
+*    than limit results means the last page was read.
+*    The caller must call {{model.get_list_free_function_name()}}
+*    on models_out.
+*
+**************************************************/
+int {{query.name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{query.get_key_constant_pointer_type()}} last_key,
+    int limit,
+    {{model.get_list_pointer_type()}} models_out,
+    {{query.get_key_pointer_type()}} next_key_out
+    )
+{
+int success;
+sqlite3_stmt * first_query;
+sqlite3_stmt * page_query;
+sqlite3_stmt * select_query;
+{{model.get_pointer_type()}} last_model;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | accessor_function_name(cached)}}" );
+
+first_query = NULL;
+page_query = NULL;
+{{model.get_list_init_function_name()}}( models_out );
+
+if( NULL == last_key )
+    {
+    success = ( SQLITE_OK == {{query | page_query_string(model, False) | stmt_prepare_call(dataset, query.name, 'first_query', cached)}} );
+    success &= ( SQLITE_OK == sqlite3_bind_int( first_query, {{query | page_limit_position(False)}}, limit ) );
+    select_query = first_query;
+    }
+else
+    {
+    success = ( SQLITE_OK == {{query | page_query_string(model, True) | stmt_prepare_call(dataset, query.name, 'page_query', cached)}} );
+    {% for field in query.key_fields %}
+    success &= ( SQLITE_OK == {{field | page_key_bind_call(query, dataset, 'page_query', 'last_key')}} );
+    {% endfor %}
+    success &= ( SQLITE_OK == sqlite3_bind_int( page_query, {{query | page_limit_position(True)}}, limit ) );
+    select_query = page_query;
+    }
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'select_query')}} );
+{% endfor %}
+
+success = success && ( limit > 0 );
+success = success && {{dataset | profile_macro('STEP')}}( {{model | model_select_growable_function_name}}( select_query, limit, models_out ) );
+
+{{'first_query' | stmt_release_call(dataset, query.name, cached)}};
+{{'page_query' | stmt_release_call(dataset, query.name, cached)}};
+
+if( ( success ) && ( models_out->cnt > 0 ) )
+    {
+    last_model = &models_out->list[models_out->cnt - 1];
+    {% for field in query.key_fields %}
+    {% if field.has_max_length() %}
+    memcpy( next_key_out->{{field.name}}, last_model->{{field.name}}, sizeof( next_key_out->{{field.name}} ) );
+    {% else %}
+    next_key_out->{{field.name}} = last_model->{{field.name}};
+    {% endif %}
+    {% endfor %}
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, models_out->cnt );
+
+return success;
+}
+
+
+{% endfor %}
+{%for query in model.get_update_queries() %}
+/**************************************************
+*
+*    {{query.name | accessor_function_name(cached)}}
+*
+*    Executes a custom update query with the provided
+*    parameters on the {{model.get_table_name()}} database table.
+*
+**************************************************/
+int {{query.name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}}{%if query.params %},{% endif %}
+
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}}{%if not loop.last %},{% endif %}
+
+    {% endfor %}
+    )
+{
+int success;
+sqlite3_stmt * update_query;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | accessor_function_name(cached)}}" );
+
+update_query = NULL;
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, query.name, 'update_query', cached)}} );
+
+{%for query_param in query.params %}
+success &= ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'update_query')}} );
+{% endfor %}
+
+success &= ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( update_query ) ) );
+
+{{'update_query' | stmt_release_call(dataset, query.name, cached)}};
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('flush')}}( cache->rows, cache->rows->{{model | model_row_cache_member}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, sqlite3_changes( {{cached | accessor_db_var}} ) );
+
+return success;
+}
+
+
+{% if query.params %}
+/**************************************************
+*
+*    {{query.name | batch_function_name | accessor_function_name(cached)}}
+*
+*    Executes a custom update query on the
+*    {{model.get_table_name()}} database table once for each of the
+*    params_cnt parameter sets in params, reusing a
+*    single prepared statement. If changes_out is not
+*    NULL, it must have room for params_cnt values,
+*    and changes_out[ i ] is set to the number of rows
+*    changed by params[ i ]. All parameter sets are
+*    run in a single transaction, which is rolled
+*    back on failure. The caller must not already be
+*    in a transaction.
+*
+**************************************************/
+int {{query.name | batch_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{query.get_params_constant_pointer_type()}} params,
+    int params_cnt,
+    int * changes_out
+    )
+{
+int success;
+int in_transaction;
+int changes_cnt;
+int i;
+sqlite3_stmt * update_query;
+{{query.get_params_constant_pointer_type()}} param;
+{{dataset | profile_macro('ENTER')}}( "{{query.name | batch_function_name | accessor_function_name(cached)}}" );
+
+update_query = NULL;
+in_transaction = 0;
+changes_cnt = 0;
+
+success = ( SQLITE_OK == {{query | query_get_full_string(model) | stmt_prepare_call(dataset, query.name, 'update_query', cached)}} );
+success = success && ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "BEGIN IMMEDIATE;", NULL, NULL, NULL ) ) );
+in_transaction = success;
+
+for( i = 0; ( success ) && ( i < params_cnt ); i++ )
+    {
+    param = &params[i];
+
+    {%for query_param in query.params %}
+    success = success && ( SQLITE_OK == {{query_param | query_param_bind_call(dataset, 'update_query', 'param')}} );
+    {% endfor %}
+
+    success = success && ( SQLITE_DONE == {{dataset | profile_macro('STEP')}}( sqlite3_step( update_query ) ) );
+    success = success && ( SQLITE_OK == sqlite3_reset( update_query ) );
+    success = success && ( SQLITE_OK == sqlite3_clear_bindings( update_query ) );
+
+    if( success )
+        {
+        changes_cnt += sqlite3_changes( {{cached | accessor_db_var}} );
+        if( NULL != changes_out )
+            {
+            changes_out[i] = sqlite3_changes( {{cached | accessor_db_var}} );
+            }
+        }
+    }
+
+if( ( in_transaction ) && ( success ) )
+    {
+    success = ( SQLITE_OK == {{dataset | profile_macro('STEP')}}( sqlite3_exec( {{cached | accessor_db_var}}, "COMMIT;", NULL, NULL, NULL ) ) );
+    in_transaction = !success;
+    }
+
+{{'update_query' | stmt_release_call(dataset, query.name, cached)}};
+
+if( in_transaction )
+    {
+    sqlite3_exec( {{cached | accessor_db_var}}, "ROLLBACK;", NULL, NULL, NULL );
+    }
+
+{% if cached and model.row_cache %}
+if( NULL != cache->rows )
+    {
+    {{dataset | row_cache_name('flush')}}( cache->rows, cache->rows->{{model | model_row_cache_member}} );
+    }
+
+{% endif %}
+{{dataset | profile_macro('EXIT')}}( success, changes_cnt );
+
+return success;
+}
+
+
+{% endif %}
+{% endfor %}
+{% endfor %}
+{% endfor %}
+{% for pooled in pooled_variants %}
+{% macro pooled_accessor(function_name, role, description, query_params, params) %}
+/**************************************************
+*
+*    {{function_name | accessor_function_name(pooled)}}{% if description %} - {{description}}{% endif %}
+
+*
+{% if role == 'reader' %}
+*    Calls {{function_name | accessor_function_name(True)}}
+*    with a reader acquired from the pool.
+{% else %}
+*    Calls {{function_name | accessor_function_name(True)}}
+*    with the pool's writer.
+{% endif %}
+*
+**************************************************/
+int {{function_name | accessor_function_name(pooled)}}
+    (
+    {{dataset | accessor_db_param_declaration(pooled)}}{% if query_params or params %},{% endif %}
+
+    {% for query_param in query_params %}
+    {{query_param.get_c_type()}} {{query_param.name}}{% if params or not loop.last %},{% endif %}
+
+    {% endfor %}
+    {% for param in params %}
+    {{param[0]}} {{param[1]}}{% if not loop.last %},{% endif %}
+
+    {% endfor %}
+    )
+{
+{{dataset | stmt_cache_pointer_type}} {{role}};
+int success;
+
+{{role}} = {{dataset | pool_function_name(role + '_acquire')}}( pool );
+success = {{function_name | accessor_function_name(True)}}( {{role}}{% for query_param in query_params %}, {{query_param.name}}{% endfor %}{% for param in params %}, {{param[1]}}{% endfor %} );
+{% if role == 'reader' %}
+{{dataset | pool_function_name('reader_release')}}( pool, reader );
+{% else %}
+{{dataset | pool_function_name('writer_release')}}( pool );
+{% endif %}
+
+return success;
+}
+
+{% endmacro %}
+{% for model in source_models %}
+{{pooled_accessor(model | model_delete_by_id_function_name, 'writer', 'Delete ' + model.name + ' by id', [],
+                  [('sqlite3_int64', 'id')])}}
+{{pooled_accessor(model | model_find_by_id_function_name, 'reader', 'Find ' + model.name + ' by id', [],
+                  [('sqlite3_int64', 'id'), ('int *', 'found_out'), (model.get_pointer_type(), 'model_out')])}}
+{{pooled_accessor(model | model_find_many_by_id_function_name, 'reader', 'Find many ' + model.name + ' by id', [],
+                  [('sqlite3_int64 const *', 'ids'), ('int', 'id_cnt'), (model.get_list_pointer_type(), 'models_out'),
+                   ('unsigned char *', 'missing_out')])}}
+{{pooled_accessor(model | model_insert_new_function_name, 'writer', 'Insert new ' + model.name, [],
+                  [(model.get_pointer_type(), 'model')])}}
+{{pooled_accessor(model | model_save_existing_function_name, 'writer', 'Save existing ' + model.name, [],
+                  [(model.get_constant_pointer_type(), 'model')])}}
+{{pooled_accessor(model | models_count_all_function_name, 'reader', 'Get number of ' + model.name + ' models', [],
+                  [('int *', 'count_out')])}}
+{{pooled_accessor(model | models_delete_all_function_name, 'writer', 'Delete all ' + model.name + ' models', [], [])}}
+{% for counted in select_variants %}
+{{pooled_accessor(model | models_get_all_function_name | select_function_name(dataset, counted), 'reader',
+                  'Get all ' + model.name + ' models', [], [(model.get_list_pointer_type(), 'models_out')])}}
+{% endfor %}
+{% if model.columnar %}
+{{pooled_accessor(model | models_get_all_function_name | columnar_function_name, 'reader',
+                  'Get all ' + model.name + ' models into columns', [],
+                  [(model.get_columns_pointer_type(), 'columns_out')])}}
+{% endif %}
+{{pooled_accessor(model | models_get_all_function_name | for_each_function_name, 'reader', 'Visit each result', [],
+                  [(model.get_visit_func_c_type(), 'visit'), ('void *', 'ctx'), ('int *', 'visit_rcode_out')])}}
+{{pooled_accessor(model | models_insert_all_new_function_name, 'writer', 'Insert all ' + model.name + ' as new models',
+                  [], [(model.get_list_pointer_type(), 'models')])}}
+{{pooled_accessor(model | models_save_all_existing_function_name, 'writer',
+                  'Save all ' + model.name + ' as existing models', [],
+                  [(model.get_list_constant_pointer_type(), 'models')])}}
+{{pooled_accessor(model | models_insert_all_new_batched_function_name, 'writer',
+                  'Insert all ' + model.name + ' as new models in batches', [],
+                  [(model.get_list_pointer_type(), 'models'), ('int', 'batch_size'), ('int *', 'failed_idx_out')])}}
+{{pooled_accessor(model | models_save_all_existing_batched_function_name, 'writer',
+                  'Save all ' + model.name + ' as existing models in batches', [],
+                  [(model.get_list_constant_pointer_type(), 'models'), ('int', 'batch_size'),
+                   ('int *', 'failed_idx_out')])}}
+{{pooled_accessor(model | models_insert_all_new_bulk_function_name, 'writer',
+                  'Insert all ' + model.name + ' as new models in bulk', [],
+                  [(model.get_list_pointer_type(), 'models')])}}
+{% if model | model_has_field_mask %}
+{{pooled_accessor(model | models_update_all_fields_function_name, 'writer',
+                  'Update fields of all ' + model.name + ' models', [],
+                  [(model.get_list_constant_pointer_type(), 'models'), ('sqlite3_uint64', 'field_mask')])}}
+{{pooled_accessor(model | models_upsert_all_function_name, 'writer', 'Upsert all ' + model.name + ' models', [],
+                  [(model.get_list_constant_pointer_type(), 'models'), ('sqlite3_uint64', 'field_mask')])}}
+{% endif %}
+{% for query in model.get_count_queries() %}
+{{pooled_accessor(query.name, 'reader', none, query.params, [('int *', 'count_out')])}}
+{% endfor %}
+{% for query in model.get_delete_queries() %}
+{{pooled_accessor(query.name, 'writer', none, query.params, [])}}
+{% if query.params %}
+{{pooled_accessor(query.name | batch_function_name, 'writer', none, [],
+                  [(query.get_params_constant_pointer_type(), 'params'), ('int', 'params_cnt'),
+                   ('int *', 'changes_out')])}}
+{% endif %}
+{% endfor %}
+{% for query in model.get_find_queries() %}
+{{pooled_accessor(query.name, 'reader', none, query.params,
+                  [('int *', 'found_out'), (query.get_result_model(model).get_pointer_type(), 'model_out')])}}
+{% endfor %}
+{% for query in model.get_select_queries() %}
+{% set result_model = query.get_result_model(model) %}
+{% for counted in select_variants %}
+{{pooled_accessor(query.name | select_function_name(dataset, counted), 'reader', none, query.params,
+                  [(result_model.get_list_pointer_type(), 'models_out')])}}
+{% endfor %}
+{% if model.columnar and not query.result_model %}
+{{pooled_accessor(query.name | columnar_function_name, 'reader', none, query.params,
+                  [(model.get_columns_pointer_type(), 'columns_out')])}}
+{% endif %}
+{{pooled_accessor(query.name | for_each_function_name, 'reader', 'Visit each result', query.params,
+                  [(result_model.get_visit_func_c_type(), 'visit'), ('void *', 'ctx'), ('int *', 'visit_rcode_out')])}}
+{% endfor %}
+{% for query in model.get_page_queries() %}
+{{pooled_accessor(query.name, 'reader', none, query.params,
+                  [(query.get_key_constant_pointer_type(), 'last_key'), ('int', 'limit'),
+                   (model.get_list_pointer_type(), 'models_out'), (query.get_key_pointer_type(), 'next_key_out')])}}
+{% endfor %}
+{% for query in model.get_update_queries() %}
+{{pooled_accessor(query.name, 'writer', none, query.params, [])}}
+{% if query.params %}
+{{pooled_accessor(query.name | batch_function_name, 'writer', none, [],
+                  [(query.get_params_constant_pointer_type(), 'params'), ('int', 'params_cnt'),
+                   ('int *', 'changes_out')])}}
+{% endif %}
+{% endfor %}
+{% endfor %}
+{% endfor %}
+
+{% for model in source_models + source_projection_models %}
+/**************************************************
+*
+*    {{model | model_cursor_close_function_name}} - Close {{model.name}} cursor
+*
+*    Closes the provided cursor. Any model filled by
+*    {{model | model_cursor_next_function_name}} remains owned by the caller,
+*    who must call {{model.get_free_function_name()}} on it.
+*
+**************************************************/
+void {{model | model_cursor_close_function_name}}
+    (
+    {{model.get_cursor_pointer_type()}} cursor
+    )
+{
+{{dataset | profile_macro('ENTER')}}( "{{model | model_cursor_close_function_name}}" );
+
+{% if dataset.options.statement_cache %}
+if( NULL != cursor->cache )
+    {
+    {{dataset | profile_macro('FINALIZE')}}( {{dataset | stmt_cache_release_function_name}}( cursor->cache, cursor->stmt_id, cursor->query ) );
+    }
+else
+    {
+    {{'cursor->query' | stmt_release_call(dataset, none, False)}};
+    }
+{% else %}
+{{'cursor->query' | stmt_release_call(dataset, none, False)}};
+{% endif %}
+
+memset( cursor, 0, sizeof( *cursor ) );
+
+{{dataset | profile_macro('EXIT')}}( 1, 0 );
+}
+
+
+/**************************************************
+*
+*    {{model | model_cursor_next_function_name}} - Read next {{model.name}}
+*
+*    Reads the next result of the provided cursor
+*    into model_out. If a result was read, found_out
+*    will be set to 1. Otherwise, the cursor is
+*    exhausted and found_out will be set to 0.
+*    model_out must be initialized with
+*    {{model.get_init_function_name()}} before the first call, and the same
+*    model must be passed to every call on the cursor
+*    so that its buffers can be reused between rows.
+*    The caller must call {{model.get_free_function_name()}} on model_out.
+*
+**************************************************/
+int {{model | model_cursor_next_function_name}}
+    (
+    {{model.get_cursor_pointer_type()}} cursor,
+    int * found_out,
+    {{model.get_pointer_type()}} model_out
+    )
+{
+int success;
+int rcode;
+{{dataset | profile_macro('ENTER')}}( "{{model | model_cursor_next_function_name}}" );
+
+*found_out = 0;
+
+rcode = {{dataset | profile_macro('STEP')}}( sqlite3_step( cursor->query ) );
+success = ( ( SQLITE_ROW == rcode ) || ( SQLITE_DONE == rcode ) );
+
+if( SQLITE_ROW == rcode )
+    {
+    *found_out = 1;
+
+    {% for field in model.fields if field.field_type.is_primitive_type() %}
+    {{field | field_cursor_read_call(model, dataset, 'cursor', 'model_out', 'success')}}
+    {% endfor %}
+
+    {% for field in model.fields if not field.field_type.is_primitive_type() %}
+    {{field | field_cursor_read_call(model, dataset, 'cursor', 'model_out', 'success')}}
+    {% if dataset.has_length_member(field) %}
+    model_out->{{field.get_length_name()}} = (size_t)sqlite3_column_bytes( cursor->query, {{field | field_column_enum(model)}} );
+    {% endif %}
+    {{dataset | profile_macro('BYTES')}}( sqlite3_column_bytes( cursor->query, {{field | field_column_enum(model)}} ) );
+    {% endfor %}
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, *found_out );
+
+return success;
+}
+
+
+{% if dataset.options.zero_copy %}
+/**************************************************
+*
+*    {{model | model_cursor_next_view_function_name}} - Borrow next {{model.name}}
+*
+*    Reads the next result of the provided cursor
+*    into view_out without copying it. Text and blob
+*    members point into SQLite's buffer for the
+*    current row and are only valid until the next
+*    call on the cursor or until it is closed. If a
+*    result was read, found_out will be set to 1.
+*    Otherwise, the cursor is exhausted and found_out
+*    will be set to 0.
+*
+**************************************************/
+int {{model | model_cursor_next_view_function_name}}
+    (
+    {{model.get_cursor_pointer_type()}} cursor,
+    int * found_out,
+    {{model.get_view_pointer_type()}} view_out
+    )
+{
+int success;
+int rcode;
+{{dataset | profile_macro('ENTER')}}( "{{model | model_cursor_next_view_function_name}}" );
+
+*found_out = 0;
+memset( view_out, 0, sizeof( *view_out ) );
+
+rcode = {{dataset | profile_macro('STEP')}}( sqlite3_step( cursor->query ) );
+success = ( ( SQLITE_ROW == rcode ) || ( SQLITE_DONE == rcode ) );
+
+if( SQLITE_ROW == rcode )
+    {
+    *found_out = 1;
+
+    {% for field in model.fields %}
+    {% if field.field_type.is_primitive_type() %}
+    {{field | field_read_result_function_call(model, 'cursor->query', 'view_out', 'success')}}
+    {% else %}
+    view_out->{{field.name}} = (char const *){{field | field_column_value_function_name}}( cursor->query, {{field | field_column_enum(model)}} );
+    view_out->{{field | field_view_length_member}} = (size_t)sqlite3_column_bytes( cursor->query, {{field | field_column_enum(model)}} );
+    {% endif %}
+    {% endfor %}
+    }
+
+{{dataset | profile_macro('EXIT')}}( success, *found_out );
+
+return success;
+}
+
+
+{% endif %}
+{% endfor %}
+{% for model in source_models + source_projection_models %}
+{% if not dataset.options.arena_lists and model in source_select_models %}
+/**************************************************
+*
+*    {{model | model_add_to_result_list_function_name}} - Add to result list
+*
+*    A cqlite_model_add_to_list_func_t function to
+*    read the provided query row result as a {{model.name}}
+*    model into the provided list at the specified index.
+*
+**************************************************/
+static int {{model | model_add_to_result_list_function_name}}
+    (
+    sqlite3_stmt * query,
+    void * model_list,
+    int next_model_list_idx
+    )
+{
+{{model.get_pointer_type()}} models;
+
+models = ({{model.get_pointer_type()}})model_list;
+
+return {{model | model_from_row_result_function_name}}( query, &models[next_model_list_idx] );
+}
+
+
+{% endif %}
+{% if model in source_find_models or not (dataset.options.arena_lists and model.has_dynamic_fields()) %}
+/**************************************************
+*
+*    {{model | model_from_row_result_function_name}} - Model from row result
+*
+*    A cqlite_model_from_row_result_func_t function
+*    that reads the provided query row result as a
+*    {{model.name}} model.
+*
+**************************************************/
+static int {{model | model_from_row_result_function_name}}
+    (
+    sqlite3_stmt * query,
+    void * model_out
+    )
+{
+int success;
+{{model.get_pointer_type()}} model;
+
+success = 1;
+model = ({{model.get_pointer_type()}})model_out;
+
+{% for field in model.fields if field.field_type.is_primitive_type() %}
+{{field | field_read_result_function_call(model, 'query', 'model', 'success')}}
+{% endfor %}
+
+{% for field in model.fields if not field.field_type.is_primitive_type() %}
+{{field | field_read_result_function_call(model, 'query', 'model', 'success')}}
+{% if dataset.has_length_member(field) %}
+model->{{field.get_length_name()}} = (size_t)sqlite3_column_bytes( query, {{field | field_column_enum(model)}} );
+{% endif %}
+{{dataset | profile_macro('BYTES')}}( sqlite3_column_bytes( query, {{field | field_column_enum(model)}} ) );
+{% endfor %}
+
+return success;
+}
+
+{% endif %}
+{% if dataset.options.arena_lists and model.has_dynamic_fields() and model in source_select_models %}
+
+/**************************************************
+*
+*    {{model | model_from_row_result_arena_function_name}} - Model from row result into arena
+*
+*    Reads the provided query row result as a
+*    {{model.name}} model. Text and blob values are
+*    copied into the provided list arena rather than
+*    allocated individually.
+*
+**************************************************/
+static int {{model | model_from_row_result_arena_function_name}}
+    (
+    sqlite3_stmt * query,
+    {{dataset.get_arena_pointer_type()}} * arena,
+    {{model.get_pointer_type()}} model_out
+    )
+{
+int success;
+
+success = 1;
+
+{% for field in model.fields if field.field_type.is_primitive_type() %}
+{{field | field_arena_read_call(model, dataset, 'query', 'arena', 'model_out', 'success')}}
+{% endfor %}
+
+{% for field in model.fields if not field.field_type.is_primitive_type() %}
+{{field | field_arena_read_call(model, dataset, 'query', 'arena', 'model_out', 'success')}}
+{% if dataset.has_length_member(field) %}
+model_out->{{field.get_length_name()}} = (size_t)sqlite3_column_bytes( query, {{field | field_column_enum(model)}} );
+{% endif %}
+{{dataset | profile_macro('BYTES')}}( sqlite3_column_bytes( query, {{field | field_column_enum(model)}} ) );
+{% endfor %}
+
+return success;
+}
+{% endif %}
+{% if model in source_select_models and (dataset.options.has_single_pass_select() or (model.get_page_queries() | list)) %}
+
+/**************************************************
+*
+*    {{model | model_select_growable_function_name}} - Select into growable list
+*
+*    Steps the provided select query to completion,
+*    reading each row into models_out. The list starts
+*    with room for capacity_hint models and doubles its
+*    capacity whenever it fills up. On failure, all
+*    models read so far are freed.
+{% if dataset.options.arena_lists and model.has_dynamic_fields() %}
+*    Text and blob values are read into the list's
+*    arena.
+{% endif %}
+*
+**************************************************/
+static int {{model | model_select_growable_function_name}}
+    (
+    sqlite3_stmt * select_query,
+    int capacity_hint,
+    {{model.get_list_pointer_type()}} models_out
+    )
+{
+int success;
+int rcode;
+int capacity;
+{{model.get_pointer_type()}} list;
+
+success = 1;
+rcode = SQLITE_DONE;
+capacity = 0;
+
+while( ( success ) && ( SQLITE_ROW == ( rcode = sqlite3_step( select_query ) ) ) )
+    {
+    if( models_out->cnt == capacity )
+        {
+        capacity = ( 0 == capacity ) ? capacity_hint : ( 2 * capacity );
+        if( capacity <= models_out->cnt )
+            {
+            capacity = models_out->cnt + 1;
+            }
+        list = realloc( models_out->list, capacity * sizeof( *list ) );
+        success = ( NULL != list );
+        if( success )
+            {
+            models_out->list = list;
+            }
+        }
+
+    if( success )
+        {
+        {{model.get_init_function_name()}}( &models_out->list[models_out->cnt] );
+        {% if dataset.options.arena_lists and model.has_dynamic_fields() %}
+        success = {{model | model_from_row_result_arena_function_name}}( select_query, &models_out->arena, &models_out->list[models_out->cnt] );
+        {% else %}
+        success = {{model | model_from_row_result_function_name}}( select_query, &models_out->list[models_out->cnt] );
+        {% endif %}
+        models_out->cnt++;
+        }
+    }
+
+success = ( success ) && ( SQLITE_DONE == rcode );
+
+if( !success )
+    {
+    {{model.get_list_free_function_name()}}( models_out );
+    }
+
+return success;
+}
+{% endif %}
+{% if model.columnar %}
+
+/**************************************************
+*
+*    {{model | model_select_columnar_function_name}} - Select into columns
+*
+*    Steps the provided select query to completion,
+*    reading each row into the next index of the arrays
+*    of columns_out. The arrays start with room for
+*    capacity_hint models and double their capacity
+*    whenever they fill up. On failure, all arrays are
+*    freed.
+*
+**************************************************/
+static int {{model | model_select_columnar_function_name}}
+    (
+    sqlite3_stmt * select_query,
+    int capacity_hint,
+    {{model.get_columns_pointer_type()}} columns_out
+    )
+{
+int success;
+int rcode;
+int capacity;
+void * array;
+
+success = 1;
+rcode = SQLITE_DONE;
+
+while( ( success ) && ( SQLITE_ROW == ( rcode = sqlite3_step( select_query ) ) ) )
+    {
+    if( columns_out->cnt == columns_out->capacity )
+        {
+        capacity = ( 0 == columns_out->capacity ) ? capacity_hint : ( 2 * columns_out->capacity );
+        {% for field in model.fields %}
+        {% if field.field_type.is_primitive_type() %}
+
+        array = realloc( columns_out->{{field.name}}, capacity * sizeof( *columns_out->{{field.name}} ) );
+        if( NULL != array )
+            {
+            columns_out->{{field.name}} = array;
+            }
+        success &= ( NULL != array );
+        {% else %}
+
+        array = realloc( columns_out->{{field.get_columns_offsets_name()}}, ( capacity + 1 ) * sizeof( *columns_out->{{field.get_columns_offsets_name()}} ) );
+        if( NULL != array )
+            {
+            columns_out->{{field.get_columns_offsets_name()}} = array;
+            columns_out->{{field.get_columns_offsets_name()}}[0] = 0;
+            }
+        success &= ( NULL != array );
+        {% endif %}
+        {% endfor %}
+
+        if( success )
+            {
+            columns_out->capacity = capacity;
+            }
+        }
+
+    if( success )
+        {
+        {% for field in model.fields if field.field_type.is_primitive_type() %}
+        {{field | field_columns_read_call(model, dataset, 'select_query', 'columns_out', 'success')}}
+        {% endfor %}
+        {% for field in model.fields if not field.field_type.is_primitive_type() %}
+        {{field | field_columns_read_call(model, dataset, 'select_query', 'columns_out', 'success')}}
+        {{dataset | profile_macro('BYTES')}}( sqlite3_column_bytes( select_query, {{field | field_column_enum(model)}} ) );
+        {% endfor %}
+        columns_out->cnt++;
+        }
+    }
+
+success = ( success ) && ( SQLITE_DONE == rcode );
+
+if( !success )
+    {
+    {{model.get_columns_free_function_name()}}( columns_out );
+    }
+
+return success;
+}
+{% endif %}
+
+{% endfor %}
+
+
+{% if shared_source %}
+{% if dataset.options.statement_cache %}
+/**************************************************
+*
+*    {{dataset | stmt_cache_get_function_name}} - Get cached statement
+*
+*    Gets the statement with the specified id from
+*    the statement cache, preparing it from the
+*    provided query string if it has not been used
+*    yet. The statement is checked out until it is
+*    released. If it is already checked out, such as
+*    by an open cursor, a separate statement is
+*    prepared instead and finalized on release.
+*
+**************************************************/
+{{private_static}}int {{dataset | stmt_cache_get_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache,
+    int stmt_id,
+    char const * query_string,
+    sqlite3_stmt ** stmt_out
+    )
+{
+int rcode;
+
+rcode = SQLITE_OK;
+
+if( cache->stmt_is_checked_out[stmt_id] )
+    {
+    rcode = sqlite3_prepare_v2( cache->db, query_string, -1, stmt_out, NULL );
+    }
+else
+    {
+    if( NULL == cache->stmts[stmt_id] )
+        {
+        rcode = sqlite3_prepare_v3( cache->db, query_string, -1, SQLITE_PREPARE_PERSISTENT, &cache->stmts[stmt_id], NULL );
+        }
+
+    cache->stmt_is_checked_out[stmt_id] = ( NULL != cache->stmts[stmt_id] );
+    *stmt_out = cache->stmts[stmt_id];
+    }
+
+return rcode;
+}
+
+
+/**************************************************
+*
+*    {{dataset | stmt_cache_release_function_name}} - Release cached statement
+*
+*    Resets the provided cached statement and clears
+*    its bindings so it is ready for its next use,
+*    and checks it back in. A separate statement
+*    prepared because the cached one was checked out
+*    is finalized instead.
+*
+**************************************************/
+{{private_static}}void {{dataset | stmt_cache_release_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache,
+    int stmt_id,
+    sqlite3_stmt * stmt
+    )
+{
+if( ( NULL != stmt ) && ( stmt == cache->stmts[stmt_id] ) )
+    {
+    sqlite3_reset( stmt );
+    sqlite3_clear_bindings( stmt );
+    cache->stmt_is_checked_out[stmt_id] = 0;
+    }
+else
+    {
+    sqlite3_finalize( stmt );
+    }
+}
+
+{% endif %}
+{% if dataset.get_row_cache_models() %}
+/**************************************************
+*
+*    {{dataset | row_cache_name('evict')}} - Evict row cache entry
+*
+*    Unlinks the provided entry from its hash bucket
+*    and from the least recently used list of the
+*    table, then frees it. The caller must hold the
+*    row cache's lock.
+*
+**************************************************/
+{{private_static}}void {{dataset | row_cache_name('evict')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    {{dataset | row_cache_name('entry_t')}} * entry
+    )
+{
+{{dataset | row_cache_name('entry_t')}} ** link;
+
+link = &table->buckets[ (sqlite3_uint64)entry->id & table->bucket_mask ];
+while( *link != entry )
+    {
+    link = &( *link )->bucket_next;
+    }
+*link = entry->bucket_next;
+
+if( NULL == entry->newer )
+    {
+    table->newest = entry->older;
+    }
+else
+    {
+    entry->newer->older = entry->older;
+    }
+
+if( NULL == entry->older )
+    {
+    table->oldest = entry->newer;
+    }
+else
+    {
+    entry->older->newer = entry->newer;
+    }
+
+table->stats.entry_cnt--;
+table->stats.byte_cnt -= entry->size;
+
+table->entry_free( entry );
+free( entry );
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('find')}} - Find row cache entry
+*
+*    Returns the entry of the table with the
+*    specified id, after marking it as the most
+*    recently used, or NULL if there is none. The
+*    caller must hold the row cache's lock.
+*
+**************************************************/
+{{private_static}}{{dataset | row_cache_name('entry_t')}} * {{dataset | row_cache_name('find')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    sqlite3_int64 id
+    )
+{
+{{dataset | row_cache_name('entry_t')}} * entry;
+
+entry = table->buckets[ (sqlite3_uint64)id & table->bucket_mask ];
+while( ( NULL != entry ) && ( entry->id != id ) )
+    {
+    entry = entry->bucket_next;
+    }
+
+if( ( NULL != entry ) && ( NULL != entry->newer ) )
+    {
+    entry->newer->older = entry->older;
+    if( NULL == entry->older )
+        {
+        table->oldest = entry->newer;
+        }
+    else
+        {
+        entry->older->newer = entry->newer;
+        }
+
+    entry->newer = NULL;
+    entry->older = table->newest;
+    table->newest->newer = entry;
+    table->newest = entry;
+    }
+
+return entry;
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('flush')}} - Flush row cache table
+*
+*    Removes every entry of the provided table, for
+*    writes that may change any of its records.
+*
+**************************************************/
+{{private_static}}void {{dataset | row_cache_name('flush')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    struct {{dataset | row_cache_name('table_s')}} * table
+    )
+{
+{% if dataset.options.connection_pool %}
+pthread_mutex_lock( &rows->lock );
+
+{% else %}
+(void)rows;
+
+{% endif %}
+// Records read before this write must not be added once it is done
+table->generation++;
+
+while( NULL != table->newest )
+    {
+    table->stats.invalidations++;
+    {{dataset | row_cache_name('evict')}}( table, table->newest );
+    }
+{% if dataset.options.connection_pool %}
+
+pthread_mutex_unlock( &rows->lock );
+{% endif %}
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('insert')}} - Insert row cache entry
+*
+*    Adds the provided entry to the table as its most
+*    recently used entry, replacing any entry with
+*    the same id, then evicts the least recently used
+*    entries until the table is within its bounds.
+*    The caller must hold the row cache's lock.
+*
+**************************************************/
+{{private_static}}void {{dataset | row_cache_name('insert')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    {{dataset | row_cache_name('entry_t')}} * entry
+    )
+{
+{{dataset | row_cache_name('entry_t')}} * existing;
+{{dataset | row_cache_name('entry_t')}} ** bucket;
+
+existing = {{dataset | row_cache_name('find')}}( table, entry->id );
+if( NULL != existing )
+    {
+    {{dataset | row_cache_name('evict')}}( table, existing );
+    }
+
+bucket = &table->buckets[ (sqlite3_uint64)entry->id & table->bucket_mask ];
+entry->bucket_next = *bucket;
+*bucket = entry;
+
+entry->newer = NULL;
+entry->older = table->newest;
+if( NULL == table->newest )
+    {
+    table->oldest = entry;
+    }
+else
+    {
+    table->newest->newer = entry;
+    }
+table->newest = entry;
+
+table->stats.entry_cnt++;
+table->stats.byte_cnt += entry->size;
+
+while( ( ( 0 < table->max_entries ) && ( table->stats.entry_cnt > table->max_entries ) )
+    || ( ( 0 < table->max_bytes ) && ( table->stats.byte_cnt > table->max_bytes ) ) )
+    {
+    table->stats.evictions++;
+    {{dataset | row_cache_name('evict')}}( table, table->oldest );
+    }
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('remove')}} - Remove row cache entry
+*
+*    Removes the entry with the specified id from the
+*    provided table, for writes that may change the
+*    record with that id.
+*
+**************************************************/
+{{private_static}}void {{dataset | row_cache_name('remove')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    struct {{dataset | row_cache_name('table_s')}} * table,
+    sqlite3_int64 id
+    )
+{
+{{dataset | row_cache_name('entry_t')}} * entry;
+
+{% if dataset.options.connection_pool %}
+pthread_mutex_lock( &rows->lock );
+
+{% else %}
+(void)rows;
+
+{% endif %}
+// Records read before this write must not be added once it is done
+table->generation++;
+
+entry = {{dataset | row_cache_name('find')}}( table, id );
+if( NULL != entry )
+    {
+    table->stats.invalidations++;
+    {{dataset | row_cache_name('evict')}}( table, entry );
+    }
+{% if dataset.options.connection_pool %}
+
+pthread_mutex_unlock( &rows->lock );
+{% endif %}
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('table_close')}} - Close row cache table
+*
+*    Frees the provided table along with all of its
+*    entries. Does nothing if table is NULL.
+*
+**************************************************/
+{{private_static}}void {{dataset | row_cache_name('table_close')}}
+    (
+    struct {{dataset | row_cache_name('table_s')}} * table
+    )
+{
+if( NULL != table )
+    {
+    while( NULL != table->newest )
+        {
+        {{dataset | row_cache_name('evict')}}( table, table->newest );
+        }
+
+    free( table->buckets );
+    free( table );
+    }
+}
+
+
+/**************************************************
+*
+*    {{dataset | row_cache_name('table_open')}} - Open row cache table
+*
+*    Creates an empty table of bucket_cnt hash
+*    buckets, a power of two, holding at most
+*    max_entries entries and max_bytes bytes. A bound
+*    of 0 is not enforced. Returns NULL if memory
+*    could not be allocated.
+*
+**************************************************/
+{{private_static}}struct {{dataset | row_cache_name('table_s')}} * {{dataset | row_cache_name('table_open')}}
+    (
+    sqlite3_uint64 max_entries,
+    sqlite3_uint64 max_bytes,
+    sqlite3_uint64 bucket_cnt,
+    void (*entry_free)( {{dataset | row_cache_name('entry_t')}} * entry )
+    )
+{
+struct {{dataset | row_cache_name('table_s')}} * table;
+
+table = calloc( 1, sizeof( *table ) );
+if( NULL != table )
+    {
+    table->buckets = calloc( (size_t)bucket_cnt, sizeof( *table->buckets ) );
+    if( NULL == table->buckets )
+        {
+        free( table );
+        table = NULL;
+        }
+    }
+
+if( NULL != table )
+    {
+    table->bucket_mask = bucket_cnt - 1;
+    table->max_entries = max_entries;
+    table->max_bytes = max_bytes;
+    table->entry_free = entry_free;
+    }
+
+return table;
+}
+
+
+{% endif %}
+{% endif %}
+{% for model in source_models if model.row_cache %}
+/**************************************************
+*
+*    {{model | model_row_cache_function_name('copy')}} - Copy {{model.name}}
+*
+*    Copies the provided {{model.name}} into model_out,
+*    which then owns copies of all of its text fields.
+*    model_out is left initialized on failure.
+*
+**************************************************/
+{{private_static}}int {{model | model_row_cache_function_name('copy')}}
+    (
+    {{model.get_pointer_type()}} model_out,
+    {{model.get_constant_pointer_type()}} model
+    )
+{
+int success;
+{% if model.has_dynamic_fields() %}
+size_t length;
+{% endif %}
+
+success = 1;
+
+*model_out = *model;
+{% for field in model.fields if field.is_dynamically_allocated() %}
+model_out->{{field.name}} = NULL;
+{% endfor %}
+{% for field in model.fields if field.is_dynamically_allocated() %}
+
+if( success && ( NULL != model->{{field.name}} ) )
+    {
+    length = strlen( model->{{field.name}} ) + 1;
+    model_out->{{field.name}} = malloc( length );
+    success = ( NULL != model_out->{{field.name}} );
+    if( success )
+        {
+        memcpy( model_out->{{field.name}}, model->{{field.name}}, length );
+        }
+    }
+{% endfor %}
+
+if( !success )
+    {
+    {{model.get_free_function_name()}}( model_out );
+    }
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{model | model_row_cache_function_name('entry_free')}} - Free {{model.name}} row cache entry
+*
+*    Frees the fields of the {{model.name}} held by the
+*    provided row cache entry.
+*
+**************************************************/
+{{private_static}}void {{model | model_row_cache_function_name('entry_free')}}
+    (
+    {{dataset | row_cache_name('entry_t')}} * entry
+    )
+{
+{{model.get_free_function_name()}}( &( ( {{model | model_row_cache_entry_c_type}} * )entry )->model );
+}
+
+
+/**************************************************
+*
+*    {{model | model_row_cache_function_name('get')}} - Get cached {{model.name}}
+*
+*    Copies the {{model.name}} with the specified id from
+*    the row cache into model_out and sets found_out
+*    to 1 if it is cached. Otherwise, found_out is set
+*    to 0 and generation_out to the generation that
+*    must be passed to {{model | model_row_cache_function_name('put')}} when the
+*    {{model.name}} is read from the database.
+*
+**************************************************/
+{{private_static}}int {{model | model_row_cache_function_name('get')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    sqlite3_int64 id,
+    int * found_out,
+    {{model.get_pointer_type()}} model_out,
+    sqlite3_uint64 * generation_out
+    )
+{
+struct {{dataset | row_cache_name('table_s')}} * table;
+{{dataset | row_cache_name('entry_t')}} * entry;
+int success;
+
+table = rows->{{model | model_row_cache_member}};
+success = 1;
+*found_out = 0;
+
+{% if dataset.options.connection_pool %}
+pthread_mutex_lock( &rows->lock );
+
+{% endif %}
+*generation_out = table->generation;
+
+entry = {{dataset | row_cache_name('find')}}( table, id );
+if( NULL == entry )
+    {
+    table->stats.misses++;
+    }
+else
+    {
+    table->stats.hits++;
+    success = {{model | model_row_cache_function_name('copy')}}( model_out, &( ( {{model | model_row_cache_entry_c_type}} * )entry )->model );
+    *found_out = success;
+    }
+{% if dataset.options.connection_pool %}
+
+pthread_mutex_unlock( &rows->lock );
+{% endif %}
+
+return success;
+}
+
+
+/**************************************************
+*
+*    {{model | model_row_cache_function_name('put')}} - Cache {{model.name}}
+*
+*    Adds a copy of the provided {{model.name}} to the row
+*    cache, unless a write has removed {{model.get_table_name()}}
+*    records since generation was read by
+*    {{model | model_row_cache_function_name('get')}}, in which case the {{model.name}}
+*    may be stale. Failing to cache is not an error.
+*
+**************************************************/
+{{private_static}}void {{model | model_row_cache_function_name('put')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    {{model.get_constant_pointer_type()}} model,
+    sqlite3_uint64 generation
+    )
+{
+{{model | model_row_cache_entry_c_type}} * entry;
+
+entry = malloc( sizeof( *entry ) );
+if( ( NULL != entry ) && !{{model | model_row_cache_function_name('copy')}}( &entry->model, model ) )
+    {
+    free( entry );
+    entry = NULL;
+    }
+
+if( NULL != entry )
+    {
+    entry->entry.id = model->{{model.get_primary_key_field().name}};
+    entry->entry.size = sizeof( *entry );
+    {% for field in model.fields if field.is_dynamically_allocated() %}
+    if( NULL != model->{{field.name}} )
+        {
+        entry->entry.size += strlen( model->{{field.name}} ) + 1;
+        }
+    {% endfor %}
+
+    {% if dataset.options.connection_pool %}
+    pthread_mutex_lock( &rows->lock );
+    {% endif %}
+    if( generation == rows->{{model | model_row_cache_member}}->generation )
+        {
+        {{dataset | row_cache_name('insert')}}( rows->{{model | model_row_cache_member}}, &entry->entry );
+        entry = NULL;
+        }
+    {% if dataset.options.connection_pool %}
+    pthread_mutex_unlock( &rows->lock );
+    {% endif %}
+    }
+
+if( NULL != entry )
+    {
+    {{model | model_row_cache_function_name('entry_free')}}( &entry->entry );
+    free( entry );
+    }
+}
+
+
+/**************************************************
+*
+*    {{model | model_row_cache_function_name('remove_list')}} - Remove cached {{model.name}} list
+*
+*    Removes the {{model.name}} with the id of each model
+*    in the provided list from the row cache.
+*
+**************************************************/
+{{private_static}}void {{model | model_row_cache_function_name('remove_list')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    {{model.get_list_constant_pointer_type()}} models
+    )
+{
+int i;
+
+for( i = 0; i < models->cnt; i++ )
+    {
+    {{dataset | row_cache_name('remove')}}( rows, rows->{{model | model_row_cache_member}}, models->list[i].{{model.get_primary_key_field().name}} );
+    }
+}
+
+
+{% endfor %}
+{% if shared_source %}
+
+
+/**************************************************
+*
+*    {{dataset | cursor_buffer_read_function_name}} - Read into cursor buffer
+*
+*    Reads the TEXT or BLOB value of the specified
+*    column into the provided buffer, growing the
+*    buffer only when its capacity is too small for
+*    the value. Text values are NUL-terminated. A NULL
+*    value frees the buffer and sets it to NULL.
+*
+**************************************************/
+{{private_static}}int {{dataset | cursor_buffer_read_function_name}}
+    (
+    sqlite3_stmt * query,
+    int column,
+    int is_text,
+    char ** buffer,
+    size_t * capacity
+    )
+{
+int success;
+void const * value;
+size_t size;
+char * new_buffer;
+
+success = 1;
+
+if( is_text )
+    {
+    value = sqlite3_column_text( query, column );
+    }
+else
+    {
+    value = sqlite3_column_blob( query, column );
+    }
+
+size = (size_t)sqlite3_column_bytes( query, column );
+
+if( NULL == value )
+    {
+    free( *buffer );
+    *buffer = NULL;
+    *capacity = 0;
+    }
+else
+    {
+    if( ( size + is_text ) > *capacity )
+        {
+        new_buffer = realloc( *buffer, size + is_text );
+        success = ( NULL != new_buffer );
+        if( success )
+            {
+            *buffer = new_buffer;
+            *capacity = size + is_text;
+            }
+        }
+
+    if( success )
+        {
+        memcpy( *buffer, value, size );
+        if( is_text )
+            {
+            (*buffer)[size] = '\0';
+            }
+        }
+    }
+
+return success;
+}
+
+
+{% if dataset.has_columnar_values() %}
+/**************************************************
+*
+*    {{dataset | columns_append_function_name}} - Append to columns
+*
+*    Appends the TEXT or BLOB value of the specified
+*    column to the values buffer of a columnar list as
+*    the value at index idx, growing the buffer by
+*    doubling its capacity when it is too small. Text
+*    values are not NUL-terminated, and a NULL value
+*    is appended as an empty value.
+*
+**************************************************/
+{{private_static}}int {{dataset | columns_append_function_name}}
+    (
+    sqlite3_stmt * query,
+    int column,
+    int is_text,
+    char ** values,
+    size_t * capacity,
+    size_t * offsets,
+    int idx
+    )
+{
+int success;
+void const * value;
+size_t size;
+size_t new_capacity;
+char * new_values;
+
+success = 1;
+
+if( is_text )
+    {
+    value = sqlite3_column_text( query, column );
+    }
+else
+    {
+    value = sqlite3_column_blob( query, column );
+    }
+
+size = (size_t)sqlite3_column_bytes( query, column );
+
+if( ( offsets[idx] + size ) > *capacity )
+    {
+    new_capacity = 2 * *capacity;
+    if( new_capacity < ( offsets[idx] + size ) )
+        {
+        new_capacity = offsets[idx] + size;
+        }
+    new_values = realloc( *values, new_capacity );
+    success = ( NULL != new_values );
+    if( success )
+        {
+        *values = new_values;
+        *capacity = new_capacity;
+        }
+    }
+
+if( success )
+    {
+    if( size > 0 )
+        {
+        memcpy( *values + offsets[idx], value, size );
+        }
+    offsets[idx + 1] = offsets[idx] + size;
+    }
+
+return success;
+}
+
+
+{% endif %}
+{% if dataset.options.arena_lists and dataset.has_dynamic_fields() %}
+/**************************************************
+*
+*    {{dataset | arena_read_function_name}} - Read into list arena
+*
+*    Reads the TEXT or BLOB value of the specified
+*    column into memory allocated from the provided
+*    list arena. Text values are NUL-terminated. A NULL
+*    value sets value_out to NULL.
+*
+**************************************************/
+{{private_static}}int {{dataset | arena_read_function_name}}
+    (
+    sqlite3_stmt * query,
+    int column,
+    int is_text,
+    {{dataset.get_arena_pointer_type()}} * arena,
+    char ** value_out
+    )
+{
+int success;
+void const * value;
+size_t size;
+
+success = 1;
+*value_out = NULL;
+
+if( is_text )
+    {
+    value = sqlite3_column_text( query, column );
+    }
+else
+    {
+    value = sqlite3_column_blob( query, column );
+    }
+
+size = (size_t)sqlite3_column_bytes( query, column );
+
+if( NULL != value )
+    {
+    *value_out = {{dataset.get_arena_alloc_function_name()}}( arena, size + is_text );
+    success = ( NULL != *value_out );
+    if( success )
+        {
+        memcpy( *value_out, value, size );
+        if( is_text )
+            {
+            (*value_out)[size] = '\0';
+            }
+        }
+    }
+
+return success;
+}
+{% endif %}
+{% if dataset.options.schema_migration %}
+
+
+/**************************************************
+*
+*    {{dataset | migrate_name('column_find')}} - Find column
+*
+*    Looks up the column with the specified name in
+*    the table with the specified name. found_out is
+*    set if the column exists, and matches_out is set
+*    if its type and primary key constraint also
+*    match the provided column.
+*
+**************************************************/
+static int {{dataset | migrate_name('column_find')}}
+    (
+    sqlite3 * db,
+    char const * table_name,
+    char const * column_name,
+    {{dataset | migrate_name('column_t')}} const * column,
+    int * found_out,
+    int * matches_out
+    )
+{
+int success;
+int rcode;
+char const * type;
+sqlite3_stmt * find_query;
+
+find_query = NULL;
+*found_out = 0;
+*matches_out = 0;
+
+success = ( SQLITE_OK == sqlite3_prepare_v2( db, "SELECT type, pk FROM pragma_table_info( ?1 ) WHERE name = ?2 COLLATE NOCASE;", -1, &find_query, NULL ) );
+success = success && ( SQLITE_OK == sqlite3_bind_text( find_query, 1, table_name, -1, SQLITE_STATIC ) );
+success = success && ( SQLITE_OK == sqlite3_bind_text( find_query, 2, column_name, -1, SQLITE_STATIC ) );
+
+if( success )
+    {
+    rcode = sqlite3_step( find_query );
+    success = ( ( SQLITE_ROW == rcode ) || ( SQLITE_DONE == rcode ) );
+    *found_out = ( SQLITE_ROW == rcode );
+    }
+
+if( ( success ) && ( *found_out ) )
+    {
+    type = (char const *)sqlite3_column_text( find_query, 0 );
+    *matches_out = ( NULL != type ) && ( 0 == sqlite3_stricmp( type, column->type ) )
+                && ( ( 0 != sqlite3_column_int( find_query, 1 ) ) == column->is_primary_key );
+    }
+
+sqlite3_finalize( find_query );
 
 return success;
 }
@@ -241,100 +4801,108 @@ return success;
 
 /**************************************************
 *
-*    {{model | models_count_all_function_name}} - Get number of {{model.name}} models
+*    {{dataset | migrate_name('exec')}} - Execute SQL
 *
-*    Gets the number of {{model.name}} models in
-*    the database.
+*    Executes and frees the provided SQL, which was
+*    allocated by sqlite3_mprintf and is NULL if the
+*    allocation failed.
 *
 **************************************************/
-int {{model | models_count_all_function_name}}
+static int {{dataset | migrate_name('exec')}}
     (
     sqlite3 * db,
-    int * count_out
+    char * sql
     )
 {
-cqlite_rcode_t rcode;
+int success;
 
-rcode = cqlite_count_query_execute( db, "SELECT COUNT(*) FROM {{model.get_table_name()}};", count_out );
+success = ( NULL != sql ) && ( SQLITE_OK == sqlite3_exec( db, sql, NULL, NULL, NULL ) );
+sqlite3_free( sql );
 
-return ( CQLITE_SUCCESS == rcode );
+return success;
 }
 
 
 /**************************************************
 *
-*    {{model | models_get_all_function_name}} - Get all {{model.name}} models
+*    {{dataset | migrate_name('extra_column_get')}} - Get extra column
 *
-*    Retrieves all {{model.name}} models from the
-*    provided database. The caller must call
-*    {{model.get_list_free_function_name()}} on models_out.
+*    Gets the name of a column of the table with the
+*    specified name that is not one of the provided
+*    columns. column_name_out is set to NULL if there
+*    is no such column, and otherwise must be freed
+*    with sqlite3_free.
 *
 **************************************************/
-int {{model | models_get_all_function_name}}
+static int {{dataset | migrate_name('extra_column_get')}}
     (
     sqlite3 * db,
-    {{model.get_list_pointer_type()}} models_out
+    char const * table_name,
+    {{dataset | migrate_name('column_t')}} const * columns,
+    int column_cnt,
+    char ** column_name_out
     )
 {
-cqlite_rcode_t rcode;
+int success;
+int rcode;
+int i;
+int is_current;
+char const * column_name;
+sqlite3_stmt * info_query;
 
-{{model.get_list_init_function_name()}}( models_out );
+info_query = NULL;
+rcode = SQLITE_DONE;
+*column_name_out = NULL;
 
-rcode = cqlite_select_query_execute
-    (
-    db,
-    "SELECT * FROM {{model.get_table_name()}};",
-    "SELECT COUNT(*) FROM {{model.get_table_name()}};",
-    {{model | model_add_to_result_list_function_name}},
-    sizeof( *models_out->list ),
-    (void**)&models_out->list,
-    &models_out->cnt
-    );
+success = ( SQLITE_OK == sqlite3_prepare_v2( db, "SELECT name FROM pragma_table_info( ?1 );", -1, &info_query, NULL ) );
+success = success && ( SQLITE_OK == sqlite3_bind_text( info_query, 1, table_name, -1, SQLITE_STATIC ) );
+
+while( ( success ) && ( NULL == *column_name_out ) && ( SQLITE_ROW == ( rcode = sqlite3_step( info_query ) ) ) )
+    {
+    column_name = (char const *)sqlite3_column_text( info_query, 0 );
+    is_current = 0;
+    for( i = 0; ( i < column_cnt ) && ( !is_current ); i++ )
+        {
+        is_current = ( 0 == sqlite3_stricmp( column_name, columns[i].name ) );
+        }
+
+    if( !is_current )
+        {
+        *column_name_out = sqlite3_mprintf( "%s", column_name );
+        success = ( NULL != *column_name_out );
+        }
+    }
+
+success = success && ( ( SQLITE_ROW == rcode ) || ( SQLITE_DONE == rcode ) );
 
-return ( CQLITE_SUCCESS == rcode );
+sqlite3_finalize( info_query );
+
+return success;
 }
 
 
 /**************************************************
 *
-*    {{model | models_insert_all_new_function_name}} - Insert all {{model.name}} as new models
+*    {{dataset | migrate_name('prepare')}} - Prepare SQL
 *
-*    Inserts all provided {{model.name}} models into the
-*    database. The id fields of each item in the models
-*    list is modified with the generated insert id for
-*    that model.
+*    Prepares and frees the provided SQL, which was
+*    allocated by sqlite3_mprintf and is NULL if the
+*    allocation failed.
 *
 **************************************************/
-int {{model | models_insert_all_new_function_name}}
+static int {{dataset | migrate_name('prepare')}}
     (
     sqlite3 * db,
-    {{model.get_list_pointer_type()}} models
+    char * sql,
+    sqlite3_stmt ** stmt_out
     )
 {
 int success;
-sqlite3_stmt * insert_query;
-int i;
-{{model.get_pointer_type()}} model;
-
-insert_query = NULL;
-
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{ model | model_insert_query_string}}, -1, &insert_query, NULL ) );
-
-for( i = 0; ( success ) && ( i < models->cnt ); i++)
-    {
-    model = &models->list[i];
-
-    // Bind all but the model's primary key so a new primary key is generated upon insertion
-    {%for field in model.fields if not field.is_primary_key() %}
-    success &= ( SQLITE_OK == {{field | field_bind_function_call(model, 'insert_query', 'model')}} );
-    {% endfor %}
-
-    success &= ( CQLITE_SUCCESS == cqlite_insert_query_execute( db, insert_query, &model->{{model.get_primary_key_field().name}} ) );
 
-    success &= ( SQLITE_OK == sqlite3_clear_bindings( insert_query ) );
-    }
+*stmt_out = NULL;
 
-sqlite3_finalize( insert_query );
+success = ( NULL != sql ) && ( SQLITE_OK == sqlite3_prepare_v2( db, sql, -1, stmt_out, NULL ) );
+sqlite3_free( sql );
 
 return success;
 }
@@ -342,330 +4910,446 @@ return success;
 
 /**************************************************
 *
-*    {{model | models_save_all_existing_function_name}} - Save all {{model.name}} as existing models
+*    {{dataset | migrate_name('rebuild')}} - Rebuild table
 *
-*    Saves all provided {{model.name}} models into the
-*    database as existing records updating any previous
-*    records with matching ids.
+*    Renames the table with the specified name out of
+*    the way, creates it again from the provided query
+*    and copies the rows of the old table into it in
+*    batches of {{dataset | migrate_macro('BATCH_SIZE')}} rows, in rowid order. Each
+*    column is copied from the old column with its
+*    name or previous name, and is left NULL if there
+*    is none. The old table and its indexes are then
+*    dropped.
 *
 **************************************************/
-int {{model | models_save_all_existing_function_name}}
+static int {{dataset | migrate_name('rebuild')}}
     (
     sqlite3 * db,
-    {{model.get_list_constant_pointer_type()}} models
+    char const * table_name,
+    char const * create_query,
+    {{dataset | migrate_name('column_t')}} const * columns,
+    int column_cnt,
+    {{dataset | migrate_name('progress_func_t')}} progress,
+    void * ctx
     )
 {
 int success;
-sqlite3_stmt * insert_query;
+int rcode;
 int i;
-{{model.get_pointer_type()}} model;
+int found;
+int matches;
+int has_rows;
+char const * source_name;
+char * old_table_name;
+char * column_list;
+char * source_list;
+sqlite3_int64 start_rowid;
+sqlite3_int64 next_rowid;
+sqlite3_int64 copied_cnt;
+sqlite3_int64 total_cnt;
+sqlite3_stmt * count_query;
+sqlite3_stmt * next_query;
+sqlite3_stmt * copy_query;
 
-insert_query = NULL;
+column_list = NULL;
+source_list = NULL;
+count_query = NULL;
+next_query = NULL;
+copy_query = NULL;
+start_rowid = 0;
+next_rowid = 0;
+copied_cnt = 0;
+total_cnt = 0;
+
+old_table_name = sqlite3_mprintf( "%s_cdal_migrate", table_name );
+success = ( NULL != old_table_name );
+success = success && {{dataset | migrate_name('exec')}}( db, sqlite3_mprintf( "ALTER TABLE \"%w\" RENAME TO \"%w\";", table_name, old_table_name ) );
+success = success && ( SQLITE_OK == sqlite3_exec( db, create_query, NULL, NULL, NULL ) );
+
+for( i = 0; ( success ) && ( i < column_cnt ); i++ )
+    {
+    source_name = columns[i].name;
+    success = {{dataset | migrate_name('column_find')}}( db, old_table_name, source_name, &columns[i], &found, &matches );
+    if( ( success ) && ( !found ) && ( NULL != columns[i].previous_name ) )
+        {
+        source_name = columns[i].previous_name;
+        success = {{dataset | migrate_name('column_find')}}( db, old_table_name, source_name, &columns[i], &found, &matches );
+        }
+
+    if( success )
+        {
+        column_list = sqlite3_mprintf( "%z%s\"%w\"", column_list, ( 0 == i ) ? "" : ", ", columns[i].name );
+        if( found )
+            {
+            source_list = sqlite3_mprintf( "%z%s\"%w\"", source_list, ( 0 == i ) ? "" : ", ", source_name );
+            }
+        else
+            {
+            source_list = sqlite3_mprintf( "%z%sNULL", source_list, ( 0 == i ) ? "" : ", " );
+            }
+
+        success = ( NULL != column_list ) && ( NULL != source_list );
+        }
+    }
 
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{ model | model_insert_query_string}}, -1, &insert_query, NULL ) );
+success = success && {{dataset | migrate_name('prepare')}}( db, sqlite3_mprintf( "SELECT count(*), min(rowid) FROM \"%w\";", old_table_name ), &count_query );
+success = success && {{dataset | migrate_name('prepare')}}( db, sqlite3_mprintf( "SELECT rowid FROM \"%w\" WHERE rowid >= ?1 ORDER BY rowid LIMIT 1 OFFSET ?2;", old_table_name ), &next_query );
+success = success && {{dataset | migrate_name('prepare')}}( db, sqlite3_mprintf( "INSERT INTO \"%w\" ( %s ) SELECT %s FROM \"%w\" WHERE rowid >= ?1 AND ( ?2 IS NULL OR rowid < ?2 );", table_name, column_list, source_list, old_table_name ), &copy_query );
+success = success && ( SQLITE_ROW == sqlite3_step( count_query ) );
 
-for( i = 0; ( success ) && ( i < models->cnt ); i++)
+has_rows = ( success ) && ( SQLITE_NULL != sqlite3_column_type( count_query, 1 ) );
+if( has_rows )
     {
-    model = &models->list[i];
+    total_cnt = sqlite3_column_int64( count_query, 0 );
+    start_rowid = sqlite3_column_int64( count_query, 1 );
+    }
 
-    {%for field in model.fields %}
-    success &= ( SQLITE_OK == {{field | field_bind_function_call(model, 'insert_query', 'model')}} );
-    {% endfor %}
+while( ( success ) && ( has_rows ) )
+    {
+    /* The first row of the next batch bounds the rows copied by this one */
+    success = ( SQLITE_OK == sqlite3_bind_int64( next_query, 1, start_rowid ) );
+    success = success && ( SQLITE_OK == sqlite3_bind_int( next_query, 2, {{dataset | migrate_macro('BATCH_SIZE')}} ) );
+    if( success )
+        {
+        rcode = sqlite3_step( next_query );
+        success = ( ( SQLITE_ROW == rcode ) || ( SQLITE_DONE == rcode ) );
+        has_rows = ( SQLITE_ROW == rcode );
+        next_rowid = has_rows ? sqlite3_column_int64( next_query, 0 ) : 0;
+        sqlite3_reset( next_query );
+        }
+
+    success = success && ( SQLITE_OK == sqlite3_bind_int64( copy_query, 1, start_rowid ) );
+    if( success )
+        {
+        success = has_rows ? ( SQLITE_OK == sqlite3_bind_int64( copy_query, 2, next_rowid ) ) : ( SQLITE_OK == sqlite3_bind_null( copy_query, 2 ) );
+        }
+
+    success = success && ( SQLITE_DONE == sqlite3_step( copy_query ) );
+    sqlite3_reset( copy_query );
+
+    if( success )
+        {
+        copied_cnt += sqlite3_changes( db );
+        start_rowid = next_rowid;
+        }
+
+    if( ( success ) && ( NULL != progress ) )
+        {
+        success = ( 0 == progress( table_name, copied_cnt, total_cnt, ctx ) );
+        }
+    }
 
-    success &= ( SQLITE_DONE == sqlite3_step( insert_query ) );
+sqlite3_finalize( count_query );
+sqlite3_finalize( next_query );
+sqlite3_finalize( copy_query );
 
-    success &= ( SQLITE_OK == sqlite3_clear_bindings( insert_query ) );
-    }
+success = success && {{dataset | migrate_name('exec')}}( db, sqlite3_mprintf( "DROP TABLE \"%w\";", old_table_name ) );
 
-sqlite3_finalize( insert_query );
+sqlite3_free( column_list );
+sqlite3_free( source_list );
+sqlite3_free( old_table_name );
 
 return success;
 }
 
 
-{%for query in model.get_count_queries() %}
 /**************************************************
 *
-*    {{query.name}}
+*    {{dataset | migrate_name('table')}} - Migrate table
 *
-*    Executes a custom count query with the provided
-*    parameters on the {{model.get_table_name()}} database table
-*    and outputs the retrieved count.
+*    Creates the table with the specified name from
+*    the provided query if it does not exist, and
+*    otherwise alters it until its columns are the
+*    provided columns. Columns are renamed from their
+*    previous names, added and dropped in place when
+*    SQLite supports it. The table is rebuilt when a
+*    column changed type or primary key constraint,
+*    a primary key column is missing, or an ALTER
+*    TABLE statement fails.
 *
 **************************************************/
-int {{query.name}}
+static int {{dataset | migrate_name('table')}}
     (
     sqlite3 * db,
-    {%for query_param in query.params %}
-    {{query_param.get_c_type()}} {{query_param.name}},
-    {% endfor %}
-    int * count_out
+    char const * table_name,
+    char const * create_query,
+    {{dataset | migrate_name('column_t')}} const * columns,
+    int column_cnt,
+    {{dataset | migrate_name('progress_func_t')}} progress,
+    void * ctx
     )
 {
 int success;
-sqlite3_stmt * count_query;
+int i;
+int found;
+int matches;
+int needs_rebuild;
+int is_done;
+char * extra_column_name;
 
-count_query = NULL;
-*count_out = 0;
+needs_rebuild = 0;
 
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{query | query_get_full_string(model)}}, -1, &count_query, NULL ) );
+success = ( SQLITE_OK == sqlite3_exec( db, create_query, NULL, NULL, NULL ) );
 
-{%for query_param in query.params %}
-success &= ( SQLITE_OK == {{query_param | query_param_bind_call('count_query')}} );
-{% endfor %}
+for( i = 0; ( success ) && ( i < column_cnt ); i++ )
+    {
+    success = {{dataset | migrate_name('column_find')}}( db, table_name, columns[i].name, &columns[i], &found, &matches );
+
+    if( ( success ) && ( !found ) && ( NULL != columns[i].previous_name ) )
+        {
+        success = {{dataset | migrate_name('column_find')}}( db, table_name, columns[i].previous_name, &columns[i], &found, &matches );
+        if( ( success ) && ( found ) && ( !needs_rebuild ) )
+            {
+            needs_rebuild = !{{dataset | migrate_name('exec')}}( db, sqlite3_mprintf( "ALTER TABLE \"%w\" RENAME COLUMN \"%w\" TO \"%w\";", table_name, columns[i].previous_name, columns[i].name ) );
+            }
+        }
+
+    if( ( success ) && ( found ) && ( !matches ) )
+        {
+        needs_rebuild = 1;
+        }
+    else if( ( success ) && ( !found ) && ( !needs_rebuild ) )
+        {
+        needs_rebuild = ( columns[i].is_primary_key )
+                     || ( !{{dataset | migrate_name('exec')}}( db, sqlite3_mprintf( "ALTER TABLE \"%w\" ADD COLUMN \"%w\" %s;", table_name, columns[i].name, columns[i].type ) ) );
+        }
+    }
 
-success &= ( CQLITE_SUCCESS == cqlite_count_query_execute_prepared( count_query, count_out ) );
+/* Columns removed from the definition are dropped one at a time, since dropping changes the table's columns */
+is_done = needs_rebuild;
+while( ( success ) && ( !is_done ) )
+    {
+    success = {{dataset | migrate_name('extra_column_get')}}( db, table_name, columns, column_cnt, &extra_column_name );
+    is_done = ( NULL == extra_column_name );
+    if( ( success ) && ( !is_done ) )
+        {
+        needs_rebuild = !{{dataset | migrate_name('exec')}}( db, sqlite3_mprintf( "ALTER TABLE \"%w\" DROP COLUMN \"%w\";", table_name, extra_column_name ) );
+        is_done = needs_rebuild;
+        }
+
+    sqlite3_free( extra_column_name );
+    }
 
-sqlite3_finalize( count_query );
+if( ( success ) && ( needs_rebuild ) )
+    {
+    success = {{dataset | migrate_name('rebuild')}}( db, table_name, create_query, columns, column_cnt, progress, ctx );
+    }
 
 return success;
 }
+{% endif %}
 
 
-{% endfor %}
-{%for query in model.get_delete_queries() %}
+#ifdef {{dataset | profile_macro}}
+{% if not dataset.options.zero_copy %}
 /**************************************************
 *
-*    {{query.name}}
+*    {{dataset | profile_name('bind')}} - Count bound bytes
 *
-*    Executes a custom delete query with the provided
-*    parameters on the {{model.get_table_name()}} database table.
+*    Adds the length of a TEXT value that SQLite
+*    copied when binding it to the running accessor's
+*    statistics. Returns rcode, the result of the
+*    bind.
 *
 **************************************************/
-int {{query.name}}
+{{private_static}}int {{dataset | profile_name('bind')}}
     (
-    sqlite3 * db,
-    {%for query_param in query.params %}
-    {{query_param.get_c_type()}} {{query_param.name}}{%if not loop.last %},{% endif %}
-
-    {% endfor %}
+    int rcode,
+    char const * value
     )
 {
-int success;
-sqlite3_stmt * delete_query;
-
-delete_query = NULL;
-
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{query | query_get_full_string(model)}}, -1, &delete_query, NULL ) );
-
-{%for query_param in query.params %}
-success &= ( SQLITE_OK == {{query_param | query_param_bind_call('delete_query')}} );
-{% endfor %}
-
-success &= ( SQLITE_DONE == sqlite3_step( delete_query ) );
-
-sqlite3_finalize( delete_query );
+if( NULL != value )
+    {
+    {{dataset | profile_name('bytes_add')}}( (sqlite3_uint64)strlen( value ) );
+    }
 
-return success;
+return rcode;
 }
 
 
-{% endfor %}
-{%for query in model.get_find_queries() %}
+{% endif %}
 /**************************************************
 *
-*    {{query.name}}
+*    {{dataset | profile_name('bytes_add')}} - Count copied bytes
 *
-*    Executes a custom find query that is expected to
-*    only return a single result with the provided
-*    parameters on the {{model.get_table_name()}} database table.
-*    If a record was found, found_out will be set
-*    to 1, and model_out will be populated with the
-*    matching record. Otherwise, found_out will be
-*    set to 0. It is the caller's responsibility
-*    to call {{model.get_free_function_name()}} on model_out.
+*    Adds the provided number of TEXT or BLOB bytes
+*    copied to the running accessor's statistics.
 *
 **************************************************/
-int {{query.name}}
+{{private_static}}void {{dataset | profile_name('bytes_add')}}
     (
-    sqlite3 * db,
-    {%for query_param in query.params %}
-    {{query_param.get_c_type()}} {{query_param.name}},
-    {% endfor %}
-    int * found_out,
-    {{model.get_pointer_type()}} model_out
+    sqlite3_uint64 bytes
     )
 {
-int success;
-sqlite3_stmt * find_query;
+if( NULL != {{dataset | profile_name('current')}} )
+    {
+    {{dataset | profile_name('current')}}->stats.bytes += bytes;
+    }
+}
 
-find_query = NULL;
-*found_out = 0;
-{{model.get_init_function_name()}}( model_out );
 
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{query | query_get_full_string(model)}}, -1, &find_query, NULL ) );
+/**************************************************
+*
+*    {{dataset | profile_name('enter')}} - Enter accessor
+*
+*    Counts a call to the accessor owning the provided
+*    entry and makes it the running accessor, adding
+*    the entry to this thread's entries the first time
+*    it is called. Returns the entry of the previously
+*    running accessor, which must be passed to
+*    {{dataset | profile_name('exit')}}.
+*
+**************************************************/
+{{private_static}}{{dataset | profile_name('entry_t')}} * {{dataset | profile_name('enter')}}
+    (
+    {{dataset | profile_name('entry_t')}} * entry
+    )
+{
+{{dataset | profile_name('entry_t')}} * prev;
 
-{%for query_param in query.params %}
-success &= ( SQLITE_OK == {{query_param | query_param_bind_call('find_query')}} );
-{% endfor %}
+if( !entry->is_listed )
+    {
+    entry->next = {{dataset | profile_name('entries')}};
+    entry->is_listed = 1;
+    {{dataset | profile_name('entries')}} = entry;
+    }
 
-success &= ( CQLITE_SUCCESS == cqlite_find( find_query, {{model | model_from_row_result_function_name}}, found_out, model_out ) );
+entry->stats.calls++;
 
-sqlite3_finalize( find_query );
+prev = {{dataset | profile_name('current')}};
+{{dataset | profile_name('current')}} = entry;
 
-return success;
-}    
+return prev;
+}
 
 
-{% endfor %}
-{%for query in model.get_select_queries() %}
 /**************************************************
 *
-*    {{query.name}}
+*    {{dataset | profile_name('exit')}} - Exit accessor
 *
-*    Executes a custom select query that is expected to
-*    return possibly many result with the provided
-*    parameters on the {{model.get_table_name()}} database table.
-*    The caller must call {{model.get_list_free_function_name()}}
-*    on models_out.
+*    Adds the rows read or written by a successful
+*    call, or counts a failed call, to the running
+*    accessor's statistics and restores the previously
+*    running accessor.
 *
 **************************************************/
-int {{query.name}}
+{{private_static}}void {{dataset | profile_name('exit')}}
     (
-    sqlite3 * db,
-    {%for query_param in query.params %}
-    {{query_param.get_c_type()}} {{query_param.name}},
-    {% endfor %}
-    {{model.get_list_pointer_type()}} models_out
+    {{dataset | profile_name('entry_t')}} * prev,
+    int success,
+    sqlite3_uint64 rows
     )
 {
-int success;
-sqlite3_stmt * select_query;
-sqlite3_stmt * count_query;
-cqlite_rcode_t cqlite_rcode;
-
-select_query = NULL;
-count_query = NULL;
-{{model.get_list_init_function_name()}}( models_out );
-
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{query | query_get_full_string(model)}}, -1, &select_query, NULL ) ) &&
-          ( SQLITE_OK == sqlite3_prepare_v2( db, {{query | select_query_get_count_query_string(model)}}, -1, &count_query, NULL ) );
-
-{%for query_param in query.params %}
-success &= ( SQLITE_OK == {{query_param | query_param_bind_call('select_query')}} );
-{% endfor %}
-
-{%for query_param in query.params %}
-success &= ( SQLITE_OK == {{query_param | query_param_bind_call('count_query')}} );
-{% endfor %}
-
 if( success )
-   {
-    cqlite_rcode = cqlite_select_query_execute_prepared
-        (
-        select_query,
-        count_query,
-        {{model | model_add_to_result_list_function_name}},
-        sizeof( *models_out->list ),
-        (void**)&models_out->list,
-        &models_out->cnt
-        );
-    success = ( CQLITE_SUCCESS == cqlite_rcode );
-   }
-
-sqlite3_finalize( select_query );
-sqlite3_finalize( count_query );
+    {
+    {{dataset | profile_name('current')}}->stats.rows += rows;
+    }
+else
+    {
+    {{dataset | profile_name('current')}}->stats.failures++;
+    }
 
-return success;
+{{dataset | profile_name('current')}} = prev;
 }
 
 
-{% endfor %}
-{%for query in model.get_update_queries() %}
 /**************************************************
 *
-*    {{query.name}}
+*    {{dataset | profile_name('now')}} - Get time
 *
-*    Executes a custom update query with the provided
-*    parameters on the {{model.get_table_name()}} database table.
+*    Returns the current monotonic time in
+*    nanoseconds.
 *
 **************************************************/
-int {{query.name}}
+{{private_static}}sqlite3_uint64 {{dataset | profile_name('now')}}
     (
-    sqlite3 * db,
-    {%for query_param in query.params %}
-    {{query_param.get_c_type()}} {{query_param.name}}{%if not loop.last %},{% endif %}
-
-    {% endfor %}
+    void
     )
 {
-int success;
-sqlite3_stmt * update_query;
+struct timespec now;
 
-update_query = NULL;
-
-success = ( SQLITE_OK == sqlite3_prepare_v2( db, {{query | query_get_full_string(model)}}, -1, &update_query, NULL ) );
-
-{%for query_param in query.params %}
-success &= ( SQLITE_OK == {{query_param | query_param_bind_call('update_query')}} );
-{% endfor %}
-
-success &= ( SQLITE_DONE == sqlite3_step( update_query ) );
+clock_gettime( CLOCK_MONOTONIC, &now );
 
-sqlite3_finalize( update_query );
-
-return success;
+return ( (sqlite3_uint64)now.tv_sec * 1000000000 ) + (sqlite3_uint64)now.tv_nsec;
 }
 
 
-{% endfor %}
-{% endfor %}
-
-{% for model in dataset.models %}
 /**************************************************
 *
-*    {{model | model_add_to_result_list_function_name}} - Add to result list
+*    {{dataset | profile_name('rows_add')}} - Count rows
 *
-*    A cqlite_model_add_to_list_func_t function to
-*    read the provided query row result as a {{model.name}}
-*    model into the provided list at the specified index.
+*    Adds the provided number of rows to the running
+*    accessor's statistics.
 *
 **************************************************/
-static int {{model | model_add_to_result_list_function_name}}
+{{private_static}}void {{dataset | profile_name('rows_add')}}
     (
-    sqlite3_stmt * query,
-    void * model_list,
-    int next_model_list_idx
+    sqlite3_uint64 rows
     )
 {
-{{model.get_pointer_type()}} models;
+if( NULL != {{dataset | profile_name('current')}} )
+    {
+    {{dataset | profile_name('current')}}->stats.rows += rows;
+    }
+}
 
-models = ({{model.get_pointer_type()}})model_list;
 
-return {{model | model_from_row_result_function_name}}( query, &models[next_model_list_idx] );
+/**************************************************
+*
+*    {{dataset | profile_name('time_begin')}} - Begin timing phase
+*
+*    Starts timing a prepare, step or finalize phase
+*    of the running accessor.
+*
+**************************************************/
+{{private_static}}void {{dataset | profile_name('time_begin')}}
+    (
+    void
+    )
+{
+{{dataset | profile_name('start_ns')}} = {{dataset | profile_name('now')}}();
 }
 
 
 /**************************************************
 *
-*    {{model | model_from_row_result_function_name}} - Model from row result
+*    {{dataset | profile_name('time_end')}} - End timing phase
 *
-*    A cqlite_model_from_row_result_func_t function
-*    that reads the provided query row result as a
-*    {{model.name}} model.
+*    Adds the time since {{dataset | profile_name('time_begin')}}
+*    to the specified phase of the running accessor's
+*    statistics. Returns rcode, the result of the
+*    timed call.
 *
 **************************************************/
-static int {{model | model_from_row_result_function_name}}
+{{private_static}}int {{dataset | profile_name('time_end')}}
     (
-    sqlite3_stmt * query,
-    void * model_out
+    int phase,
+    int rcode
     )
 {
-int success;
-{{model.get_pointer_type()}} model;
-
-success = 1;
-model = ({{model.get_pointer_type()}})model_out;
+sqlite3_uint64 elapsed;
 
-{% for field in model.fields if field.field_type.is_primitive_type() %}
-{{field | field_read_result_function_call(model, 'query', 'model', 'success')}}
-{% endfor %}
+elapsed = {{dataset | profile_name('now')}}() - {{dataset | profile_name('start_ns')}};
 
-{% for field in model.fields if not field.field_type.is_primitive_type() %}
-{{field | field_read_result_function_call(model, 'query', 'model', 'success')}}
-{% endfor %}
+if( NULL != {{dataset | profile_name('current')}} )
+    {
+    switch( phase )
+        {
+        case {{dataset | profile_macro('PREPARE_PHASE')}}:
+            {{dataset | profile_name('current')}}->stats.prepare_ns += elapsed;
+            break;
+
+        case {{dataset | profile_macro('STEP_PHASE')}}:
+            {{dataset | profile_name('current')}}->stats.step_ns += elapsed;
+            break;
+
+        default:
+            {{dataset | profile_name('current')}}->stats.finalize_ns += elapsed;
+            break;
+        }
+    }
 
-return success;
+return rcode;
 }
-
-{% endfor %}
\ No newline at end of file
+#endif
+{% endif %}
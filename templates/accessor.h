@@ -15,6 +15,167 @@ THIS FILE IS AUTO-GENERATED. DO NOT EDIT DIRECTLY. ALL CHANGES WILL BE LOST.
 #include {{include}}
 {% endfor %}
 
+/************************************************************************
+                              CONSTANTS
+************************************************************************/
+
+{% for model in dataset.models %}
+#define {{model | model_batch_size_macro}} ( {{model.batch_size}} )
+#define {{model | model_bulk_insert_rows_macro}} ( {{model | model_bulk_insert_rows}} )
+#define {{model | model_find_many_chunk_size_macro}} ( {{model | model_find_many_chunk_size}} )
+{% if model | model_has_field_mask %}
+{% for field in model.fields if not field.is_primary_key() %}
+#define {{field | field_mask_macro(model)}} {{field | field_mask_bit(model)}}
+{% endfor %}
+#define {{model | model_field_mask_all_macro}} ( ~(sqlite3_uint64)0 )
+{% endif %}
+{% if model.row_cache %}
+#define {{model | model_row_cache_macro('MAX_ENTRIES')}} ( {{model.row_cache.max_entries}} )
+#define {{model | model_row_cache_macro('MAX_BYTES')}} ( {{model.row_cache.max_bytes}} )
+#define {{model | model_row_cache_macro('BUCKET_CNT')}} ( {{model | model_row_cache_bucket_cnt}} )
+{% endif %}
+{% endfor %}
+
+{% if dataset.options.statement_cache %}
+#define {{dataset | stmt_cnt_macro}} ( {{stmt_ids | length}} )
+
+{% endif %}
+{% if dataset.options.schema_migration %}
+#define {{dataset | migrate_macro('BATCH_SIZE')}} ( {{dataset | migrate_batch_size}} )
+
+{% endif %}
+/************************************************************************
+                               TYPES
+************************************************************************/
+
+{% if dataset.get_row_cache_models() %}
+typedef struct
+    {
+    sqlite3_uint64 hits;
+    sqlite3_uint64 misses;
+    sqlite3_uint64 evictions;
+    sqlite3_uint64 invalidations;
+    sqlite3_uint64 entry_cnt;
+    sqlite3_uint64 byte_cnt;
+    } {{dataset | row_cache_stats_c_type}};
+
+typedef struct
+    {
+    {% for model in dataset.get_row_cache_models() %}
+    struct {{dataset | row_cache_name('table_s')}} * {{model | model_row_cache_member}};
+    {% endfor %}
+    {% if dataset.options.connection_pool %}
+    pthread_mutex_t lock;
+    {% endif %}
+    } {{dataset | row_cache_c_type}};
+
+{% endif %}
+{% if dataset.options.schema_migration %}
+typedef int (*{{dataset | migrate_name('progress_func_t')}})
+    (
+    char const * table_name,
+    sqlite3_int64 copied_cnt,
+    sqlite3_int64 total_cnt,
+    void * ctx
+    );
+
+{% endif %}
+{% if dataset.options.statement_cache %}
+typedef struct
+    {
+    sqlite3 * db;
+    sqlite3_stmt * stmts[ {{dataset | stmt_cnt_macro}} ];
+    int stmt_is_checked_out[ {{dataset | stmt_cnt_macro}} ];
+    {% if dataset.get_row_cache_models() %}
+    {{dataset | row_cache_pointer_type}} rows;
+    {% endif %}
+    } {{dataset | stmt_cache_c_type}};
+
+{% endif %}
+{% if dataset.options.connection_pool %}
+typedef struct
+    {
+    {{dataset | stmt_cache_c_type}} writer;
+    {{dataset | stmt_cache_pointer_type}} readers;
+    int * reader_is_acquired;
+    int reader_cnt;
+    pthread_mutex_t writer_lock;
+    pthread_mutex_t readers_lock;
+    pthread_cond_t reader_released;
+    {% if dataset.get_row_cache_models() %}
+    {{dataset | row_cache_c_type}} rows;
+    {% endif %}
+    } {{dataset | pool_c_type}};
+
+{% endif %}
+#ifdef {{dataset | profile_macro}}
+typedef struct
+    {
+    char const * function;
+    sqlite3_uint64 calls;
+    sqlite3_uint64 failures;
+    sqlite3_uint64 rows;
+    sqlite3_uint64 bytes;
+    sqlite3_uint64 prepare_ns;
+    sqlite3_uint64 step_ns;
+    sqlite3_uint64 finalize_ns;
+    } {{dataset | stats_c_type}};
+
+#endif
+{% for model in dataset.get_struct_models() %}
+typedef struct
+    {
+    sqlite3_stmt * query;
+    {% if dataset.options.statement_cache %}
+    {{dataset | stmt_cache_pointer_type}} cache;
+    int stmt_id;
+    {% endif %}
+    {% for field in model.fields if field.is_dynamically_allocated() %}
+    size_t {{field | field_cursor_capacity_member}};
+    {% endfor %}
+    } {{model.get_cursor_c_type()}};
+
+typedef int (*{{model.get_visit_func_c_type()}})
+    (
+    {{model.get_constant_pointer_type()}} model,
+    void * ctx
+    );
+
+{% if dataset.options.zero_copy %}
+typedef struct
+    {
+    {% for field in model.fields %}
+    {% if field.field_type.is_primitive_type() %}
+    {{field.get_type_declaration()}} {{field.name}};
+    {% else %}
+    char const * {{field.name}};
+    size_t {{field | field_view_length_member}};
+    {% endif %}
+    {% endfor %}
+    } {{model.get_view_c_type()}};
+
+{% endif %}
+{% endfor %}
+{% for model in dataset.models %}
+{% for query in model.get_page_queries() %}
+typedef struct
+    {
+    {% for field in query.key_fields %}
+    {{field.get_type_declaration()}} {{field.get_name_declaration()}};
+    {% endfor %}
+    } {{query.get_key_c_type()}};
+
+{% endfor %}
+{% for query in model.get_batch_queries() %}
+typedef struct
+    {
+    {% for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}};
+    {% endfor %}
+    } {{query.get_params_c_type()}};
+
+{% endfor %}
+{% endfor %}
 /************************************************************************
                                PROCEDURES
 ************************************************************************/
@@ -29,66 +190,292 @@ int {{dataset | database_initialize_function_name}}
     sqlite3 * db
     );
 
-{% for model in dataset.models %}
-int {{model | model_delete_by_id_function_name}}
+{% if dataset.options.schema_migration %}
+int {{dataset | database_migrate_function_name}}
     (
     sqlite3 * db,
-    sqlite3_int64 id
+    {{dataset | migrate_name('progress_func_t')}} progress,
+    void * ctx
     );
 
-int {{model | model_find_by_id_function_name}}
+{% endif %}
+{% if dataset.connection %}
+int {{dataset | connection_configure_function_name}}
+    (
+    sqlite3 * db
+    );
+
+int {{dataset | connection_close_function_name}}
+    (
+    sqlite3 * db
+    );
+
+{% endif %}{% if dataset.options.statement_cache %}
+void {{dataset | stmt_cache_close_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache
+    );
+
+void {{dataset | stmt_cache_open_function_name}}
     (
     sqlite3 * db,
+    {{dataset | stmt_cache_pointer_type}} cache_out
+    );
+
+{% endif %}
+{% if dataset.get_row_cache_models() %}
+int {{dataset | database_delete_all_data_function_name | accessor_function_name(True)}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache
+    );
+
+void {{dataset | row_cache_name('clear')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows
+    );
+
+void {{dataset | row_cache_name('close')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows
+    );
+
+int {{dataset | row_cache_name('open')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows_out
+    );
+
+void {{dataset | stmt_cache_rows_set_function_name}}
+    (
+    {{dataset | stmt_cache_pointer_type}} cache,
+    {{dataset | row_cache_pointer_type}} rows
+    );
+
+{% for model in dataset.get_row_cache_models() %}
+void {{model | model_row_cache_function_name('stats_get')}}
+    (
+    {{dataset | row_cache_pointer_type}} rows,
+    {{dataset | row_cache_stats_c_type}} * stats_out
+    );
+
+{% endfor %}
+{% endif %}
+{% if dataset.options.connection_pool %}
+int {{dataset | pool_function_name('close')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    );
+
+int {{dataset | pool_function_name('open')}}
+    (
+    char const * filename,
+    int reader_cnt,
+    {{dataset | pool_pointer_type}} pool_out
+    );
+
+{{dataset | stmt_cache_pointer_type}} {{dataset | pool_function_name('reader_acquire')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    );
+
+void {{dataset | pool_function_name('reader_release')}}
+    (
+    {{dataset | pool_pointer_type}} pool,
+    {{dataset | stmt_cache_pointer_type}} reader
+    );
+
+{{dataset | stmt_cache_pointer_type}} {{dataset | pool_function_name('writer_acquire')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    );
+
+void {{dataset | pool_function_name('writer_release')}}
+    (
+    {{dataset | pool_pointer_type}} pool
+    );
+
+{% endif %}
+#ifdef {{dataset | profile_macro}}
+int {{dataset | stats_get_function_name}}
+    (
+    {{dataset | stats_c_type}} * stats_out,
+    int stats_capacity,
+    int * stats_cnt_out
+    );
+
+void {{dataset | stats_reset_function_name}}
+    (
+    void
+    );
+
+#endif
+{% for model in dataset.get_struct_models() %}
+void {{model | model_cursor_close_function_name}}
+    (
+    {{model.get_cursor_pointer_type()}} cursor
+    );
+
+int {{model | model_cursor_next_function_name}}
+    (
+    {{model.get_cursor_pointer_type()}} cursor,
+    int * found_out,
+    {{model.get_pointer_type()}} model_out
+    );
+
+{% if dataset.options.zero_copy %}
+int {{model | model_cursor_next_view_function_name}}
+    (
+    {{model.get_cursor_pointer_type()}} cursor,
+    int * found_out,
+    {{model.get_view_pointer_type()}} view_out
+    );
+
+{% endif %}
+{% endfor %}
+{% for cached in accessor_variants + pooled_variants %}
+{% for model in dataset.models %}
+int {{model | model_delete_by_id_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 id
+    );
+
+int {{model | model_find_by_id_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
     sqlite3_int64 id,
     int * found_out,
     {{model.get_pointer_type()}} model_out
     );
 
-int {{model | model_insert_new_function_name}}
+int {{model | model_find_many_by_id_function_name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 const * ids,
+    int id_cnt,
+    {{model.get_list_pointer_type()}} models_out,
+    unsigned char * missing_out
+    );
+
+{% if dataset.options.zero_copy and cached not in pooled_variants %}
+int {{model | model_find_by_id_function_name | view_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    sqlite3_int64 id,
+    {{model.get_cursor_pointer_type()}} cursor_out,
+    int * found_out,
+    {{model.get_view_pointer_type()}} view_out
+    );
+
+{% endif %}
+int {{model | model_insert_new_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
     {{model.get_pointer_type()}} model
     );
 
-int {{model | model_save_existing_function_name}}
+int {{model | model_save_existing_function_name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     {{model.get_constant_pointer_type()}} model
     );
 
-int {{model | models_count_all_function_name}}
+int {{model | models_count_all_function_name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     int * count_out
     );
 
-int {{model | models_delete_all_function_name}}
+int {{model | models_delete_all_function_name | accessor_function_name(cached)}}
     (
-    sqlite3 * db
+    {{dataset | accessor_db_param_declaration(cached)}}
     );
 
-int {{model | models_get_all_function_name}}
+{% for counted in select_variants %}
+int {{model | models_get_all_function_name | select_function_name(dataset, counted) | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     {{model.get_list_pointer_type()}} models_out
     );
 
-int {{model | models_insert_all_new_function_name}}
+{% endfor %}
+{% if model.columnar %}
+int {{model | models_get_all_function_name | columnar_function_name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_columns_pointer_type()}} columns_out
+    );
+
+{% endif %}
+{% if cached not in pooled_variants %}
+int {{model | models_get_all_function_name | cursor_open_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_cursor_pointer_type()}} cursor_out
+    );
+
+{% endif %}
+int {{model | models_get_all_function_name | for_each_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_visit_func_c_type()}} visit,
+    void * ctx,
+    int * visit_rcode_out
+    );
+
+int {{model | models_insert_all_new_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
     {{model.get_list_pointer_type()}} models
     );
 
-int {{model | models_save_all_existing_function_name}}
+int {{model | models_save_all_existing_function_name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     {{model.get_list_constant_pointer_type()}} models
     );
 
+int {{model | models_insert_all_new_batched_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_pointer_type()}} models,
+    int batch_size,
+    int * failed_idx_out
+    );
+
+int {{model | models_save_all_existing_batched_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models,
+    int batch_size,
+    int * failed_idx_out
+    );
+
+int {{model | models_insert_all_new_bulk_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_pointer_type()}} models
+    );
+
+{% if model | model_has_field_mask %}
+int {{model | models_update_all_fields_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models,
+    sqlite3_uint64 field_mask
+    );
+
+int {{model | models_upsert_all_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{model.get_list_constant_pointer_type()}} models,
+    sqlite3_uint64 field_mask
+    );
+
+{% endif %}
 {%for query in model.get_count_queries() %}
-int {{query.name}}
+int {{query.name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     {%for query_param in query.params %}
     {{query_param.get_c_type()}} {{query_param.name}},
     {% endfor %}
@@ -97,49 +484,134 @@ int {{query.name}}
 
 {% endfor %}
 {%for query in model.get_delete_queries() %}
-int {{query.name}}
+int {{query.name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}}{%if query.params %},{% endif %}
+
     {%for query_param in query.params %}
     {{query_param.get_c_type()}} {{query_param.name}}{%if not loop.last %},{% endif %}
 
     {% endfor %}
     );
 
-{% endfor %}
+{% if query.params %}
+int {{query.name | batch_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{query.get_params_constant_pointer_type()}} params,
+    int params_cnt,
+    int * changes_out
+    );
+
+{% endif %}{% endfor %}
 {%for query in model.get_find_queries() %}
-int {{query.name}}
+{% set result_model = query.get_result_model(model) %}
+int {{query.name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     {%for query_param in query.params %}
     {{query_param.get_c_type()}} {{query_param.name}},
     {% endfor %}
     int * found_out,
-    {{model.get_pointer_type()}} model_out
+    {{result_model.get_pointer_type()}} model_out
+    );
+
+{% if dataset.options.zero_copy and cached not in pooled_variants %}
+int {{query.name | view_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_cursor_pointer_type()}} cursor_out,
+    int * found_out,
+    {{result_model.get_view_pointer_type()}} view_out
     );
 
+{% endif %}
 {% endfor %}
 {%for query in model.get_select_queries() %}
-int {{query.name}}
+{% set result_model = query.get_result_model(model) %}
+{% for counted in select_variants %}
+int {{query.name | select_function_name(dataset, counted) | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}},
     {%for query_param in query.params %}
     {{query_param.get_c_type()}} {{query_param.name}},
     {% endfor %}
-    {{model.get_list_pointer_type()}} models_out
+    {{result_model.get_list_pointer_type()}} models_out
+    );
+
+{% endfor %}
+{% if model.columnar and not query.result_model %}
+int {{query.name | columnar_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{model.get_columns_pointer_type()}} columns_out
+    );
+
+{% endif %}
+{% if cached not in pooled_variants %}
+int {{query.name | cursor_open_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_cursor_pointer_type()}} cursor_out
+    );
+
+{% endif %}
+int {{query.name | for_each_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{result_model.get_visit_func_c_type()}} visit,
+    void * ctx,
+    int * visit_rcode_out
+    );
+
+{% endfor %}
+{%for query in model.get_page_queries() %}
+int {{query.name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {%for query_param in query.params %}
+    {{query_param.get_c_type()}} {{query_param.name}},
+    {% endfor %}
+    {{query.get_key_constant_pointer_type()}} last_key,
+    int limit,
+    {{model.get_list_pointer_type()}} models_out,
+    {{query.get_key_pointer_type()}} next_key_out
     );
 
 {% endfor %}
 {%for query in model.get_update_queries() %}
-int {{query.name}}
+int {{query.name | accessor_function_name(cached)}}
     (
-    sqlite3 * db,
+    {{dataset | accessor_db_param_declaration(cached)}}{%if query.params %},{% endif %}
+
     {%for query_param in query.params %}
     {{query_param.get_c_type()}} {{query_param.name}}{%if not loop.last %},{% endif %}
 
     {% endfor %}
     );
 
+{% if query.params %}
+int {{query.name | batch_function_name | accessor_function_name(cached)}}
+    (
+    {{dataset | accessor_db_param_declaration(cached)}},
+    {{query.get_params_constant_pointer_type()}} params,
+    int params_cnt,
+    int * changes_out
+    );
+
+{% endif %}{% endfor %}
 {% endfor %}
 {% endfor %}
 
@@ -0,0 +1,628 @@
+/************************************************************************
+THIS FILE IS AUTO-GENERATED. DO NOT EDIT DIRECTLY. ALL CHANGES WILL BE LOST.
+
+{{dataset | bench_name}} - Microbenchmark for the {{dataset.name}} accessors.
+
+Usage: bench [-r rows] [-c cardinality] [-t text_length] [-i iterations] [-f db_file]
+
+Fills each model's table with rows of synthetic data, times the generated
+accessor functions, and prints the results as JSON to stdout. Values are
+drawn from a pool of cardinality distinct values, and text and blob values
+are text_length bytes long. The database is held in memory unless db_file
+is provided, in which case db_file is deleted before and after the run.
+************************************************************************/
+
+#define _POSIX_C_SOURCE 200809L
+
+/************************************************************************
+                              INCLUDES
+************************************************************************/
+
+{% for include in includes %}
+#include {{include}}
+{% endfor %}
+
+/************************************************************************
+                              CONSTANTS
+************************************************************************/
+
+#define {{dataset | bench_macro('DEFAULT_ROWS')}} ( 1000 )
+#define {{dataset | bench_macro('DEFAULT_CARDINALITY')}} ( 100 )
+#define {{dataset | bench_macro('DEFAULT_TEXT_LENGTH')}} ( 32 )
+#define {{dataset | bench_macro('DEFAULT_ITERATIONS')}} ( 1000 )
+#define {{dataset | bench_macro('BULK_REPEATS')}} ( 5 )
+#define {{dataset | bench_macro('PAGE_LIMIT')}} ( 8 )
+
+/************************************************************************
+                               TYPES
+************************************************************************/
+
+typedef struct
+    {
+    int rows;
+    int cardinality;
+    int text_length;
+    int iterations;
+    char const * db_path;
+    } bench_config_t;
+
+/************************************************************************
+                               PROCEDURES
+************************************************************************/
+
+static void bench_check
+    (
+    int success,
+    char const * function_name
+    );
+
+static int bench_config_parse
+    (
+    int argc,
+    char ** argv,
+    bench_config_t * config_out
+    );
+
+static double bench_now
+    (
+    void
+    );
+
+static void bench_report
+    (
+    char const * model_name,
+    char const * function_name,
+    int rows_per_call,
+    double * samples,
+    int sample_cnt,
+    int failure_cnt
+    );
+
+static int bench_sample_compare
+    (
+    void const * a,
+    void const * b
+    );
+
+{% for model in dataset.models %}
+static void {{model | model_bench_function_name}}
+    (
+    sqlite3 * db,
+    {% if dataset.options.statement_cache %}
+    {{dataset | stmt_cache_pointer_type}} cache,
+    {% endif %}
+    bench_config_t const * config,
+    char ** texts,
+    double * samples
+    );
+
+static void {{model | model_bench_fill_function_name}}
+    (
+    {{model.get_pointer_type()}} model,
+    int value,
+    char * text
+    );
+
+{% endfor %}
+
+/**************************************************
+*
+*    main - Run the benchmark
+*
+**************************************************/
+int main
+    (
+    int argc,
+    char ** argv
+    )
+{
+bench_config_t config;
+sqlite3 * db;
+{% if dataset.options.statement_cache %}
+{{dataset | stmt_cache_c_type}} cache;
+{% endif %}
+char ** texts;
+double * samples;
+char number[ 16 ];
+int number_len;
+int i;
+
+if( !bench_config_parse( argc, argv, &config ) )
+    {
+    fprintf( stderr, "usage: %s [-r rows] [-c cardinality] [-t text_length] [-i iterations] [-f db_file]\n", argv[0] );
+    return EXIT_FAILURE;
+    }
+
+texts = calloc( config.cardinality, sizeof( *texts ) );
+samples = calloc( ( config.iterations > {{dataset | bench_macro('BULK_REPEATS')}} ) ? config.iterations : {{dataset | bench_macro('BULK_REPEATS')}}, sizeof( *samples ) );
+bench_check( ( NULL != texts ) && ( NULL != samples ), "calloc" );
+
+for( i = 0; i < config.cardinality; i++ )
+    {
+    texts[i] = malloc( config.text_length + 1 );
+    bench_check( NULL != texts[i], "malloc" );
+    memset( texts[i], 'x', config.text_length );
+    texts[i][config.text_length] = '\0';
+
+    // Make each text distinct by starting it with its index
+    number_len = snprintf( number, sizeof( number ), "%d", i );
+    memcpy( texts[i], number, ( number_len < config.text_length ) ? number_len : config.text_length );
+    }
+
+if( NULL != config.db_path )
+    {
+    remove( config.db_path );
+    }
+
+bench_check( SQLITE_OK == sqlite3_open( ( NULL != config.db_path ) ? config.db_path : ":memory:", &db ), "sqlite3_open" );
+bench_check( {{dataset | database_initialize_function_name}}( db ), "{{dataset | database_initialize_function_name}}" );
+{% if dataset.options.statement_cache %}
+{{dataset | stmt_cache_open_function_name}}( db, &cache );
+{% endif %}
+
+printf( "{\n" );
+printf( "  \"dataset\": \"{{dataset.name}}\",\n" );
+printf( "  \"rows\": %d,\n", config.rows );
+printf( "  \"cardinality\": %d,\n", config.cardinality );
+printf( "  \"text_length\": %d,\n", config.text_length );
+printf( "  \"iterations\": %d,\n", config.iterations );
+printf( "  \"results\": [" );
+
+{% for model in dataset.models %}
+{{model | model_bench_function_name}}( db, {% if dataset.options.statement_cache %}&cache, {% endif %}&config, texts, samples );
+{% endfor %}
+
+printf( "\n  ]\n}\n" );
+
+{% if dataset.options.statement_cache %}
+{{dataset | stmt_cache_close_function_name}}( &cache );
+{% endif %}
+sqlite3_close( db );
+
+if( NULL != config.db_path )
+    {
+    remove( config.db_path );
+    }
+
+for( i = 0; i < config.cardinality; i++ )
+    {
+    free( texts[i] );
+    }
+free( texts );
+free( samples );
+
+return EXIT_SUCCESS;
+}
+
+
+{% for model in dataset.models %}
+/**************************************************
+*
+*    {{model | model_bench_function_name}} - Benchmark {{model.name}} accessors
+*
+*    Times the accessor functions of the {{model.get_table_name()}}
+*    table and reports each of them. The benchmark
+*    exits if a built-in accessor fails, while failed
+*    custom queries are counted in their report.
+*    Custom delete queries run last since they remove
+*    the rows the other queries read.
+*
+**************************************************/
+static void {{model | model_bench_function_name}}
+    (
+    sqlite3 * db,
+    {% if dataset.options.statement_cache %}
+    {{dataset | stmt_cache_pointer_type}} cache,
+    {% endif %}
+    bench_config_t const * config,
+    char ** texts,
+    double * samples
+    )
+{
+int i;
+int value;
+int found;
+int failure_cnt;
+{% if model.get_count_queries() | list %}
+int count;
+{% endif %}
+double start;
+{{model.get_c_type()}} model;
+{{model.get_c_type()}} model_out;
+{{model.get_pointer_type()}} row;
+{{model.get_list_c_type()}} models;
+{{model.get_list_c_type()}} models_out;
+
+{{model.get_list_init_function_name()}}( &models );
+models.list = calloc( config->rows, sizeof( *models.list ) );
+bench_check( NULL != models.list, "calloc" );
+models.cnt = config->rows;
+
+for( i = 0; i < config->rows; i++ )
+    {
+    value = i % config->cardinality;
+    {{model | model_bench_fill_function_name}}( &models.list[i], value, texts[value] );
+    }
+
+{% for cached in accessor_variants %}
+{% set db_var = cached | accessor_db_param_var %}
+{% set function_name = model | model_insert_new_function_name | accessor_function_name(cached) %}
+for( i = 0; i < config->iterations; i++ )
+    {
+    model = models.list[i % config->rows];
+    start = bench_now();
+    bench_check( {{function_name}}( {{db_var}}, &model ), "{{function_name}}" );
+    samples[i] = bench_now() - start;
+    }
+bench_report( "{{model.name}}", "{{function_name}}", 1, samples, config->iterations, 0 );
+
+{% set function_name = model | models_insert_all_new_function_name | accessor_function_name(cached) %}
+for( i = 0; i < {{dataset | bench_macro('BULK_REPEATS')}}; i++ )
+    {
+    bench_check( {{model | models_delete_all_function_name | accessor_function_name(cached)}}( {{db_var}} ), "{{model | models_delete_all_function_name | accessor_function_name(cached)}}" );
+    start = bench_now();
+    bench_check( {{function_name}}( {{db_var}}, &models ), "{{function_name}}" );
+    samples[i] = bench_now() - start;
+    }
+bench_report( "{{model.name}}", "{{function_name}}", config->rows, samples, {{dataset | bench_macro('BULK_REPEATS')}}, 0 );
+
+{% set function_name = model | models_save_all_existing_function_name | accessor_function_name(cached) %}
+for( i = 0; i < {{dataset | bench_macro('BULK_REPEATS')}}; i++ )
+    {
+    start = bench_now();
+    bench_check( {{function_name}}( {{db_var}}, &models ), "{{function_name}}" );
+    samples[i] = bench_now() - start;
+    }
+bench_report( "{{model.name}}", "{{function_name}}", config->rows, samples, {{dataset | bench_macro('BULK_REPEATS')}}, 0 );
+
+{% set function_name = model | model_find_by_id_function_name | accessor_function_name(cached) %}
+for( i = 0; i < config->iterations; i++ )
+    {
+    start = bench_now();
+    bench_check( {{function_name}}( {{db_var}}, models.list[i % config->rows].{{model.get_primary_key_field().name}}, &found, &model_out ), "{{function_name}}" );
+    samples[i] = bench_now() - start;
+    {{model.get_free_function_name()}}( &model_out );
+    }
+bench_report( "{{model.name}}", "{{function_name}}", 1, samples, config->iterations, 0 );
+
+{% set function_name = model | models_get_all_function_name | accessor_function_name(cached) %}
+for( i = 0; i < {{dataset | bench_macro('BULK_REPEATS')}}; i++ )
+    {
+    start = bench_now();
+    bench_check( {{function_name}}( {{db_var}}, &models_out ), "{{function_name}}" );
+    samples[i] = bench_now() - start;
+    {{model.get_list_free_function_name()}}( &models_out );
+    }
+bench_report( "{{model.name}}", "{{function_name}}", config->rows, samples, {{dataset | bench_macro('BULK_REPEATS')}}, 0 );
+
+{% for query in model.get_select_queries() %}
+{% set result_model = query.get_result_model(model) %}
+{% set function_name = query.name | accessor_function_name(cached) %}
+    {
+    {{result_model.get_list_c_type()}} results;
+    long row_cnt;
+
+    failure_cnt = 0;
+    row_cnt = 0;
+    for( i = 0; i < config->iterations; i++ )
+        {
+        row = &models.list[i % config->rows];
+        value = i % config->cardinality;
+        start = bench_now();
+        failure_cnt += !{{function_name}}( {{db_var}}, {% for query_param in query.params %}{{query_param | query_param_bench_value(model, 'row', 'value', 'texts[value]')}}, {% endfor %}&results );
+        samples[i] = bench_now() - start;
+        row_cnt += results.cnt;
+        {{result_model.get_list_free_function_name()}}( &results );
+        }
+    bench_report( "{{model.name}}", "{{function_name}}", (int)( row_cnt / config->iterations ), samples, config->iterations, failure_cnt );
+    }
+
+{% endfor %}
+{% for query in model.get_page_queries() %}
+{% set function_name = query.name | accessor_function_name(cached) %}
+    {
+    {{model.get_list_c_type()}} results;
+    {{query.get_key_c_type()}} key;
+    long row_cnt;
+    int has_key;
+
+    failure_cnt = 0;
+    row_cnt = 0;
+    has_key = 0;
+    for( i = 0; i < config->iterations; i++ )
+        {
+        /* Each call reads the next page of the current walk, and a new walk starts after its last page */
+        if( !has_key )
+            {
+            row = &models.list[i % config->rows];
+            value = i % config->cardinality;
+            }
+        start = bench_now();
+        failure_cnt += !{{function_name}}( {{db_var}}, {% for query_param in query.params %}{{query_param | query_param_bench_value(model, 'row', 'value', 'texts[value]')}}, {% endfor %}has_key ? &key : NULL, {{dataset | bench_macro('PAGE_LIMIT')}}, &results, &key );
+        samples[i] = bench_now() - start;
+        row_cnt += results.cnt;
+        has_key = ( results.cnt == {{dataset | bench_macro('PAGE_LIMIT')}} );
+        {{model.get_list_free_function_name()}}( &results );
+        }
+    bench_report( "{{model.name}}", "{{function_name}}", (int)( row_cnt / config->iterations ), samples, config->iterations, failure_cnt );
+    }
+
+{% endfor %}
+{% for query in model.get_find_queries() %}
+{% set result_model = query.get_result_model(model) %}
+{% set function_name = query.name | accessor_function_name(cached) %}
+    {
+    {{result_model.get_c_type()}} result;
+
+    failure_cnt = 0;
+    for( i = 0; i < config->iterations; i++ )
+        {
+        row = &models.list[i % config->rows];
+        value = i % config->cardinality;
+        start = bench_now();
+        failure_cnt += !{{function_name}}( {{db_var}}, {% for query_param in query.params %}{{query_param | query_param_bench_value(model, 'row', 'value', 'texts[value]')}}, {% endfor %}&found, &result );
+        samples[i] = bench_now() - start;
+        {{result_model.get_free_function_name()}}( &result );
+        }
+    bench_report( "{{model.name}}", "{{function_name}}", 1, samples, config->iterations, failure_cnt );
+    }
+
+{% endfor %}
+{% for query in model.get_count_queries() %}
+{% set function_name = query.name | accessor_function_name(cached) %}
+failure_cnt = 0;
+for( i = 0; i < config->iterations; i++ )
+    {
+    row = &models.list[i % config->rows];
+    value = i % config->cardinality;
+    start = bench_now();
+    failure_cnt += !{{function_name}}( {{db_var}}, {% for query_param in query.params %}{{query_param | query_param_bench_value(model, 'row', 'value', 'texts[value]')}}, {% endfor %}&count );
+    samples[i] = bench_now() - start;
+    }
+bench_report( "{{model.name}}", "{{function_name}}", 1, samples, config->iterations, failure_cnt );
+
+{% endfor %}
+{% for query in model.get_update_queries() %}
+{% set function_name = query.name | accessor_function_name(cached) %}
+failure_cnt = 0;
+for( i = 0; i < config->iterations; i++ )
+    {
+    row = &models.list[i % config->rows];
+    value = i % config->cardinality;
+    start = bench_now();
+    failure_cnt += !{{function_name}}( {{db_var}}{% for query_param in query.params %}, {{query_param | query_param_bench_value(model, 'row', 'value', 'texts[value]')}}{% endfor %} );
+    samples[i] = bench_now() - start;
+    }
+bench_report( "{{model.name}}", "{{function_name}}", 1, samples, config->iterations, failure_cnt );
+
+{% endfor %}
+{% for query in model.get_delete_queries() %}
+{% set function_name = query.name | accessor_function_name(cached) %}
+failure_cnt = 0;
+for( i = 0; i < config->iterations; i++ )
+    {
+    row = &models.list[i % config->rows];
+    value = i % config->cardinality;
+    start = bench_now();
+    failure_cnt += !{{function_name}}( {{db_var}}{% for query_param in query.params %}, {{query_param | query_param_bench_value(model, 'row', 'value', 'texts[value]')}}{% endfor %} );
+    samples[i] = bench_now() - start;
+    }
+bench_report( "{{model.name}}", "{{function_name}}", 1, samples, config->iterations, failure_cnt );
+
+{% endfor %}
+{% endfor %}
+free( models.list );
+}
+
+
+/**************************************************
+*
+*    {{model | model_bench_fill_function_name}} - Fill synthetic {{model.name}}
+*
+*    Fills the provided model with synthetic values
+*    derived from value. Text and blob fields point
+*    to or are copied from the provided text, so the
+*    model must not be freed with {{model.get_free_function_name()}}.
+*
+**************************************************/
+static void {{model | model_bench_fill_function_name}}
+    (
+    {{model.get_pointer_type()}} model,
+    int value,
+    char * text
+    )
+{
+{% set text = namespace(used=False) %}
+{{model.get_init_function_name()}}( model );
+{% for field in model.fields %}
+{{field | field_bench_fill_statement(dataset, 'model', 'value', 'text')}}
+{% if not field.field_type.is_primitive_type() %}
+{% set text.used = True %}
+{% endif %}
+{% endfor %}
+{% if not text.used %}
+(void)text;
+{% endif %}
+}
+
+
+{% endfor %}
+/**************************************************
+*
+*    bench_check - Check for failure
+*
+*    Exits the benchmark if the named function failed.
+*
+**************************************************/
+static void bench_check
+    (
+    int success,
+    char const * function_name
+    )
+{
+if( !success )
+    {
+    fprintf( stderr, "%s failed\n", function_name );
+    exit( EXIT_FAILURE );
+    }
+}
+
+
+/**************************************************
+*
+*    bench_config_parse - Parse configuration
+*
+*    Parses the benchmark configuration from the
+*    command line arguments. Returns 0 if the
+*    arguments are invalid.
+*
+**************************************************/
+static int bench_config_parse
+    (
+    int argc,
+    char ** argv,
+    bench_config_t * config_out
+    )
+{
+int i;
+int success;
+
+config_out->rows = {{dataset | bench_macro('DEFAULT_ROWS')}};
+config_out->cardinality = {{dataset | bench_macro('DEFAULT_CARDINALITY')}};
+config_out->text_length = {{dataset | bench_macro('DEFAULT_TEXT_LENGTH')}};
+config_out->iterations = {{dataset | bench_macro('DEFAULT_ITERATIONS')}};
+config_out->db_path = NULL;
+
+success = 1;
+
+for( i = 1; ( success ) && ( i < argc ); i += 2 )
+    {
+    success = ( ( i + 1 ) < argc );
+    if( !success )
+        {
+        break;
+        }
+
+    if( 0 == strcmp( argv[i], "-r" ) )
+        {
+        config_out->rows = atoi( argv[i + 1] );
+        }
+    else if( 0 == strcmp( argv[i], "-c" ) )
+        {
+        config_out->cardinality = atoi( argv[i + 1] );
+        }
+    else if( 0 == strcmp( argv[i], "-t" ) )
+        {
+        config_out->text_length = atoi( argv[i + 1] );
+        }
+    else if( 0 == strcmp( argv[i], "-i" ) )
+        {
+        config_out->iterations = atoi( argv[i + 1] );
+        }
+    else if( 0 == strcmp( argv[i], "-f" ) )
+        {
+        config_out->db_path = argv[i + 1];
+        }
+    else
+        {
+        success = 0;
+        }
+    }
+
+success = success && ( config_out->rows > 0 ) && ( config_out->cardinality > 0 ) &&
+          ( config_out->text_length > 0 ) && ( config_out->iterations > 0 );
+
+return success;
+}
+
+
+/**************************************************
+*
+*    bench_now - Get current time
+*
+*    Returns the current monotonic time in seconds.
+*
+**************************************************/
+static double bench_now
+    (
+    void
+    )
+{
+struct timespec now;
+
+clock_gettime( CLOCK_MONOTONIC, &now );
+
+return now.tv_sec + ( now.tv_nsec / 1e9 );
+}
+
+
+/**************************************************
+*
+*    bench_report - Report function results
+*
+*    Prints the throughput and latency percentiles
+*    of the provided samples as a JSON object. Each
+*    sample is the duration of a single call in
+*    seconds. The samples are sorted in place.
+*    failure_cnt is the number of calls that failed.
+*
+**************************************************/
+static void bench_report
+    (
+    char const * model_name,
+    char const * function_name,
+    int rows_per_call,
+    double * samples,
+    int sample_cnt,
+    int failure_cnt
+    )
+{
+static int report_cnt = 0;
+double total;
+int i;
+
+total = 0;
+for( i = 0; i < sample_cnt; i++ )
+    {
+    total += samples[i];
+    }
+
+qsort( samples, sample_cnt, sizeof( *samples ), bench_sample_compare );
+
+printf( "%s\n    {", ( report_cnt > 0 ) ? "," : "" );
+printf( "\"model\": \"%s\", ", model_name );
+printf( "\"function\": \"%s\", ", function_name );
+printf( "\"calls\": %d, ", sample_cnt );
+printf( "\"rows_per_call\": %d, ", rows_per_call );
+printf( "\"failures\": %d, ", failure_cnt );
+printf( "\"ops_per_sec\": %.1f, ", ( total > 0 ) ? ( sample_cnt / total ) : 0.0 );
+printf( "\"p50_us\": %.2f, ", samples[( sample_cnt * 50 ) / 100] * 1e6 );
+printf( "\"p99_us\": %.2f", samples[( sample_cnt * 99 ) / 100] * 1e6 );
+printf( "}" );
+
+report_cnt++;
+}
+
+
+/**************************************************
+*
+*    bench_sample_compare - Compare samples
+*
+*    A qsort comparison function for sorting samples
+*    in ascending order.
+*
+**************************************************/
+static int bench_sample_compare
+    (
+    void const * a,
+    void const * b
+    )
+{
+double sample_a;
+double sample_b;
+
+sample_a = *(double const *)a;
+sample_b = *(double const *)b;
+
+return ( sample_a > sample_b ) - ( sample_a < sample_b );
+}
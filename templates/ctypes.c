@@ -1,7 +1,7 @@
 /************************************************************************
 THIS FILE IS AUTO-GENERATED. DO NOT EDIT DIRECTLY. ALL CHANGES WILL BE LOST.
 
-{{dataset | source_name}} - Contains functions for working with {{dataset.name}} dataset models.
+{{source_file_name}} - Contains functions for working with {{dataset.name}} {% if shared_source %}dataset{% else %}{{source_models[0].name}}{% endif %} models.
 ************************************************************************/
 
 /************************************************************************
@@ -11,12 +11,96 @@ THIS FILE IS AUTO-GENERATED. DO NOT EDIT DIRECTLY. ALL CHANGES WILL BE LOST.
 {% for include in includes %}
 #include {{include}}
 {% endfor %}
+{% if dataset.options.arena_lists and shared_source %}
+
+/************************************************************************
+                              CONSTANTS
+************************************************************************/
+
+#define {{dataset | arena_block_size_macro}} ( 4096 )
+{% endif %}
 
 /************************************************************************
                                PROCEDURES
 ************************************************************************/
 
-{% for model in dataset.models %}
+{% if dataset.options.arena_lists and shared_source %}
+/**************************************************
+*
+*    {{dataset.get_arena_alloc_function_name()}} - Allocate from arena
+*
+*    Allocates size bytes from the provided list arena.
+*    A new block is added to the arena whenever the
+*    current block is full. Blocks are never moved, so
+*    memory allocated earlier stays valid until the
+*    arena is freed. Returns NULL if memory could not
+*    be allocated.
+*
+**************************************************/
+void * {{dataset.get_arena_alloc_function_name()}}
+    (
+    {{dataset.get_arena_pointer_type()}} * arena,
+    size_t size
+    )
+{
+{{dataset.get_arena_pointer_type()}} block;
+size_t capacity;
+char * data;
+
+block = *arena;
+
+if( ( NULL == block ) || ( ( block->capacity - block->used ) < size ) )
+    {
+    capacity = ( NULL == block ) ? {{dataset | arena_block_size_macro}} : ( 2 * block->capacity );
+    if( capacity < size )
+        {
+        capacity = size;
+        }
+
+    block = malloc( sizeof( *block ) + capacity );
+    if( NULL == block )
+        {
+        return NULL;
+        }
+
+    block->prev = *arena;
+    block->used = 0;
+    block->capacity = capacity;
+    *arena = block;
+    }
+
+data = (char *)( block + 1 ) + block->used;
+block->used += size;
+
+return data;
+} /* {{dataset.get_arena_alloc_function_name()}} */
+
+
+/**************************************************
+*
+*    {{dataset.get_arena_free_function_name()}} - Free arena
+*
+*    Frees all blocks of the provided list arena.
+*
+**************************************************/
+void {{dataset.get_arena_free_function_name()}}
+    (
+    {{dataset.get_arena_pointer_type()}} arena
+    )
+{
+{{dataset.get_arena_pointer_type()}} prev;
+
+while( NULL != arena )
+    {
+    prev = arena->prev;
+    free( arena );
+    arena = prev;
+    }
+} /* {{dataset.get_arena_free_function_name()}} */
+
+
+{% endif %}
+{% for model in source_models + source_projection_models %}
 /**************************************************
 *
 *    {{model.get_free_function_name()}} - Free {{model.name}}
@@ -57,6 +141,12 @@ memset( model, 0, sizeof( *model ) );
 *    {{model.get_list_free_function_name()}} - Free {{model.name}} list
 *
 *    Cleans up all resources owned by the provided list of {{model.name}} models.
+{% if dataset.options.arena_lists and model.has_dynamic_fields() %}
+*    The text and blob fields of the models are owned by
+*    the list's arena, which is freed as a whole.
+*    Fields of models added to the list by the caller
+*    are not freed.
+{% endif %}
 *
 **************************************************/
 void {{model.get_list_free_function_name()}}
@@ -64,7 +154,9 @@ void {{model.get_list_free_function_name()}}
     {{model.get_list_pointer_type()}} models
     )
 {
-{%if model.has_dynamic_fields() %}
+{%if dataset.options.arena_lists and model.has_dynamic_fields() %}
+{{dataset.get_arena_free_function_name()}}( models->arena );
+{%elif model.has_dynamic_fields() %}
 int i;
 
 for( i = 0; i < models->cnt; i++ )
@@ -94,4 +186,45 @@ void {{model.get_list_init_function_name()}}
 memset( models, 0, sizeof( *models ) );
 } /* {{model.get_list_init_function_name()}} */
 
+{% if model.columnar %}
+
+/**************************************************
+*
+*    {{model.get_columns_free_function_name()}} - Free {{model.name}} columns
+*
+*    Frees the arrays of the provided columnar list of {{model.name}} models.
+*
+**************************************************/
+void {{model.get_columns_free_function_name()}}
+    (
+    {{model.get_columns_pointer_type()}} columns
+    )
+{
+{% for field in model.fields %}
+free( columns->{{field.name}} );
+{% if not field.field_type.is_primitive_type() %}
+free( columns->{{field.get_columns_offsets_name()}} );
+{% endif %}
+{% endfor %}
+
+{{model.get_columns_init_function_name()}}( columns );
+} /* {{model.get_columns_free_function_name()}} */
+
+
+/**************************************************
+*
+*    {{model.get_columns_init_function_name()}} - Initialize {{model.name}} columns
+*
+*    Initializes the provided columnar list of {{model.name}} models.
+*
+**************************************************/
+void {{model.get_columns_init_function_name()}}
+    (
+    {{model.get_columns_pointer_type()}} columns
+    )
+{
+memset( columns, 0, sizeof( *columns ) );
+} /* {{model.get_columns_init_function_name()}} */
+
+{% endif %}
 {% endfor %}
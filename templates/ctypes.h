@@ -19,11 +19,23 @@ THIS FILE IS AUTO-GENERATED. DO NOT EDIT DIRECTLY. ALL CHANGES WILL BE LOST.
                                TYPES
 ************************************************************************/
 
-{% for model in dataset.models %}
+{% if dataset.options.arena_lists %}
+typedef struct {{dataset | arena_struct_tag}}
+    {
+    struct {{dataset | arena_struct_tag}} * prev;
+    size_t used;
+    size_t capacity;
+    } {{dataset.get_arena_c_type()}};
+
+{% endif %}
+{% for model in dataset.get_struct_models() %}
 typedef struct
     {
     {% for field in model.fields %}
     {{field.get_type_declaration()}} {{field.get_name_declaration()}};
+    {% if dataset.has_length_member(field) %}
+    size_t {{field.get_length_name()}};
+    {% endif %}
     {% endfor %}
     } {{model.get_c_type()}};
 
@@ -31,15 +43,53 @@ typedef struct
     {
     {{model.get_pointer_type()}} list;
     int cnt;
+    {% if dataset.options.arena_lists and model.has_dynamic_fields() %}
+    {{dataset.get_arena_pointer_type()}} arena;
+    {% endif %}
     } {{model.get_list_c_type()}};
 
+{% if model.columnar %}
+/*
+Holds the value of {{model.name}} field i of model j at index j of its array. The values
+of TEXT and BLOB fields are stored back to back, with value j taking up bytes
+[ offsets[j], offsets[j + 1] ). NULL values are read as 0 or as empty values.
+*/
+typedef struct
+    {
+    {% for field in model.fields %}
+    {% if field.field_type.is_primitive_type() %}
+    {{field.get_type_declaration()}} * {{field.name}};
+    {% else %}
+    char * {{field.name}};
+    size_t * {{field.get_columns_offsets_name()}};
+    size_t {{field.get_columns_capacity_name()}};
+    {% endif %}
+    {% endfor %}
+    int cnt;
+    int capacity;
+    } {{model.get_columns_c_type()}};
+
+{% endif %}
 {% endfor %}
 
 /************************************************************************
                                PROCEDURES
 ************************************************************************/
 
-{% for model in dataset.models %}
+{% if dataset.options.arena_lists %}
+void * {{dataset.get_arena_alloc_function_name()}}
+    (
+    {{dataset.get_arena_pointer_type()}} * arena,
+    size_t size
+    );
+
+void {{dataset.get_arena_free_function_name()}}
+    (
+    {{dataset.get_arena_pointer_type()}} arena
+    );
+
+{% endif %}
+{% for model in dataset.get_struct_models() %}
 void {{model.get_free_function_name()}}
     (
     {{model.get_pointer_type()}} model
@@ -60,6 +110,18 @@ void {{model.get_list_init_function_name()}}
     {{model.get_list_pointer_type()}} models
     );
 
+{% if model.columnar %}
+void {{model.get_columns_free_function_name()}}
+    (
+    {{model.get_columns_pointer_type()}} columns
+    );
+
+void {{model.get_columns_init_function_name()}}
+    (
+    {{model.get_columns_pointer_type()}} columns
+    );
+
+{% endif %}
 {% endfor %}
 
 #endif /* #define {{dataset | header_guard_macro }}  */